@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+import sys
+import time
+import argparse
+
+from mafagrafos.graph import *
+
+import mafagrafos.util as util
+
+logger = util.get_logger('bench_add_edge')
+
+def build_chain(size):
+    # N0 -> N1 -> ... -> Nn-1, then try to close the chain. The closing edge is rejected only
+    # after a DFS that walks the whole chain.
+    graph = Graph('chain')
+    for i in range(size):
+        graph.add_node(f"N{i}")
+    for i in range(size - 1):
+        graph.add_edge(f"N{i}", f"N{i+1}")
+    edge = graph.add_edge(f"N{size-1}", "N0")
+    assert edge is None
+    return size
+
+def build_reversed_fan_in(size):
+    # the sink is created first, so every transfer into it forces a reordering of the topological sort
+    graph = Graph('fan-in')
+    graph.add_node("SINK")
+    for i in range(size):
+        graph.add_node(f"N{i}")
+    for i in range(size):
+        graph.add_edge(f"N{i}", "SINK")
+    return size
+
+def build_fan_in_chains(size):
+    # many short transfer chains feeding a sink created first. Each new head is created after the
+    # chain it feeds, so every edge insertion runs the cycle check.
+    graph = Graph('fan-in chains')
+    graph.add_node("SINK")
+    chain_len = 10
+    edge_count = 0
+    for c in range(size // chain_len):
+        prev_label = "SINK"
+        for i in range(chain_len):
+            label = f"C{c}_{i}"
+            graph.add_node(label)
+            graph.add_edge(label, prev_label)
+            edge_count += 1
+            prev_label = label
+    return edge_count
+
+def build_reversed_fan_in_bulk(size):
+    # same graph as build_reversed_fan_in, inserted with a single add_edges call
+    graph = Graph('fan-in bulk')
+    graph.add_node("SINK")
+    for i in range(size):
+        graph.add_node(f"N{i}")
+    edges = graph.add_edges([ (f"N{i}", "SINK", None) for i in range(size) ])
+    assert all(edges)
+    return size
+
+def build_reversed_chain_bulk(size):
+    # Nn-1 -> ... -> N1 -> N0 against the creation order. Inserted one edge at a time every edge
+    # would renumber the whole chain built so far (quadratic), in bulk the chain is sorted once.
+    graph = Graph('reversed chain bulk')
+    for i in range(size):
+        graph.add_node(f"N{i}")
+    edges = graph.add_edges([ (f"N{i+1}", f"N{i}", None) for i in range(size - 1) ])
+    assert all(edges)
+    return size - 1
+
+WORKLOADS = {
+    'chain'             : build_chain
+,   'fan_in'            : build_reversed_fan_in
+,   'fan_in_bulk'       : build_reversed_fan_in_bulk
+,   'fan_in_chains'     : build_fan_in_chains
+,   'reversed_chain_bulk': build_reversed_chain_bulk
+}
+
+def run(workloads, sizes):
+    for name in workloads:
+        for size in sizes:
+            start = time.perf_counter()
+            edge_count = WORKLOADS[name](size)
+            elapsed = time.perf_counter() - start
+            logger.info(f"{name:<15} nodes={size:>9} edges={edge_count:>9} elapsed={elapsed:8.3f}s throughput={edge_count/elapsed:12.0f} edges/s")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workloads',  type=str, nargs='+', default=list(WORKLOADS.keys()), choices=list(WORKLOADS.keys()), help='workloads to run')
+    parser.add_argument('--sizes',      type=int, nargs='+', default=[10**5, 10**6], help='node counts')
+    args = parser.parse_args()
+    run(args.workloads, args.sizes)
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+import time
+import random
+import argparse
+
+from mafagrafos.balance_index import BalanceIndex
+
+import mafagrafos.util as util
+
+logger = util.get_logger('bench_balance_index')
+
+def build_index(node_count, transfer_count, seed):
+    # one transfer per tick between random accounts, as cycle_remover records them
+    rnd = random.Random(seed)
+    index = BalanceIndex()
+    transfers = []
+    for tick in range(transfer_count):
+        src, dst, ammount = rnd.randrange(node_count), rnd.randrange(node_count), rnd.random()
+        index.record(src, tick, -ammount)
+        index.record(dst, tick, ammount)
+        transfers.append((src, dst, ammount))
+    return index, transfers
+
+def replay(transfers, node_count, tick):
+    # what answering the question took before the index: applying every transfer up to the tick
+    balances = [ 0.0 ] * node_count
+    for src, dst, ammount in transfers[:tick + 1]:
+        balances[src] -= ammount
+        balances[dst] += ammount
+    return balances
+
+def run(node_count, transfer_count, query_count, seed):
+    start = time.perf_counter()
+    index, transfers = build_index(node_count, transfer_count, seed)
+    logger.info(f"indexed {transfer_count} transfers elapsed={time.perf_counter() - start:8.3f}s")
+    ticks = [ transfer_count * (i + 1) // (query_count + 1) for i in range(query_count) ]
+    start = time.perf_counter()
+    for tick in ticks:
+        replay(transfers, node_count, tick)
+    logger.info(f"replay   {query_count} snapshots elapsed={time.perf_counter() - start:8.3f}s")
+    start = time.perf_counter()
+    for tick in ticks:
+        index.balances_at(tick, node_count)
+    logger.info(f"index    {query_count} snapshots elapsed={time.perf_counter() - start:8.3f}s")
+    start = time.perf_counter()
+    for node_id in range(query_count):
+        index.balances_between(node_id % node_count, ticks[0], ticks[-1])
+    logger.info(f"index    {query_count} histories elapsed={time.perf_counter() - start:8.3f}s")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--nodes',      type=int, default=10**4, help='account count')
+    parser.add_argument('--transfers',  type=int, default=10**6, help='transfer count')
+    parser.add_argument('--queries',    type=int, default=20, help='snapshot and history queries')
+    parser.add_argument('--seed',       type=int, default=42, help='random seed')
+    args = parser.parse_args()
+    run(args.nodes, args.transfers, args.queries, args.seed)
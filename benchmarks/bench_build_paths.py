@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+import time
+import argparse
+
+from mafagrafos.graph import *
+from mafagrafos.paths import Segment, Path
+
+import mafagrafos.util as util
+
+logger = util.get_logger('bench_build_paths')
+
+def build_paths_recursively(graph, sink_label):
+    # reference implementation: the recursive walk the explicit stack builder replaced.
+    # it does not patch temporally inconsistent paths, the benchmark graphs have none
+    head_node = graph.get_node_by_label(sink_label)
+    acc = []
+    _build_path(graph, head_node, Path(), acc)
+    return acc
+
+def _build_path(graph, head_node, curr_path, acc):
+    if curr_path.segment_count > 0:
+        assert curr_path.is_temporally_consistent()
+        curr_path.received_ammount  = 0.0
+        curr_path.inputed_ammount   = head_node.get_attr('inputed_ammount')
+        acc.append(curr_path)
+    old_path = curr_path
+    new_tail_node = head_node
+    for from_id in new_tail_node.in_edges:
+        new_head_node = graph.get_node_by_id(from_id)
+        edge = graph.get_edge(new_head_node.label, new_tail_node.label)
+        edge_pct = edge.get_attr('pct') / 100.0
+        min_t = edge.get_attr('time')[0]
+        max_t = edge.get_attr('time')[-1]
+        curr_path = old_path.clone()
+        curr_path.push_segment(Segment(new_head_node.label, new_tail_node.label, edge_pct, min_t, max_t))
+        _build_path(graph, new_head_node, curr_path, acc)
+
+def version_chain(depth, fan_in):
+    # X--0 -> X--1 -> ... -> X--depth, the chains cycle_remover creates when splitting an account.
+    # every version also receives from fan_in accounts
+    graph = Graph('version chain')
+    for i in range(depth + 1):
+        node = graph.add_node(f"X--{i}")
+        node.set_attr('inputed_ammount', 1.0)
+    for i in range(depth):
+        for j in range(fan_in):
+            node = graph.add_node(f"S{i}_{j}")
+            node.set_attr('inputed_ammount', 1.0)
+            edge = graph.add_edge(f"S{i}_{j}", f"X--{i+1}")
+            edge.set_attr('pct', 10.0)
+            edge.set_attr('time', [ 2 * i ])
+        edge = graph.add_edge(f"X--{i}", f"X--{i+1}")
+        edge.set_attr('pct', 90.0)
+        edge.set_attr('time', [ 2 * i + 1 ])
+    return graph, f"X--{depth}"
+
+def run(depths, fan_in, workers):
+    # the explicit stack is not faster than the recursive walk, what it buys is the depth: the
+    # recursive walk fails once the chain is deeper than the recursion limit
+    for depth in depths:
+        graph, sink_label = version_chain(depth, fan_in)
+        start = time.perf_counter()
+        paths = graph.build_paths(sink_label)
+        elapsed = time.perf_counter() - start
+        logger.info(f"explicit stack depth={depth:>7} paths={len(paths):>9} elapsed={elapsed:8.3f}s")
+        if workers is not None:
+            start = time.perf_counter()
+            parallel = graph.build_paths(sink_label, workers=workers)
+            elapsed = time.perf_counter() - start
+            assert [ path.from_label for path in parallel ] == [ path.from_label for path in paths ]
+            logger.info(f"{workers:>2} workers     depth={depth:>7} paths={len(parallel):>9} elapsed={elapsed:8.3f}s")
+        start = time.perf_counter()
+        try:
+            expected = build_paths_recursively(graph, sink_label)
+            elapsed = time.perf_counter() - start
+            assert [ path.from_label for path in paths ] == [ path.from_label for path in expected ]
+            logger.info(f"recursive      depth={depth:>7} paths={len(expected):>9} elapsed={elapsed:8.3f}s")
+        except RecursionError:
+            logger.info(f"recursive      depth={depth:>7} failed with RecursionError")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--depths',     type=int, nargs='+', default=[500, 5000], help='version chain lengths')
+    parser.add_argument('--fan-in',     type=int, default=2, help='accounts transferring to each version')
+    parser.add_argument('--workers',    type=int, default=None, help='also build the paths with a pool of processes')
+    args = parser.parse_args()
+    run(args.depths, args.fan_in, args.workers)
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+import time
+import argparse
+
+from mafagrafos.presenter import GraphPresenter
+
+from benchmarks.bench_freeze import build_ledger_graph
+
+import mafagrafos.util as util
+
+logger = util.get_logger('bench_compute_pcts')
+
+def compute_pcts_per_node(graph):
+    # what compute_pcts did before it was vectorized: two walks over the out edges of every node and
+    # a pct_txt formatted for every edge
+    for node in graph.nodes:
+        edges = [ edge for _, edge in node.out_edge_items() ]
+        edges_sum = node.get_attr('ammount')
+        for edge in edges:
+            edges_sum += edge.get_attr('ammount')
+        for edge in edges:
+            edge_pct = edge.get_attr('ammount') / edges_sum * 100.0
+            edge.set_attr('pct', edge_pct)
+            edge.set_attr('pct_txt', '{:.3f}%'.format(edge_pct))
+
+def run(sizes, fan_out, seed):
+    for size in sizes:
+        frozen = build_ledger_graph(size, fan_out, seed).freeze()
+        logger.info(f"nodes={size} edges={frozen.edge_count}")
+        start = time.perf_counter()
+        compute_pcts_per_node(frozen)
+        logger.info(f"per node   elapsed={time.perf_counter() - start:8.3f}s")
+        start = time.perf_counter()
+        GraphPresenter(frozen).compute_pcts()
+        logger.info(f"vectorized elapsed={time.perf_counter() - start:8.3f}s")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes',      type=int, nargs='+', default=[2 * 10**5], help='node counts')
+    parser.add_argument('--fan-out',    type=int, default=5, help='transfers per account')
+    parser.add_argument('--seed',       type=int, default=42, help='random seed')
+    args = parser.parse_args()
+    run(args.sizes, args.fan_out, args.seed)
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+import time
+import random
+import argparse
+import tracemalloc
+
+from mafagrafos.graph import *
+
+import mafagrafos.util as util
+
+logger = util.get_logger('bench_freeze')
+
+def build_ledger_graph(size, fan_out, seed):
+    # accounts transferring to a few accounts created after them, with the attributes cycle_remover sets
+    rnd = random.Random(seed)
+    graph = Graph('ledger')
+    for i in range(size):
+        node = graph.add_node(f"ACC{i}")
+        node.set_attr('ammount', 0.0)
+        node.set_attr('inputed_ammount', 0.0)
+        node.set_attr('received_ammount', 0.0)
+        node.set_attr('transferred_ammount', 0.0)
+    for i in range(size - 1):
+        for j in set(rnd.randrange(i + 1, size) for _ in range(fan_out)):
+            edge = graph.add_edge(f"ACC{i}", f"ACC{j}")
+            edge.set_attr('ammount', 1.0)
+            edge.set_attr('time', [ i ])
+            edge.set_attr('pct', 0.0)
+    return graph
+
+def measure(label, func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    logger.info(f"{label:<8} memory={size / 2**20:10.1f}MiB elapsed={elapsed:8.3f}s")
+    return result, size
+
+def traverse(graph):
+    # every node, every out edge and its attribute, through the edges of the adjacency
+    total = 0.0
+    for node in graph.nodes:
+        for _, edge in node.out_edge_items():
+            total += edge.get_attr('ammount')
+    return total
+
+def traverse_frozen(frozen):
+    # the same walk over a frozen graph, which reads the edge ids of the CSR rows and the attribute
+    # column instead of creating an edge view per edge. It should be at least as fast as traverse
+    # on the mutable graph
+    total = 0.0
+    column = frozen.get_edge_column('ammount')
+    for node in frozen.nodes:
+        for _, edge_id in node.iter_out_edge_ids():
+            total += column[edge_id]
+    return total
+
+def run(sizes, fan_out, seed):
+    for size in sizes:
+        graph, graph_size = measure('graph', lambda: build_ledger_graph(size, fan_out, seed))
+        frozen, frozen_size = measure('frozen', lambda: graph.freeze())
+        logger.info(f"nodes={size} edges={len(graph.edges)} memory reduction={graph_size / frozen_size:.1f}x")
+        elapsed = {}
+        for label, func, g in [ ('graph', traverse, graph), ('frozen', traverse_frozen, frozen) ]:
+            start = time.perf_counter()
+            func(g)
+            elapsed[label] = time.perf_counter() - start
+            logger.info(f"{label:<8} traversal elapsed={elapsed[label]:8.3f}s")
+        if elapsed['frozen'] > elapsed['graph']:
+            logger.warning(f"frozen traversal is {elapsed['frozen'] / elapsed['graph']:.1f}x slower than graph traversal")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes',      type=int, nargs='+', default=[10**5], help='node counts')
+    parser.add_argument('--fan-out',    type=int, default=5, help='transfers per account')
+    parser.add_argument('--seed',       type=int, default=42, help='random seed')
+    args = parser.parse_args()
+    run(args.sizes, args.fan_out, args.seed)
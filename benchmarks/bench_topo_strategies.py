@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+import time
+import random
+import argparse
+
+from mafagrafos.graph import *
+
+import mafagrafos.util as util
+
+logger = util.get_logger('bench_topo_strategies')
+
+VISITOR_CLASSES = {
+    'mnr'           : NodeVisitor
+,   'pearce_kelly'  : PearceKellyVisitor
+}
+
+def dense_fan_in_ledger(size, sink_count, transfers_per_source, seed):
+    # a few sink accounts created early and many source accounts transferring to them in random order.
+    # most insertions go against the topological ordering, so the MNR affected region spans a large
+    # part of the graph while the nodes actually reachable from the sink are only a handful.
+    rnd = random.Random(seed)
+    sinks = [ f"SINK{i}" for i in range(sink_count) ]
+    sources = [ f"SRC{i}" for i in range(size) ]
+    transfers = set()
+    for source in sources:
+        for sink in rnd.sample(sinks, transfers_per_source):
+            transfers.add((source, sink))
+    # sinks also forward part of their balance to each other, which eventually produces rejected edges
+    for _ in range(sink_count * 2):
+        from_label, to_label = rnd.sample(sinks, 2)
+        transfers.add((from_label, to_label))
+    transfers = sorted(transfers)
+    rnd.shuffle(transfers)
+    return sinks + sources, transfers
+
+def run(visitor_names, sizes, sink_count, transfers_per_source, seed):
+    for size in sizes:
+        labels, transfers = dense_fan_in_ledger(size, sink_count, transfers_per_source, seed)
+        for name in visitor_names:
+            graph = Graph(name, visitor_class=VISITOR_CLASSES[name])
+            for label in labels:
+                graph.add_node(label)
+            start = time.perf_counter()
+            rejected = 0
+            for from_label, to_label in transfers:
+                if graph.add_edge(from_label, to_label) is None:
+                    rejected += 1
+            elapsed = time.perf_counter() - start
+            logger.info(f"{name:<13} nodes={len(labels):>9} edges={len(transfers):>9} rejected={rejected:>6} elapsed={elapsed:8.3f}s throughput={len(transfers)/elapsed:12.0f} edges/s")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--visitors',   type=str, nargs='+', default=list(VISITOR_CLASSES.keys()), choices=list(VISITOR_CLASSES.keys()), help='topological sorting strategies to compare')
+    parser.add_argument('--sizes',      type=int, nargs='+', default=[10**4, 5 * 10**4], help='source account counts')
+    parser.add_argument('--sinks',      type=int, default=500, help='sink account count')
+    parser.add_argument('--fan-in',     type=int, default=3, help='transfers per source account')
+    parser.add_argument('--seed',       type=int, default=42, help='random seed')
+    args = parser.parse_args()
+    run(args.visitors, args.sizes, args.sinks, args.fan_in, args.seed)
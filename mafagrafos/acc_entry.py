@@ -1,31 +1,141 @@
+from array import array
+
+import numpy as np
+
 class AccEntryList:
+    # columnar list of accounting entries. Each account label is interned once into an int32 code,
+    # entries are kept as parallel dst code, src code (-1 for a direct loading) and ammount arrays.
+    # The ammounts are stored as float64, int_flags remembers which of them were added as int
+    
+    NO_SRC = -1
     
     def __init__(self):
-        self.nodes = []
-        self.seen_nodes = set() # to avoid linear scan of all nodes
-        self.entries = []
+        self.labels = []    # code -> label, in the order the accounts were first seen
+        self.codes = {}     # label -> code
+        self.dst_codes = array('i')
+        self.src_codes = array('i')
+        self.ammounts = array('d')
+        self.int_flags = array('b')
 
     def __eq__(self, other):
         if other is None:
             return False
-        return  self.nodes      == other.nodes      and \
-                self.seen_nodes == other.seen_nodes and \
-                self.entries    == other.entries
+        return  self.labels     == other.labels     and \
+                self.dst_codes  == other.dst_codes  and \
+                self.src_codes  == other.src_codes  and \
+                self.ammounts   == other.ammounts   and \
+                self.int_flags  == other.int_flags
     
     def __str__(self):
-        return f"<AccEntryList #{len(self.entries)} entries>"
+        return f"<AccEntryList #{len(self)} entries>"
+    
+    def __len__(self):
+        return len(self.ammounts)
+    
+    def __getitem__(self, idx):
+        src_code = self.src_codes[idx]
+        ammount = self.ammounts[idx]
+        if self.int_flags[idx]:
+            ammount = int(ammount)
+        return AccEntry(
+            self.labels[ self.dst_codes[idx] ]
+        ,   None if src_code == self.NO_SRC else self.labels[src_code]
+        ,   ammount
+        )
+    
+    def __iter__(self):
+        # AccEntry objects, created on demand, sharing the interned labels
+        for idx in range(len(self)):
+            yield self[idx]
+    
+    @property
+    def nodes(self):
+        return self.labels
+    
+    @property
+    def seen_nodes(self):
+        return self.codes.keys()
+    
+    @property
+    def entries(self):
+        # materialized on demand - O(n)
+        return list(self)
+    
+    @property
+    def label_count(self):
+        return len(self.labels)
         
     def _add_node(self, node_label):
         assert node_label
-        if node_label not in self.seen_nodes:
-            self.nodes.append(node_label)
-            self.seen_nodes.add(node_label) 
+        code = self.codes.get(node_label, None)
+        if code is None:
+            code = len(self.labels)
+            self.labels.append(node_label)
+            self.codes[node_label] = code
+        return code
         
     def add_entry(self, entry):
-        self.entries.append(entry)
-        self._add_node(entry.dst)
-        if entry.src:
-            self._add_node(entry.src)
+        self.dst_codes.append(self._add_node(entry.dst))
+        self.src_codes.append(self._add_node(entry.src) if entry.src else self.NO_SRC)
+        self.ammounts.append(entry.ammount)
+        self.int_flags.append(isinstance(entry.ammount, int))
+    
+    def extend(self, entries):
+        # entries may be a generator, such as entry_reader.iter_entries
+        for entry in entries:
+            self.add_entry(entry)
+    
+    def get_code(self, label):
+        # can return None
+        return self.codes.get(label, None)
+    
+    def get_label(self, code):
+        return self.labels[code]
+    
+    def iter_codes(self):
+        # (dst code, src code, ammount) of every entry, src code being NO_SRC for direct loadings. The
+        # ammounts keep the type they were added with
+        for dst_code, src_code, ammount, int_flag in zip(self.dst_codes, self.src_codes, self.ammounts, self.int_flags):
+            yield dst_code, src_code, int(ammount) if int_flag else ammount
+    
+    def dst_column(self):
+        return np.frombuffer(self.dst_codes, dtype=np.int32)
+    
+    def src_column(self):
+        return np.frombuffer(self.src_codes, dtype=np.int32)
+    
+    def ammount_column(self):
+        return np.frombuffer(self.ammounts, dtype=np.float64)
+    
+    def received_totals(self):
+        # ammount received by every account, direct loadings included, indexed by code
+        if len(self) == 0:
+            return np.zeros(self.label_count, dtype=np.float64)
+        return np.bincount(self.dst_column(), weights=self.ammount_column(), minlength=self.label_count)
+    
+    def inputed_totals(self):
+        # ammount directly loaded into every account, indexed by code
+        if len(self) == 0:
+            return np.zeros(self.label_count, dtype=np.float64)
+        loadings = self.src_column() == self.NO_SRC
+        return np.bincount(self.dst_column()[loadings], weights=self.ammount_column()[loadings], minlength=self.label_count)
+    
+    def transferred_totals(self):
+        # ammount transferred by every account, indexed by code
+        if len(self) == 0:
+            return np.zeros(self.label_count, dtype=np.float64)
+        transfers = self.src_column() != self.NO_SRC
+        return np.bincount(self.src_column()[transfers], weights=self.ammount_column()[transfers], minlength=self.label_count)
+    
+    def balances(self):
+        # final balance of every account, indexed by code
+        return self.received_totals() - self.transferred_totals()
+    
+    def counterpart_counts(self):
+        # number of distinct accounts every account transferred to, indexed by code
+        transfers = self.src_column() != self.NO_SRC
+        pairs = np.unique(np.stack([ self.src_column()[transfers], self.dst_column()[transfers] ]), axis=1)
+        return np.bincount(pairs[0], minlength=self.label_count)
     
     @classmethod
     def get_test_case_01(klass):
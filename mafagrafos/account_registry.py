@@ -0,0 +1,84 @@
+class AccountRegistry:
+    # the accounts of a ledger and the graph nodes that stand for them. Breaking a cycle splits an
+    # account: the destination gets a new version, a new node that receives the transfers from then on.
+    # Every account keeps the node_ids of its versions in order, so the current version is found in
+    # O(1) whatever the number of splits. Version labels ('X', 'X--1', 'X--2', ...) are only built
+    # when asked for
+
+    __slots__ = ["versions", "node_accounts"]
+
+    VERSION_SEP = "--"
+
+    def __init__(self):
+        self.versions       = {} # label -> [ node_id of version 0, node_id of version 1, ... ]
+        self.node_accounts  = {} # node_id -> (label, version)
+
+    def __str__(self):
+        return f"<AccountRegistry account_count={len(self.versions)}, node_count={len(self.node_accounts)}>"
+
+    def __repr__(self):
+        return str(self)
+
+    def __len__(self):
+        return len(self.versions)
+
+    def __contains__(self, label):
+        return label in self.versions
+
+    @classmethod
+    def get_version_label(cls, label, version):
+        if version == 0:
+            return label
+        return f"{label}{cls.VERSION_SEP}{version}"
+
+    def add_account(self, label, node_id):
+        # version 0 of a new account
+        assert label not in self.versions
+        self.versions[label] = [ node_id ]
+        self.node_accounts[node_id] = (label, 0)
+
+    def add_version(self, label, node_id):
+        # returns the number of the new version
+        versions = self.versions[label]
+        version = len(versions)
+        versions.append(node_id)
+        self.node_accounts[node_id] = (label, version)
+        return version
+
+    def get_next_label(self, label):
+        # label of the version that add_version would add next
+        return self.get_version_label(label, len(self.versions[label]))
+
+    def get_node_id(self, label):
+        # node_id of the current version, can return None
+        versions = self.versions.get(label, None)
+        if versions is None:
+            return None
+        return versions[-1]
+
+    def get_prev_node_id(self, label):
+        # node_id of the version before the current one, can return None
+        versions = self.versions[label]
+        if len(versions) < 2:
+            return None
+        return versions[-2]
+
+    def get_versions(self, label):
+        # node_ids of every version, oldest first
+        return self.versions[label]
+
+    def get_version_count(self, label):
+        return len(self.versions.get(label, ()))
+
+    def get_version_labels(self, label):
+        return [ self.get_version_label(label, version) for version in range(self.get_version_count(label)) ]
+
+    def get_account(self, node_id):
+        # (label, version) of a node, can return None
+        return self.node_accounts.get(node_id, None)
+
+    def iter_versions(self):
+        # (label, version, node_id) of every version of every account, in account creation order
+        for label, versions in self.versions.items():
+            for version, node_id in enumerate(versions):
+                yield label, version, node_id
@@ -0,0 +1,74 @@
+from array import array
+from bisect import bisect_right
+
+import numpy as np
+
+from mafagrafos.timed_value import TimedValue
+
+class BalanceIndex:
+    # every balance change of the nodes of a graph, recorded as the entries are applied. The changes
+    # are kept twice: in a log of parallel arrays (node_id, time, delta) sorted by time, for the
+    # balances of every node at an instant, and in a TimedValue per node, for the history of a node.
+    # A balance at time t includes every change recorded at an instant up to t
+
+    __slots__ = ["node_ids", "times", "deltas", "balances", "last_time"]
+
+    def __init__(self):
+        self.node_ids   = array('i')
+        self.times      = array('d')
+        self.deltas     = array('d')
+        self.balances   = [] # node_id -> TimedValue
+        self.last_time  = None
+
+    def __str__(self):
+        return f"<BalanceIndex node_count={self.node_count}, change_count={len(self.deltas)}>"
+
+    def __repr__(self):
+        return str(self)
+
+    @property
+    def node_count(self):
+        return len(self.balances)
+
+    def record(self, node_id, time, delta):
+        assert node_id >= 0
+        assert self.last_time is None or self.last_time <= time
+        self.last_time = time
+        self.node_ids.append(node_id)
+        self.times.append(time)
+        self.deltas.append(delta)
+        while len(self.balances) <= node_id:
+            self.balances.append(TimedValue())
+        self.balances[node_id].update_at(time, delta)
+
+    def balance_at(self, node_id, time):
+        assert node_id >= 0
+        if node_id >= len(self.balances):
+            return 0.0
+        return self.balances[node_id].value_at(time)
+
+    def balances_at(self, time, node_count=None):
+        # float64 array of the balances of every node at time, indexed by node_id - O(changes up to time)
+        if node_count is None:
+            node_count = self.node_count
+        assert node_count >= self.node_count
+        if len(self.deltas) == 0:
+            return np.zeros(node_count, dtype=np.float64)
+        times = np.frombuffer(self.times, dtype=np.float64)
+        end = np.searchsorted(times, time, side='right')
+        node_ids = np.frombuffer(self.node_ids, dtype=np.int32)[:end]
+        deltas = np.frombuffer(self.deltas, dtype=np.float64)[:end]
+        return np.bincount(node_ids, weights=deltas, minlength=node_count).astype(np.float64, copy=False)
+
+    def balances_between(self, node_id, from_time, to_time):
+        # history of a node over [from_time, to_time]: the balance at from_time followed by the balance
+        # after every change in (from_time, to_time], as two float64 arrays of instants and balances
+        assert from_time <= to_time
+        if node_id >= len(self.balances) or self.balances[node_id].last_time is None:
+            return np.array([ from_time ], dtype=np.float64), np.zeros(1, dtype=np.float64)
+        balance = self.balances[node_id]
+        start = bisect_right(balance.times, from_time)
+        end = bisect_right(balance.times, to_time, start)
+        times = np.frombuffer(balance.times, dtype=np.float64)[start:end]
+        values = np.frombuffer(balance.values, dtype=np.float64)[start:end]
+        return np.concatenate(([ from_time ], times)), np.concatenate(([ balance.value_at(from_time) ], values))
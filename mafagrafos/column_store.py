@@ -0,0 +1,61 @@
+import numpy as np
+
+def as_float_array(values):
+    # float64 copy of a sequence of attribute values, None (unset) reads as NaN
+    if isinstance(values, np.ndarray):
+        return values.astype(np.float64)
+    return np.fromiter((np.nan if value is None else value for value in values), dtype=np.float64, count=len(values))
+
+class ColumnStore:
+    # typed attribute columns indexed by row id (the edge_id for edges). Every column grows together,
+    # doubling its capacity when full. Float rows that were never set read as NaN
+    
+    __slots__ = ["columns", "size", "capacity"]
+    
+    def __init__(self, schema, capacity=1024):
+        assert schema
+        assert capacity > 0
+        self.columns    = { attr: self._create_column(dtype, capacity) for attr, dtype in schema.items() }
+        self.size       = 0
+        self.capacity   = capacity
+    
+    def __str__(self):
+        return f"<ColumnStore columns={list(self.columns.keys())}, size={self.size}>"
+    
+    def __repr__(self):
+        return str(self)
+    
+    def _create_column(self, dtype, capacity):
+        column = np.empty(capacity, dtype=dtype)
+        if np.issubdtype(column.dtype, np.floating):
+            column.fill(np.nan)
+        else:
+            column.fill(0)
+        return column
+    
+    def has_column(self, attr):
+        return attr in self.columns
+    
+    def append_row(self):
+        if self.size == self.capacity:
+            new_capacity = self.capacity * 2
+            for attr, column in self.columns.items():
+                new_column = self._create_column(column.dtype, new_capacity)
+                new_column[:self.size] = column
+                self.columns[attr] = new_column
+            self.capacity = new_capacity
+        row_id = self.size
+        self.size += 1
+        return row_id
+    
+    def get(self, attr, row_id):
+        assert 0 <= row_id < self.size
+        return self.columns[attr][row_id]
+    
+    def set(self, attr, row_id, value):
+        assert 0 <= row_id < self.size
+        self.columns[attr][row_id] = value
+    
+    def column(self, attr):
+        # view over the rows in use. It stays valid until the next append_row grows the store
+        return self.columns[attr][:self.size]
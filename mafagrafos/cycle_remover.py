@@ -3,13 +3,15 @@ import os
 import sys
 import argparse
 import logging
-import pandas as pd
-import numpy as np
 
 from mafagrafos.acc_entry import *
 from mafagrafos.graph import *
 from mafagrafos.presenter import *
 from mafagrafos.paths import *
+from mafagrafos.balance_index import BalanceIndex
+from mafagrafos.account_registry import AccountRegistry
+from mafagrafos.entry_reader import iter_entries
+from mafagrafos.report_writer import open_report
 
 import mafagrafos.util as util
 
@@ -19,14 +21,26 @@ class App:
     
     VERSION = (0, 0, 0)
     ENTRIES_SHEET_COLUMNS = [ "dst", "src", "ammount" ]
+    MODES = [ "paths", "attribution" ]
     
-    def __init__(self, entries_file, sink_label, dot_file, path_report):
-        assert dot_file.endswith(".dot")
+    def __init__(self, entries_file, sink_label, dot_file, path_report, mode="paths", workers=None, bounds=None, dot_ancestors=False, normalized=False):
+        # sink_label can be a list of labels: every sink gets its own dot file and report, named
+        # after the sink, from a single graph build. A dot_file ending with .dot.gz is gzip compressed,
+        # and dot_ancestors keeps only the part of the graph that reaches the sink in it. normalized
+        # reports write every distinct segment once and link the paths to them
+        assert dot_file.endswith(".dot") or dot_file.endswith(".dot.gz")
+        assert mode in self.MODES
         self.entries_file   = entries_file
-        self.sink_label     = sink_label
+        self.sink_labels    = [ sink_label ] if isinstance(sink_label, str) else list(sink_label)
+        self.sink_label     = self.sink_labels[0]
         self.dot_file       = dot_file
         self.path_report    = path_report
-        self.labels         = {}
+        self.mode           = mode
+        self.workers        = workers
+        self.bounds         = bounds
+        self.dot_ancestors  = dot_ancestors
+        self.normalized     = normalized
+        self.accounts       = AccountRegistry()
         self.current_time   = 0
     
     def tick(self):
@@ -35,284 +49,390 @@ class App:
         return curr_time
         
     def get_entries(self):
-        logger.info('retrieving accounting entries from spreadsheet')
-        parts = self.entries_file.split(":")
-        assert len(parts) == 2
-        entries_file = parts[0]
-        sheet_name = parts[1]            
-        df = pd.read_excel(entries_file, sheet_name, header=None, names=self.ENTRIES_SHEET_COLUMNS, skiprows=1).replace({np.nan: None})
-        result = []
-        for row in df.itertuples():
-            entry = AccEntry(
-                row.dst
-            ,   row.src if row.src else None
-            ,   row.ammount
-            )
-            result.append(entry)
-        return result
+        # AccEntryList of the ledger, the labels are interned as the entries are streamed from the file
+        logger.info(f"reading accounting entries from '{self.entries_file}'")
+        entries = AccEntryList()
+        entries.extend(iter_entries(self.entries_file))
+        return entries
     
-    def get_label_remappings(self, label):
-        result = [label]
-        while True:
-            if label not in self.labels:
-                return result
-            label = self.labels[label]
-            result.append(label)
-            
-    def get_remapped_label(self, label):
-        while True:
-            if label not in self.labels:
-                return label
-            label = self.labels[label]
-    
-    def add_remapped_label(self, label):
-        orig_label = label
-        counter = 1
-        old_label = label
-        new_label = f"{orig_label}--{counter}"
-        while True:
-            if old_label not in self.labels:
-                logger.info(f"adding label remapping '{old_label}' -> '{new_label}'")
-                self.labels[old_label] = new_label
-                return new_label
-            else:
-                counter += 1
-                old_label = new_label
-                new_label = f"{orig_label}--{counter}"
+    def create_node(self, graph, label):
+        logger.info(f"adding node '{label}'")
+        node = graph.add_node(label)
+        node.set_attr('ammount', 0.0)
+        node.set_attr('inputed_ammount', 0.0)
+        node.set_attr('received_ammount', 0.0)
+        node.set_attr('transferred_ammount', 0.0)
+        return node
     
     def add_node_if_needed(self, graph, label):
+        # node of the current version of the account, version 0 is created on its first entry
         if label is None:
             return 
-        label = self.get_remapped_label(label)
-        node = graph.get_node_by_label(label)
-        if node is None:
-            logger.info(f"adding node '{label}'")
-            node = graph.add_node(label)
-            node.set_attr('ammount', 0.0)
-            node.set_attr('inputed_ammount', 0.0)
-            node.set_attr('received_ammount', 0.0)
-            node.set_attr('transferred_ammount', 0.0)
+        node_id = self.accounts.get_node_id(label)
+        if node_id is not None:
+            return graph.get_node_by_id(node_id)
+        node = self.create_node(graph, label)
+        self.accounts.add_account(label, node.node_id)
+        return node
+    
+    def add_account_version(self, graph, label):
+        # splits the account: the node of its new version receives the transfers from now on
+        new_label = self.accounts.get_next_label(label)
+        old_label = self.accounts.get_version_label(label, self.accounts.get_version_count(label) - 1)
+        logger.info(f"adding label remapping '{old_label}' -> '{new_label}'")
+        node = self.create_node(graph, new_label)
+        self.accounts.add_version(label, node.node_id)
         return node
         
-    def handle_direct_loading(self, graph, entry):
-        dst_label = self.get_remapped_label(entry.dst)
-        dst_node = graph.get_node_by_label(dst_label)
-        ammount = dst_node.get_attr('ammount')
+    def handle_direct_loading(self, graph, dst_label, ammount):
+        dst_node = graph.get_node_by_id(self.accounts.get_node_id(dst_label))
         inputed_ammount = dst_node.get_attr('inputed_ammount')
-        dst_node.set_attr('ammount', ammount + entry.ammount)
-        dst_node.set_attr('inputed_ammount', inputed_ammount + entry.ammount)
+        graph.add_node_ammount(dst_node, ammount)
+        dst_node.set_attr('inputed_ammount', inputed_ammount + ammount)
+        # a direct loading has no tick of its own, it happens before the next transfer
+        self.record_balance_change(graph, dst_node, self.current_time, ammount)
     
     def transfer_ammount_through_time(self, graph, orig_dst_label):
-        remappings = self.get_label_remappings(orig_dst_label)
-        assert len(remappings) >= 2
-        current_label = remappings[-1]
-        prev_label    = remappings[-2]
-        current_node  = graph.get_node_by_label(current_label) 
-        prev_node     = graph.get_node_by_label(prev_label) 
+        current_id    = self.accounts.get_node_id(orig_dst_label)
+        prev_id       = self.accounts.get_prev_node_id(orig_dst_label)
+        assert prev_id is not None
+        current_node  = graph.get_node_by_id(current_id) 
+        prev_node     = graph.get_node_by_id(prev_id) 
         prev_node_ammount = prev_node.get_attr('ammount')
         curr_node_ammount = current_node.get_attr('ammount')
         assert curr_node_ammount == 0.0
         if prev_node_ammount == 0.0:
             # do not create a time transfer when there is nothing to transfer
             return
-        assert current_node
-        assert prev_node
-        edge = graph.get_edge(prev_label, current_label)
+        edge = graph.get_edge_by_ids(prev_id, current_id)
         assert edge is None
-        # create the edge
-        edge = graph.add_edge(prev_label, current_label)
+        # create the edge, moving the whole balance through it
+        edge = graph.add_edge_by_ids(prev_id, current_id)
         edge_ammount = prev_node_ammount
-        prev_node_ammount -= edge_ammount
-        curr_node_ammount += edge_ammount
-        prev_node.set_attr('ammount', prev_node_ammount)
-        current_node.set_attr('ammount', curr_node_ammount)
-        edge.set_attr('ammount', edge_ammount)
-        edge.set_attr('time', [ self.tick() ])
+        graph.transfer_ammount(edge, edge_ammount)
+        graph.add_node_ammount(current_node, edge_ammount)
+        time = self.tick()
+        self.record_balance_change(graph, prev_node, time, -edge_ammount)
+        self.record_balance_change(graph, current_node, time, edge_ammount)
+        edge.set_attr('time', [ time ])
         edge.set_attr('pct', 0.0)
         
-    def handle_account_transfer(self, graph, entry):
-        orig_src_label = entry.src
-        orig_dst_label = entry.dst
-        src_label = self.get_remapped_label(orig_src_label)
-        dst_label = self.get_remapped_label(orig_dst_label)
-        src_node = graph.get_node_by_label(src_label)
-        dst_node = graph.get_node_by_label(dst_label)
-        edge = graph.get_edge(src_label, dst_label)
+    def handle_account_transfer(self, graph, orig_dst_label, orig_src_label, ammount):
+        src_node = graph.get_node_by_id(self.accounts.get_node_id(orig_src_label))
+        dst_node = graph.get_node_by_id(self.accounts.get_node_id(orig_dst_label))
+        edge = graph.get_edge_by_ids(src_node.node_id, dst_node.node_id)
         if edge is not None:
             # existing edge does not add a cycle
-            edge_ammount = edge.get_attr('ammount') + entry.ammount
-            edge.set_attr('ammount', edge_ammount)
             time = self.tick()
             edge.get_attr('time').append(time)
         else:
             # try to create the edge
-            edge = graph.add_edge(src_label, dst_label)
+            edge = graph.add_edge_by_ids(src_node.node_id, dst_node.node_id)
             while edge is None:
                 # a cycle would be created
-                dst_label = self.add_remapped_label(orig_dst_label)
-                dst_node = self.add_node_if_needed(graph, dst_label) # wll always create the node
+                dst_node = self.add_account_version(graph, orig_dst_label)
                 self.transfer_ammount_through_time(graph, orig_dst_label) # transfer the all the remaining balance to the new node
-                edge = graph.add_edge(src_label, dst_label)
-            edge.set_attr('ammount', entry.ammount)
+                edge = graph.add_edge_by_ids(src_node.node_id, dst_node.node_id)
             time = self.tick()
             edge.set_attr('time', [time])
         
-        # update the balance of the source node
-        src_ammount = src_node.get_attr('ammount') - entry.ammount
-        src_node.set_attr('ammount', src_ammount)        
+        # move the ammount from the balance of the source node to the edge
+        graph.transfer_ammount(edge, ammount)
+        self.record_balance_change(graph, src_node, time, -ammount)
         # update the total transferred ammount of the source node
-        transf_ammount = src_node.get_attr('transferred_ammount') + entry.ammount
+        transf_ammount = src_node.get_attr('transferred_ammount') + ammount
         src_node.set_attr('transferred_ammount', transf_ammount)
         # update the balace of the destination node
-        dst_ammount = dst_node.get_attr('ammount') + entry.ammount
-        dst_node.set_attr('ammount', dst_ammount)
+        graph.add_node_ammount(dst_node, ammount)
+        self.record_balance_change(graph, dst_node, time, ammount)
         # update the total received ammount of the destination node
-        received_ammount = dst_node.get_attr('received_ammount') + entry.ammount
+        received_ammount = dst_node.get_attr('received_ammount') + ammount
         dst_node.set_attr('received_ammount', received_ammount)
         
+    def record_balance_change(self, graph, node, time, delta):
+        graph.get_attr('balance_index').record(node.node_id, time, delta)
+        
     def create_graph(self, entries):
+        # entries is an AccEntryList, walked as codes into its interned labels
         logger.info('creating graph')
-        label_remappings = {}
         graph = Graph('Test graph', allow_cycles=False)
+        # every change of the node 'ammount' attributes, to answer balance queries at any tick
+        graph.set_attr('balance_index', BalanceIndex())
 
-        for entry in entries:
-            self.add_node_if_needed(graph, entry.src)
-            self.add_node_if_needed(graph, entry.dst)
-            if entry.src is None:
-                self.handle_direct_loading(graph, entry)
+        labels = entries.labels
+        for dst_code, src_code, ammount in entries.iter_codes():
+            dst_label = labels[dst_code]
+            src_label = None if src_code == entries.NO_SRC else labels[src_code]
+            self.add_node_if_needed(graph, src_label)
+            self.add_node_if_needed(graph, dst_label)
+            if src_label is None:
+                self.handle_direct_loading(graph, dst_label, ammount)
             else:
-                self.handle_account_transfer(graph, entry)
+                self.handle_account_transfer(graph, dst_label, src_label, ammount)
         return graph
             
-    def report_entries(self, xlsx_writer, entries):
+    ENTRY_COLUMNS = {
+        'DESTINO'                   : 'str'
+    ,   'ORIGEM'                    : 'str'
+    ,   'VALOR'                     : 'float'
+    }
+    BALANCE_COLUMNS = {
+        'ORIGEM'                    : 'str'
+    ,   'ENTRADA_DIRETA'            : 'float'
+    ,   'SALDO'                     : 'float'
+    }
+    PATH_COLUMNS = {
+        'CAMINHO'                   : 'int'
+    ,   'ORIGEM'                    : 'str'
+    ,   'DESTINO'                   : 'str'
+    ,   'PERCENTUAL'                : 'float'
+    ,   'ENTRADA_DIRETA_ORIGEM'     : 'float'
+    ,   'ENTRADA_INDIRETA_ORIGEM'   : 'float'
+    ,   'REPASSE_RESULTANTE'        : 'float'
+    ,   'MIN_T'                     : 'int'
+    ,   'MAX_T'                     : 'int'
+    }
+    SEGMENT_COLUMNS = {
+        'CAMINHO'                   : 'int'
+    ,   'ORIGEM'                    : 'str'
+    ,   'DESTINO'                   : 'str'
+    ,   'PERCENTUAL'                : 'float'
+    ,   'ENTRADA_DIRETA_ORIGEM'     : 'float'
+    ,   'REPASSE_RESULTANTE'        : 'float'
+    ,   'MIN_T'                     : 'int'
+    ,   'MAX_T'                     : 'int'
+    ,   'SEGMENTO'                  : 'int'
+    ,   'SEG_ORIGEM'                : 'str'
+    ,   'SEG_DESTINO'               : 'str'
+    ,   'SEG_PERCENTUAL'            : 'float'
+    ,   'SEG_MIN_T'                 : 'int'
+    ,   'SEG_MAX_T'                 : 'int'
+    }
+    SEGMENT_TABLE_COLUMNS = {
+        'SEGMENTO_ID'               : 'int'
+    ,   'SEG_ORIGEM'                : 'str'
+    ,   'SEG_DESTINO'               : 'str'
+    ,   'SEG_PERCENTUAL'            : 'float'
+    ,   'SEG_MIN_T'                 : 'int'
+    ,   'SEG_MAX_T'                 : 'int'
+    }
+    PATH_SEGMENT_COLUMNS = {
+        'CAMINHO'                   : 'int'
+    ,   'SEGMENTO'                  : 'int'
+    ,   'SEGMENTO_ID'               : 'int'
+    }
+    ORIGIN_COLUMNS = {
+        'ORIGEM'                    : 'str'
+    ,   'DESTINO'                   : 'str'
+    ,   'PERCENTUAL'                : 'float'
+    ,   'ENTRADA_DIRETA_ORIGEM'     : 'float'
+    ,   'REPASSE_RESULTANTE'        : 'float'
+    ,   'CAMINHOS'                  : 'int'
+    }
+    
+    def report_entries(self, report, entries):
         # TODO: move to presenter
         logger.info('generating accounting entries sheet')
-        columns = { 'DESTINO': [], 'ORIGEM': [], 'VALOR': [] }
+        table = report.open_table('PARTIDAS', self.ENTRY_COLUMNS)
         for entry in entries:
-            columns['DESTINO'].append(entry.dst)
-            columns['ORIGEM'].append(entry.src)
-            columns['VALOR'].append(entry.ammount)
-        df_entries = pd.DataFrame(columns)
-        df_entries.to_excel(xlsx_writer, sheet_name='PARTIDAS')
+            table.append_row([ entry.dst, entry.src, entry.ammount ])
+        table.close()
 
-    def report_balances(self, xlsx_writer, graph):
+    def report_balances(self, report, graph):
         # TODO: move to presenter
         logger.info('generating balance sheet')
-        columns = {
-            'ORIGEM'                : []
-        ,   'ENTRADA_DIRETA'        : []
-        ,   'SALDO'                 : []
-        }
+        table = report.open_table('SALDOS', self.BALANCE_COLUMNS)
         for node in graph.nodes:
-            columns['ORIGEM'        ].append(node.label)
-            columns['ENTRADA_DIRETA'].append(node.get_attr('inputed_ammount'))
-            columns['SALDO'         ].append(node.get_attr('ammount'))
-        df_entries = pd.DataFrame(columns)
-        df_entries.to_excel(xlsx_writer, sheet_name='SALDOS')
+            table.append_row([
+                node.label
+            ,   node.get_attr('inputed_ammount')
+            ,   node.get_attr('ammount')
+            ])
+        table.close()
         
-    def report_paths(self, xlsx_writer, paths):
+    def add_path_row(self, table, path_id, path):
+        pct = path.pct 
+        table.append_row([
+            path_id + 1
+        ,   path.from_label
+        ,   path.to_label
+        ,   pct * 100
+        ,   path.inputed_ammount
+        ,   path.received_ammount
+        ,   (path.received_ammount + path.inputed_ammount * pct)
+        ,   path.min_t
+        ,   path.max_t
+        ])
+    
+    def add_segment_rows(self, table, path_id, path):
+        # the segments of a path are materialized once
+        for segment_id, segment in enumerate(path.segments):
+            table.append_row([
+                path_id + 1
+            ,   path.from_label
+            ,   path.to_label
+            ,   path.pct * 100.0
+            ,   path.inputed_ammount
+            ,   path.inputed_ammount * path.pct
+            ,   path.min_t
+            ,   path.max_t
+            ,   segment_id + 1
+            ,   segment.from_label
+            ,   segment.to_label
+            ,   segment.pct * 100.0
+            ,   segment.min_t
+            ,   segment.max_t
+            ])
+    
+    def add_path_segment_rows(self, segment_table, link_table, segment_ids, path_id, path):
+        # paths share their segments, and the segments of different paths are often equal: every
+        # distinct segment gets a row the first time it is seen, and the paths only link to it.
+        # segment_ids maps the segment fields to the SEGMENTO_ID
+        for position, segment in enumerate(path.segments):
+            key = (segment.from_key, segment.to_key, segment.pct, segment.min_t, segment.max_t)
+            segment_id = segment_ids.get(key, None)
+            if segment_id is None:
+                segment_id = len(segment_ids) + 1
+                segment_ids[key] = segment_id
+                segment_table.append_row([
+                    segment_id
+                ,   segment.from_label
+                ,   segment.to_label
+                ,   segment.pct * 100.0
+                ,   segment.min_t
+                ,   segment.max_t
+                ])
+            link_table.append_row([ path_id + 1, position + 1, segment_id ])
+    
+    def report_normalized_paths(self, report, paths):
         # TODO: move to presenter
-        logger.info('generating paths sheet')
-        columns = {
-            'CAMINHO'                   : []
-        ,   'ORIGEM'                    : []
-        ,   'DESTINO'                   : []
-        ,   'PERCENTUAL'                : []
-        ,   'ENTRADA_DIRETA_ORIGEM'     : []
-        ,   'ENTRADA_INDIRETA_ORIGEM'   : []
-        ,   'REPASSE_RESULTANTE'        : []
-        ,   'MIN_T'                     : []
-        ,   'MAX_T'                     : []
-        }
+        # paths, distinct segments and the path -> segment links, filled in a single pass
+        logger.info('generating paths, segments and path segments sheets')
+        path_table = report.open_table('CAMINHOS', self.PATH_COLUMNS)
+        segment_table = report.open_table('SEGMENTOS', self.SEGMENT_TABLE_COLUMNS)
+        link_table = report.open_table('CAMINHOS_SEGMENTOS', self.PATH_SEGMENT_COLUMNS)
+        segment_ids = {}
         for path_id, path in enumerate(paths):
-            pct = path.pct 
-            columns['CAMINHO'                 ].append(path_id + 1)
-            columns['ORIGEM'                  ].append(path.from_label)
-            columns['DESTINO'                 ].append(path.to_label)
-            columns['PERCENTUAL'              ].append(pct * 100)
-            columns['ENTRADA_DIRETA_ORIGEM'   ].append(path.inputed_ammount)
-            columns['ENTRADA_INDIRETA_ORIGEM' ].append(path.received_ammount)
-            columns['REPASSE_RESULTANTE'      ].append((path.received_ammount + path.inputed_ammount * pct))
-            columns['MIN_T'                   ].append(path.min_t)
-            columns['MAX_T'                   ].append(path.max_t)
-            
-        df_entries = pd.DataFrame(columns)
-        df_entries.to_excel(xlsx_writer, sheet_name='CAMINHOS')
-
-    def report_segments(self, xlsx_writer, paths):
+            self.add_path_row(path_table, path_id, path)
+            self.add_path_segment_rows(segment_table, link_table, segment_ids, path_id, path)
+        path_table.close()
+        segment_table.close()
+        link_table.close()
+    
+    def report_paths(self, report, paths):
         # TODO: move to presenter
-        logger.info('generating segments sheet')
-        columns = {
-            'CAMINHO'               : []
-        ,   'ORIGEM'                : []
-        ,   'DESTINO'               : []
-        ,   'PERCENTUAL'            : []
-        ,   'ENTRADA_DIRETA_ORIGEM' : []
-        ,   'REPASSE_RESULTANTE'    : []
-        ,   'MIN_T'                 : []
-        ,   'MAX_T'                 : []
-        ,   'SEGMENTO'              : []
-        ,   'SEG_ORIGEM'            : []
-        ,   'SEG_DESTINO'           : []
-        ,   'SEG_PERCENTUAL'        : []
-        ,   'SEG_MIN_T'             : []
-        ,   'SEG_MAX_T'             : []
-        }
+        # paths may be a generator. The paths and segments sheets are filled in a single pass,
+        # so no path needs to be kept once its rows were added
+        logger.info('generating paths and segments sheets')
+        path_table = report.open_table('CAMINHOS', self.PATH_COLUMNS)
+        segment_table = report.open_table('SEGMENTOS', self.SEGMENT_COLUMNS)
         for path_id, path in enumerate(paths):
-            pct = path.pct 
-            for segment_id, segment in enumerate(path.segments):
-                pct = segment.pct
-                columns['CAMINHO'               ].append(path_id + 1)
-                columns['ORIGEM'                ].append(path.from_label)
-                columns['DESTINO'               ].append(path.to_label)
-                columns['PERCENTUAL'            ].append(path.pct * 100.0)
-                columns['ENTRADA_DIRETA_ORIGEM' ].append(path.inputed_ammount)
-                columns['REPASSE_RESULTANTE'    ].append(path.inputed_ammount * path.pct)
-                columns['MIN_T'                 ].append(path.segments[0].min_t)
-                columns['MAX_T'                 ].append(path.segments[-1].max_t)
-                columns['SEGMENTO'              ].append(segment_id + 1)
-                columns['SEG_ORIGEM'            ].append(segment.from_label)
-                columns['SEG_DESTINO'           ].append(segment.to_label)
-                columns['SEG_PERCENTUAL'        ].append(segment.pct * 100.0)
-                columns['SEG_MIN_T'             ].append(segment.min_t)
-                columns['SEG_MAX_T'             ].append(segment.max_t)
-            
-        df_entries = pd.DataFrame(columns)
-        df_entries.to_excel(xlsx_writer, sheet_name='SEGMENTOS')
+            self.add_path_row(path_table, path_id, path)
+            self.add_segment_rows(segment_table, path_id, path)
+        path_table.close()
+        segment_table.close()
+        
+    def report_attributions(self, report, attributions):
+        # TODO: move to presenter
+        logger.info('generating origins sheet')
+        table = report.open_table('ORIGENS', self.ORIGIN_COLUMNS)
+        for attribution in attributions:
+            table.append_row([
+                attribution.from_label
+            ,   attribution.to_label
+            ,   attribution.pct * 100.0
+            ,   attribution.inputed_ammount
+            ,   attribution.resulting_ammount
+            ,   attribution.path_count
+            ])
+        table.close()
         
-    def report_result(self, graph, sink_label, entries):
+    def report_residuals(self, report, graph, sink_label, bounds):
+        # TODO: move to presenter
+        logger.info(f"generating residuals sheet, {bounds.pruned_count} paths pruned")
+        table = report.open_table('RESIDUOS', self.ORIGIN_COLUMNS)
+        for node in graph.nodes:
+            if node.label not in bounds.residual_pcts:
+                continue
+            pct = bounds.residual_pcts[node.label]
+            table.append_row([
+                node.label
+            ,   sink_label
+            ,   pct * 100.0
+            ,   node.get_attr('inputed_ammount')
+            ,   bounds.residual_ammounts[node.label]
+            ,   bounds.residual_counts[node.label]
+            ])
+        table.close()
+        
+    def get_sink_file_name(self, file_name, sink_label):
+        if len(self.sink_labels) == 1:
+            return file_name
+        suffix = ".gz" if file_name.endswith(".gz") else ""
+        root, ext = os.path.splitext(file_name[:len(file_name) - len(suffix)])
+        return f"{root}_{sink_label}{ext}{suffix}"
+    
+    def report_result(self, graph, sink_label, entries, paths=None):
         # TODO: move to presenter
         presenter = GraphPresenter(graph)
         presenter.compute_pcts()
         
-        logger.info('creating path report')
-        paths = graph.build_paths(sink_label)
-        xlsx_writer = pd.ExcelWriter(self.path_report)
-        # write accouting entries
-        self.report_entries(xlsx_writer, entries)
-        self.report_balances(xlsx_writer, graph)
-        self.report_paths(xlsx_writer, paths)
-        self.report_segments(xlsx_writer, paths)
-        xlsx_writer.save()
+        # the backend is picked by the extension of the report
+        with open_report(self.get_sink_file_name(self.path_report, sink_label)) as report:
+            # write accouting entries
+            self.report_entries(report, entries)
+            self.report_balances(report, graph)
+            if self.mode == "attribution":
+                logger.info('creating attribution report')
+                attributions = graph.attribute_to_sink(sink_label)
+                self.report_attributions(report, attributions)
+            else:
+                logger.info(f"creating path report for '{sink_label}'")
+                if paths is None:
+                    paths = graph.iter_paths(sink_label, self.workers, bounds=self.bounds)
+                if self.normalized:
+                    self.report_normalized_paths(report, paths)
+                else:
+                    self.report_paths(report, paths)
+                if self.bounds is not None:
+                    self.report_residuals(report, graph, sink_label, self.bounds)
 
         logger.info(f'generating dotfile')
-        with open(self.dot_file, "w") as fh:
-            print(presenter.generate_dot(), file=fh)
+        with open_dot_file(self.get_sink_file_name(self.dot_file, sink_label)) as fh:
+            presenter.write_dot(fh, sink_label if self.dot_ancestors else None)
         
     
     def run(self):
         logger.info('starting loader - version %d.%d.%d', *self.VERSION)    
         entries = self.get_entries()
         graph = self.create_graph(entries)
-        self.report_result(graph, sink_label=self.sink_label, entries=entries)
+        logger.info('freezing graph')
+        graph = graph.freeze()
+        for sink_label, paths in graph.iter_paths_many(self.sink_labels, self.workers, self.bounds):
+            self.report_result(graph, sink_label=sink_label, entries=entries, paths=paths)
         logger.info('finished')
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser()
-    parser.add_argument('entries_file', type=str, help='spread sheet of accouting entries')
+    parser.add_argument('entries_file', type=str, help='accouting entries: file.xlsx[:sheet], file.csv or file.parquet')
     parser.add_argument('sink_label',   type=str, help='sink node label')
-    parser.add_argument('dot_file',     type=str, help='dot file name')
-    parser.add_argument('path_report',  type=str, help='path report file name')
+    parser.add_argument('dot_file',     type=str, help='dot file name, file.dot or file.dot.gz')
+    parser.add_argument('path_report',  type=str, help='path report file name: file.xlsx, file.csv, file.parquet or file.arrow')
+    parser.add_argument('--mode',       type=str, default='paths', choices=App.MODES, help='report every path or only the aggregated attribution of each origin')
+    parser.add_argument('--sinks',      type=str, nargs='+', default=[], help='more sink node labels, reported from the same graph')
+    parser.add_argument('--workers',    type=int, default=None, help='number of processes building the paths')
+    parser.add_argument('--min-pct',    type=float, default=None, help='prune the paths carrying less than this percentual of the sink')
+    parser.add_argument('--max-depth',  type=int, default=None, help='prune the paths with more segments')
+    parser.add_argument('--max-paths',  type=int, default=None, help='stop after reporting this many paths')
+    parser.add_argument('--time-budget', type=float, default=None, help='stop building paths after this many seconds')
+    parser.add_argument('--dot-ancestors', action='store_true', help='only write the nodes and edges that reach the sink to the dot file')
+    parser.add_argument('--normalized', action='store_true', help='write every distinct segment once and link the paths to them')
     args = parser.parse_args()
-    app = App(args.entries_file, args.sink_label, args.dot_file, args.path_report)
+    bounds = None
+    if any(value is not None for value in [ args.min_pct, args.max_depth, args.max_paths, args.time_budget ]):
+        if args.workers is not None and args.workers > 1:
+            parser.error('bounded path reports are built by a single process')
+        min_pct = 0.0 if args.min_pct is None else args.min_pct / 100.0
+        bounds = PathBounds(min_pct, args.max_depth, args.max_paths, args.time_budget)
+    app = App(args.entries_file, [ args.sink_label ] + args.sinks, args.dot_file, args.path_report, mode=args.mode, workers=args.workers, bounds=bounds, dot_ancestors=args.dot_ancestors, normalized=args.normalized)
     app.run()
\ No newline at end of file
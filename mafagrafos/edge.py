@@ -2,7 +2,7 @@ import copy
 
 class Edge:
     
-    __slots__ = ['from_id', 'to_id', 'label', 'data', 'graph']
+    __slots__ = ['from_id', 'to_id', 'label', 'data', 'graph', 'edge_id', 'store']
     
     def __init__(self, from_id, to_id, label, data=None):
         assert from_id >= 0
@@ -12,6 +12,8 @@ class Edge:
         self.label      = label if label else None
         self.data       = data if data else {}
         self.graph      = None
+        self.edge_id    = None # position of the edge in the graph insertion order, set once it is added
+        self.store      = None # column store holding the typed attributes of the edge, if any
     
     def __eq__(self, other):
         if other is None:
@@ -19,7 +21,7 @@ class Edge:
         return  self.from_id == other.from_id and \
                 self.to_id   == other.to_id   and \
                 self.label   == other.label   and \
-                self.data    == other.data    and \
+                self.get_data() == other.get_data() and \
                 self.graph   == other.graph
     
     def __str__(self):
@@ -29,13 +31,45 @@ class Edge:
         return str(self)
     
     def get_data(self):
-        return self.data
+        if self.store is None:
+            return self.data
+        result = dict(self.data)
+        for attr in self.store.columns:
+            value = self.store.get(attr, self.edge_id)
+            if value == value: # unset float attributes are NaN
+                result[attr] = value
+        return result
     
     def get_attr(self, attr):
+        store = self.store
+        if store is not None and attr in store.columns:
+            value = store.columns[attr][self.edge_id]
+            return value if value == value else None # unset float attributes are NaN
         return self.data.get(attr, None)
         
     def set_attr(self, attr, value):
-        self.data[attr] = value
+        if attr == 'ammount' and self.graph is not None:
+            # the graph keeps the out sums of the nodes
+            self.graph.set_edge_ammount(self, value)
+        else:
+            self.store_attr(attr, value)
+    
+    def store_attr(self, attr, value):
+        # set_attr bypassing the graph
+        store = self.store
+        if store is not None and attr in store.columns:
+            store.columns[attr][self.edge_id] = value
+        else:
+            self.data[attr] = value
+    
+    def attach_store(self, store, edge_id):
+        # move the typed attributes of the edge into the store
+        assert self.store is None
+        self.store = store
+        self.edge_id = edge_id
+        for attr in store.columns:
+            if attr in self.data:
+                store.set(attr, edge_id, self.data.pop(attr))
     
     def edge_key(self):
         return (self.from_id, self.to_id)
@@ -0,0 +1,102 @@
+import os
+import csv
+
+from mafagrafos.acc_entry import AccEntry
+
+# ledgers hold one accounting entry per row: destination, source (empty for a direct loading) and
+# ammount, after a header row. The format is picked by the extension of the file, and every reader
+# streams the rows in chunks, so the memory in use does not depend on the size of the ledger
+
+DEFAULT_CHUNK_SIZE = 10000
+
+def split_sheet_name(entries_file):
+    # 'ledger.xlsx:sheet' -> ('ledger.xlsx', 'sheet'). Only the last colon after a known extension
+    # separates the sheet, so drive letters are kept
+    path, sep, sheet_name = entries_file.rpartition(':')
+    if sep and get_extension(path) in READERS:
+        return path, sheet_name
+    return entries_file, None
+
+def get_extension(path):
+    return os.path.splitext(path)[1].lower()
+
+def parse_ammount(value):
+    # integral ammounts are kept as int, as pandas did when the ledgers were read with read_excel
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str):
+        value = value.strip()
+        if value == "":
+            return None
+        try:
+            return int(value)
+        except ValueError:
+            return float(value)
+    return value
+
+def read_xlsx_rows(path, sheet_name, chunk_size):
+    # read only mode parses the sheet as it is iterated instead of loading the whole workbook
+    import openpyxl
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0] if sheet_name is None else workbook[sheet_name]
+        chunk = []
+        for row in sheet.iter_rows(min_row=2, max_col=3, values_only=True):
+            chunk.append(row)
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+    finally:
+        workbook.close()
+
+def read_csv_rows(path, sheet_name, chunk_size):
+    assert sheet_name is None
+    with open(path, newline='') as fh:
+        reader = csv.reader(fh)
+        next(reader, None) # header
+        chunk = []
+        for row in reader:
+            chunk.append([ None if value == "" else value for value in row[:3] ])
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+def read_parquet_rows(path, sheet_name, chunk_size):
+    # pyarrow is only needed for parquet ledgers
+    assert sheet_name is None
+    import pyarrow.parquet as pq
+    parquet_file = pq.ParquetFile(path)
+    columns = parquet_file.schema_arrow.names[:3]
+    for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns):
+        yield list(zip(*[ batch.column(i).to_pylist() for i in range(len(columns)) ]))
+
+READERS = {
+    '.xlsx'     : read_xlsx_rows
+,   '.xlsm'     : read_xlsx_rows
+,   '.csv'      : read_csv_rows
+,   '.parquet'  : read_parquet_rows
+}
+
+def iter_entries(entries_file, chunk_size=DEFAULT_CHUNK_SIZE):
+    # generator of the AccEntry of a ledger, in file order
+    path, sheet_name = split_sheet_name(entries_file)
+    reader = READERS.get(get_extension(path), None)
+    if reader is None:
+        raise ValueError(f"unsupported entries file '{entries_file}', expected one of {list(READERS.keys())}")
+    if sheet_name is not None and reader is not read_xlsx_rows:
+        raise ValueError(f"entries file '{entries_file}' names a sheet, only {[ ext for ext, ext_reader in READERS.items() if ext_reader is read_xlsx_rows ]} files have sheets")
+    for chunk in reader(path, sheet_name, chunk_size):
+        for row in chunk:
+            row = list(row) + [ None ] * (3 - len(row))
+            dst, src, ammount = row
+            if dst is None and src is None and ammount is None:
+                continue # blank row
+            yield AccEntry(
+                dst
+            ,   src if src else None
+            ,   parse_ammount(ammount)
+            )
@@ -0,0 +1,351 @@
+from array import array
+from bisect import bisect_left
+
+import numpy as np
+
+from mafagrafos.column_store import as_float_array
+
+from mafagrafos.path_builder import PathBuilder
+
+def make_column(values):
+    # float attributes are packed into a typed array, anything else is kept in a plain list
+    if values and all(type(value) is float for value in values):
+        return array('d', values)
+    return list(values)
+
+def set_column_value(columns, size, attr, idx, value):
+    column = columns.get(attr, None)
+    if column is None:
+        column = [None] * size
+        columns[attr] = column
+    elif isinstance(column, array) and type(value) is not float:
+        column = list(column)
+        columns[attr] = column
+    column[idx] = value
+
+class FrozenNode:
+    # lightweight view over the node arrays of a FrozenGraph. Views are created on demand and
+    # compare equal when they point to the same node of the same graph
+
+    __slots__ = ["graph", "node_id"]
+
+    def __init__(self, graph, node_id):
+        assert 0 <= node_id < graph.next_node_id
+        self.graph      = graph
+        self.node_id    = node_id
+
+    def __eq__(self, other):
+        if other is None:
+            return False
+        return  self.graph      is other.graph      and \
+                self.node_id    == other.node_id
+
+    def __str__(self):
+        return f"<FrozenNode node_id={self.node_id}, label='{self.label}'>"
+
+    def __repr__(self):
+        return str(self)
+
+    @property
+    def label(self):
+        return self.graph.node_labels[self.node_id]
+
+    @property
+    def out_edges(self):
+        graph = self.graph
+        return graph.out_targets[graph.out_offsets[self.node_id]:graph.out_offsets[self.node_id + 1]]
+
+    @property
+    def in_edges(self):
+        graph = self.graph
+        return graph.in_sources[graph.in_offsets[self.node_id]:graph.in_offsets[self.node_id + 1]]
+
+    def iter_out_edge_ids(self):
+        # (to_id, edge_id) of every out edge, read lazily from the CSR row in the order of the
+        # mutable graph. The edge attributes are read from the columns by edge_id, with no view
+        graph = self.graph
+        start, end = graph.out_offsets[self.node_id], graph.out_offsets[self.node_id + 1]
+        return zip(graph.out_targets[start:end], graph.out_edge_ids[start:end])
+
+    def iter_in_edge_ids(self):
+        # (from_id, edge_id) of every in edge, as iter_out_edge_ids
+        graph = self.graph
+        start, end = graph.in_offsets[self.node_id], graph.in_offsets[self.node_id + 1]
+        return zip(graph.in_sources[start:end], graph.in_edge_ids[start:end])
+
+    def out_edge_items(self):
+        # (to_id, FrozenEdge) of every out edge, the views are created as they are consumed
+        graph = self.graph
+        for to_id, edge_id in self.iter_out_edge_ids():
+            yield to_id, FrozenEdge(graph, edge_id)
+
+    def in_edge_items(self):
+        # (from_id, FrozenEdge) of every in edge, the views are created as they are consumed
+        graph = self.graph
+        for from_id, edge_id in self.iter_in_edge_ids():
+            yield from_id, FrozenEdge(graph, edge_id)
+
+    def get_data(self):
+        return { attr: column[self.node_id] for attr, column in self.graph.node_columns.items() }
+
+    def get_attr(self, attr):
+        column = self.graph.node_columns.get(attr, None)
+        return None if column is None else column[self.node_id]
+
+    def set_attr(self, attr, value):
+        set_column_value(self.graph.node_columns, self.graph.next_node_id, attr, self.node_id, value)
+
+    def has_out_edge(self, node_id):
+        assert node_id >= 0
+        return self.graph.find_edge_id(self.node_id, node_id) is not None
+
+    def has_in_edge(self, node_id):
+        assert node_id >= 0
+        return self.graph.find_edge_id(node_id, self.node_id) is not None
+
+class FrozenEdge:
+    # lightweight view over the edge arrays of a FrozenGraph. edge_id is the insertion order of the edge
+
+    __slots__ = ["graph", "edge_id"]
+
+    def __init__(self, graph, edge_id):
+        assert 0 <= edge_id < graph.edge_count
+        self.graph      = graph
+        self.edge_id    = edge_id
+
+    def __eq__(self, other):
+        if other is None:
+            return False
+        return  self.graph      is other.graph      and \
+                self.edge_id    == other.edge_id
+
+    def __str__(self):
+        return f"<FrozenEdge from_id={self.from_id}, node_id={self.to_id}, label='{self.label}'>"
+
+    def __repr__(self):
+        return str(self)
+
+    @property
+    def from_id(self):
+        return self.graph.edge_from[self.edge_id]
+
+    @property
+    def to_id(self):
+        return self.graph.edge_to[self.edge_id]
+
+    @property
+    def label(self):
+        labels = self.graph.edge_labels
+        return None if labels is None else labels[self.edge_id]
+
+    def get_data(self):
+        return { attr: column[self.edge_id] for attr, column in self.graph.edge_columns.items() }
+
+    def get_attr(self, attr):
+        column = self.graph.edge_columns.get(attr, None)
+        if column is None:
+            return None
+        value = column[self.edge_id]
+        return value if value == value else None # unset float attributes are NaN
+
+    def set_attr(self, attr, value):
+        set_column_value(self.graph.edge_columns, self.graph.edge_count, attr, self.edge_id, value)
+
+    def edge_key(self):
+        return (self.from_id, self.to_id)
+
+class FrozenNodes:
+    # read only sequence of node views, so that code iterating over graph.nodes keeps working
+
+    __slots__ = ["graph"]
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __len__(self):
+        return self.graph.next_node_id
+
+    def __getitem__(self, node_id):
+        if not 0 <= node_id < self.graph.next_node_id:
+            raise IndexError(node_id)
+        return FrozenNode(self.graph, node_id)
+
+    def __iter__(self):
+        for node_id in range(self.graph.next_node_id):
+            yield FrozenNode(self.graph, node_id)
+
+class FrozenGraph(PathBuilder):
+    # immutable, array backed copy of a Graph for the analytics that run once the graph is built.
+    # adjacency is stored in CSR form (int32 offsets/neighbours/edge id arrays) and every
+    # node and edge attribute lives in a column indexed by node_id/edge_id. The structure can not be
+    # changed, but attributes can still be set, as compute_pcts and the path builder do
+
+    __slots__ = [
+        "name", "allow_cycles", "next_node_id", "edge_count", "node_labels", "labels", "node_to_index", "index_to_node"
+    ,   "edge_from", "edge_to", "edge_labels", "out_offsets", "out_targets", "out_edge_ids", "out_lookup"
+    ,   "in_offsets", "in_sources", "in_edge_ids", "node_columns", "edge_columns", "data"
+    ]
+
+    def __init__(self, graph):
+        node_count = graph.next_node_id
+        self.name               = graph.name
+        self.allow_cycles       = graph.allow_cycles
+        self.next_node_id       = node_count
+        self.edge_count         = len(graph.edge_order)
+        self.node_labels        = [ node.label for node in graph.nodes ]
+        self.labels             = { label: node_id for node_id, label in enumerate(self.node_labels) }
+        self.node_to_index      = None if graph.allow_cycles else array('i', graph.node_to_index)
+        self.index_to_node      = None if graph.allow_cycles else array('i', graph.index_to_node)
+        self.data               = dict(graph.data)
+
+        edges = [ graph.edges[ edge_key ] for edge_key in graph.edge_order ]
+        self.edge_from          = array('i', [ edge.from_id for edge in edges ])
+        self.edge_to            = array('i', [ edge.to_id for edge in edges ])
+        edge_labels             = [ edge.label for edge in edges ]
+        self.edge_labels        = edge_labels if any(label is not None for label in edge_labels) else None
+
+        # adjacency rows keep the iteration order of the mutable graph, so that traversals visit the
+        # neighbours in exactly the same order. out_lookup holds, for each row, the slots of the row
+        # sorted by target node id for binary searches
+        edge_ids = { edge_key: edge_id for edge_id, edge_key in enumerate(graph.edge_order) }
+        self.out_offsets, self.out_targets, self.out_edge_ids = self._build_csr(
+            [ (node.node_id, to_id) for node in graph.nodes for to_id in node.out_edges ], edge_ids, 1
+        )
+        self.in_offsets, self.in_sources, self.in_edge_ids = self._build_csr(
+            [ (from_id, node.node_id) for node in graph.nodes for from_id in node.in_edges ], edge_ids, 0
+        )
+        self.out_lookup = array('i', range(self.edge_count))
+        for node_id in range(node_count):
+            start, end = self.out_offsets[node_id], self.out_offsets[node_id + 1]
+            if end - start > 1:
+                self.out_lookup[start:end] = array('i', sorted(self.out_lookup[start:end], key=self.out_targets.__getitem__))
+
+        self.node_columns       = self._build_columns([ node.data for node in graph.nodes ])
+        self.edge_columns       = self._build_columns([ edge.data for edge in edges ])
+        if graph.edge_store is not None:
+            for attr in graph.edge_store.columns:
+                self.edge_columns[attr] = graph.get_edge_column(attr).copy()
+
+    def _build_csr(self, edge_keys, edge_ids, neighbour_pos):
+        # edge_keys come grouped by row, so the offsets are a running count of the row sizes
+        node_count = self.next_node_id
+        row_pos = 1 - neighbour_pos
+        offsets = array('i', bytes(4 * (node_count + 1)))
+        for edge_key in edge_keys:
+            offsets[ edge_key[row_pos] + 1 ] += 1
+        for node_id in range(node_count):
+            offsets[node_id + 1] += offsets[node_id]
+        neighbours = array('i', [ edge_key[neighbour_pos] for edge_key in edge_keys ])
+        row_edge_ids = array('i', [ edge_ids[edge_key] for edge_key in edge_keys ])
+        return offsets, neighbours, row_edge_ids
+
+    def _build_columns(self, datas):
+        attrs = []
+        for data in datas:
+            for attr in data:
+                if attr not in attrs:
+                    attrs.append(attr)
+        return { attr: make_column([ data.get(attr, None) for data in datas ]) for attr in attrs }
+
+    def __str__(self):
+        return f"<FrozenGraph name='{self.name}>'"
+
+    def __repr__(self):
+        return f"<FrozenGraph name='{self.name}>'"
+
+    @property
+    def nodes(self):
+        return FrozenNodes(self)
+
+    def get_data(self):
+        return self.data
+
+    def get_attr(self, attr):
+        return self.data.get(attr, None)
+
+    def set_attr(self, attr, value):
+        self.data[attr] = value
+
+    def get_node_by_label(self, label):
+        # can return None
+        node_id = self.labels.get(label, None)
+        return None if node_id is None else FrozenNode(self, node_id)
+
+    def get_node_by_id(self, node_id):
+        assert 0 <= node_id < self.next_node_id
+        return FrozenNode(self, node_id)
+
+    def get_topo_index(self, node_id):
+        assert not self.allow_cycles
+        assert 0 <= node_id < self.next_node_id
+        return self.node_to_index[node_id]
+
+    def find_edge_id(self, from_id, to_id):
+        # binary search over the out adjacency of from_id
+        start, end = self.out_offsets[from_id], self.out_offsets[from_id + 1]
+        targets = self.out_targets
+        slot = bisect_left(self.out_lookup, to_id, start, end, key=targets.__getitem__)
+        if slot < end and targets[ self.out_lookup[slot] ] == to_id:
+            return self.out_edge_ids[ self.out_lookup[slot] ]
+        return None
+
+    def get_edge(self, from_label, to_label):
+        assert from_label
+        assert to_label
+        from_id = self.labels.get(from_label, None)
+        assert from_id is not None
+        to_id = self.labels.get(to_label, None)
+        assert to_id is not None
+        edge_id = self.find_edge_id(from_id, to_id)
+        return None if edge_id is None else FrozenEdge(self, edge_id)
+
+    def get_edge_by_ids(self, from_id, to_id):
+        # can return None. Skips the label lookups of get_edge
+        assert 0 <= from_id < self.next_node_id
+        assert 0 <= to_id < self.next_node_id
+        edge_id = self.find_edge_id(from_id, to_id)
+        return None if edge_id is None else FrozenEdge(self, edge_id)
+    
+    def has_edge(self, from_label, to_label):
+        return self.get_edge(from_label, to_label) is not None
+    
+    def has_edge_by_ids(self, from_id, to_id):
+        return self.get_edge_by_ids(from_id, to_id) is not None
+
+    def iter_ordered_edges(self):
+        for edge_id in range(self.edge_count):
+            yield FrozenEdge(self, edge_id)
+
+    def get_edge_column(self, attr):
+        # edge attribute column indexed by edge_id
+        return self.edge_columns[attr]
+
+    def get_edge_ends(self):
+        # (from_ids, to_ids) int arrays indexed by edge_id
+        return np.frombuffer(self.edge_from, dtype=np.int32), np.frombuffer(self.edge_to, dtype=np.int32)
+
+    def get_edge_values(self, attr):
+        # float64 array of an edge attribute indexed by edge_id, NaN where it is unset
+        column = self.edge_columns.get(attr, None)
+        if column is None:
+            return np.full(self.edge_count, np.nan)
+        return as_float_array(np.frombuffer(column, dtype=np.float64) if isinstance(column, array) else column)
+
+    def set_edge_values(self, attr, values):
+        # bulk set_attr of an edge attribute, values indexed by edge_id. Float arrays are kept as typed columns
+        assert len(values) == self.edge_count
+        if isinstance(values, np.ndarray) and values.dtype == np.float64:
+            self.edge_columns[attr] = array('d', values.tobytes())
+        else:
+            self.edge_columns[attr] = make_column(list(values))
+
+    def get_node_values(self, attr):
+        # float64 array of a node attribute indexed by node_id, NaN where it is unset
+        column = self.node_columns.get(attr, None)
+        if column is None:
+            return np.full(self.next_node_id, np.nan)
+        return as_float_array(np.frombuffer(column, dtype=np.float64) if isinstance(column, array) else column)
+    
+    def freeze(self):
+        # already frozen
+        return self
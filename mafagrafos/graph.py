@@ -1,57 +1,106 @@
+from collections import deque
+
+import numpy as np
+
 from mafagrafos.node import Node
 from mafagrafos.edge import Edge
-from mafagrafos.paths import Segment, Path
+from mafagrafos.column_store import ColumnStore, as_float_array
+from mafagrafos.path_builder import PathBuilder
 
 class StopSearch(Exception):pass
 
 class NodeVisitor:
-        
+    
+    __slots__ = ["graph", "marks", "epoch", "has_loop"]
+    
     def __init__(self, graph):
-        self.graph = graph
-        self.visited_set = set()
+        self.graph      = graph
+        # visited marks indexed by node_id. a node is visited when its mark equals the current epoch,
+        # so clearing all marks is just a matter of starting a new epoch
+        self.marks      = []
+        self.epoch      = 1
+        self.has_loop   = False
 
+    def _ensure_capacity(self, node_id):
+        missing = node_id + 1 - len(self.marks)
+        if missing > 0:
+            self.marks.extend([0] * missing)
+            
     def visit(self, node_id):
-        assert node_id not in self.visited_set
-        self.visited_set.add(node_id)
+        self._ensure_capacity(node_id)
+        assert self.marks[node_id] != self.epoch
+        self.marks[node_id] = self.epoch
         
     def unvisit(self, node_id):
-        assert node_id in self.visited_set
-        self.visited_set.remove(node_id)
+        assert self.has_visited(node_id)
+        self.marks[node_id] = 0
     
     def has_visited(self, node_id):
-        return node_id in self.visited_set
+        return node_id < len(self.marks) and self.marks[node_id] == self.epoch
         
     def clear_visited(self):
-        self.visited_set.clear()
+        # O(1) - marks from older epochs are simply ignored
+        self.epoch += 1
 
+    def add_edge(self, from_id, to_id):
+        # update the topological ordering after the edge from_id -> to_id has been linked to the graph.
+        # returns False when the edge closes a cycle, in which case the ordering is left untouched
+        # find the affected region of the topological ordering according with the MNR algorithm
+        lower_bound = self.graph.get_topo_index(to_id)
+        upper_bound = self.graph.get_topo_index(from_id)
+        if lower_bound >= upper_bound:
+            # the recently added edge did not alter the current topological sorting
+            # we are done for now
+            return True # edge added, no cycle was created
+        # if the topological sorting needs updating
+        self.clear_visited()
+        loop_created = self.dfs(to_id, upper_bound)
+        if loop_created:
+            return False
+        self.shift(lower_bound, upper_bound)
+        return True
+    
     def dfs(self, node_id, upper_bound):
         self.has_loop = False
         try:
             self._dfs(node_id, upper_bound)
             return False # loop was not created
         except StopSearch: 
+            self.has_loop = True
             return True # loop was created
             
     def _dfs(self, node_id, upper_bound):
         # DFS - Make a DFS traversal to mark all nodes reachable from node_id and mark
         #  all nodes affected by the edge insertion. These nodes will later get new
         #  topological indexes by means of the shift method.
+        # the traversal uses an explicit stack so that long chains do not hit the recursion limit
+        self._ensure_capacity(self.graph.next_node_id - 1)
+        marks = self.marks
+        epoch = self.epoch
+        nodes = self.graph.nodes
+        node_to_index = self.graph.node_to_index
         self.visit(node_id)
-        node = self.graph.get_node_by_id(node_id)
-        for succ_node_id in node.out_edges:
-            topo_idx = self.graph.get_topo_index(node_id)
+        stack = [node_id]
+        while stack:
+            node_id = stack.pop()
+            out_edges = nodes[node_id].out_edges
+            if not out_edges:
+                continue
+            topo_idx = node_to_index[node_id]
             if topo_idx == upper_bound: # should this be >= ???
                 # when a successor node has the same topo index as the upper bound of the
                 # affected area, it means that a cycle has been detected, so we should stop
                 # processing the adding of the edge to the graph                
                 raise StopSearch()
-            
-            if self.has_visited(succ_node_id):
-                # skip visited nodes
+            if topo_idx > upper_bound:
+                # nodes beyond the affected area are marked but not expanded
                 continue
-            
-            if topo_idx < upper_bound:
-                self._dfs(succ_node_id, upper_bound)
+            for succ_node_id in out_edges:
+                if marks[succ_node_id] == epoch:
+                    # skip visited nodes
+                    continue
+                marks[succ_node_id] = epoch
+                stack.append(succ_node_id)
     
     def shift(self, lower_bound, upper_bound):
         # Shift - Renumber the nodes so that the topological ordering is preserved
@@ -99,13 +148,84 @@ class NodeVisitor:
         self.graph.node_to_index[ node_id ] = topo_idx
         self.graph.index_to_node[ topo_idx ] = node_id
             
-class Graph:
+class PearceKellyVisitor(NodeVisitor):
+    # Pearce-Kelly: instead of renumbering the whole affected region, only the nodes reached by a
+    # forward search from to_node and a backward search from from_node trade their topological indexes
+    
+    __slots__ = []
     
-    __slots__ = ["name", "allow_cycles", "next_node_id", "nodes", "labels", "node_to_index", "index_to_node", "edges", "edge_order", "visitor", "data"]
+    def add_edge(self, from_id, to_id):
+        lower_bound = self.graph.get_topo_index(to_id)
+        upper_bound = self.graph.get_topo_index(from_id)
+        if lower_bound >= upper_bound:
+            return True
+        self.clear_visited()
+        self._ensure_capacity(self.graph.next_node_id - 1)
+        forward = self.forward_search(to_id, upper_bound)
+        if forward is None:
+            self.has_loop = True
+            return False
+        backward = self.backward_search(from_id, lower_bound)
+        self.reorder(backward, forward)
+        return True
+    
+    def forward_search(self, node_id, upper_bound):
+        # nodes reachable from node_id whose topological index is below upper_bound.
+        # returns None if the node at upper_bound is reachable, i.e. a cycle would be created
+        marks = self.marks
+        epoch = self.epoch
+        nodes = self.graph.nodes
+        node_to_index = self.graph.node_to_index
+        marks[node_id] = epoch
+        stack = [node_id]
+        reached = [node_id]
+        while stack:
+            node_id = stack.pop()
+            for succ_node_id in nodes[node_id].out_edges:
+                topo_idx = node_to_index[succ_node_id]
+                if topo_idx == upper_bound:
+                    return None
+                if topo_idx < upper_bound and marks[succ_node_id] != epoch:
+                    marks[succ_node_id] = epoch
+                    stack.append(succ_node_id)
+                    reached.append(succ_node_id)
+        return reached
+    
+    def backward_search(self, node_id, lower_bound):
+        # nodes reaching node_id whose topological index is above lower_bound.
+        # backward marks are the negated epoch so they never clash with the forward ones
+        marks = self.marks
+        epoch = -self.epoch
+        nodes = self.graph.nodes
+        node_to_index = self.graph.node_to_index
+        marks[node_id] = epoch
+        stack = [node_id]
+        reached = [node_id]
+        while stack:
+            node_id = stack.pop()
+            for pred_node_id in nodes[node_id].in_edges:
+                if node_to_index[pred_node_id] > lower_bound and marks[pred_node_id] != epoch:
+                    marks[pred_node_id] = epoch
+                    stack.append(pred_node_id)
+                    reached.append(pred_node_id)
+        return reached
+    
+    def reorder(self, backward, forward):
+        # the backward nodes take the lowest of the freed indexes and the forward nodes the highest ones,
+        # each group keeping its relative order
+        node_to_index = self.graph.node_to_index
+        backward.sort(key=node_to_index.__getitem__)
+        forward.sort(key=node_to_index.__getitem__)
+        affected = backward + forward
+        topo_idxs = sorted(node_to_index[node_id] for node_id in affected)
+        for node_id, topo_idx in zip(affected, topo_idxs):
+            self.allocate(node_id, topo_idx)
+
+class Graph(PathBuilder):
     
-    SHOW_PATH_BUILDING = False
+    __slots__ = ["name", "allow_cycles", "next_node_id", "nodes", "labels", "node_to_index", "index_to_node", "edges", "edge_order", "edge_store", "visitor", "out_sums", "data"]
     
-    def __init__(self, name, allow_cycles=False):
+    def __init__(self, name, allow_cycles=False, visitor_class=NodeVisitor, edge_columns=None):
         assert name
         self.name               = name
         self.allow_cycles       = allow_cycles # can't be changed
@@ -116,7 +236,12 @@ class Graph:
         self.index_to_node      = None if allow_cycles else []
         self.edges              = {}
         self.edge_order         = []
-        self.visitor            = None if allow_cycles else NodeVisitor(self)
+        # optional typed edge attributes stored column wise, as a { attr: dtype } schema
+        self.edge_store         = ColumnStore(edge_columns) if edge_columns else None
+        self.visitor            = None if allow_cycles else visitor_class(self) # incremental topological sorting strategy
+        # node_id -> 'ammount' of the node plus the 'ammount' of its out edges, kept by add_node_ammount
+        # and set_edge_ammount. It is the denominator of the pct of the out edges of the node
+        self.out_sums           = []
         self.data               = {}
         
     def __str__(self):
@@ -175,6 +300,8 @@ class Graph:
         node = self._create_node(self.next_node_id, label, data)
         self.nodes.append(node)
         self.labels[node.label] = node
+        ammount = node.get_attr('ammount')
+        self.out_sums.append(0.0 if ammount is None else ammount)
         self.next_node_id += 1
         assert len(self.nodes) == self.next_node_id
         if self.allow_cycles:
@@ -199,6 +326,10 @@ class Graph:
         edge_key = (from_node.node_id, to_node.node_id)
         return self.edges.get(edge_key, None)
     
+    def get_edge_by_ids(self, from_id, to_id):
+        # can return None. Skips the label lookups of get_edge
+        return self.edges.get((from_id, to_id), None)
+    
     def has_edge(self, from_label, to_label):
         assert from_label
         assert to_label
@@ -208,10 +339,153 @@ class Graph:
         assert to_node is not None
         return (from_node.node_id, to_node.node_id) in self.edges
     
+    def has_edge_by_ids(self, from_id, to_id):
+        return (from_id, to_id) in self.edges
+    
     def iter_ordered_edges(self):
         for edge_key in self.edge_order:
             yield self.edges[ edge_key ]
+    
+    def get_edge_column(self, attr):
+        # view over a typed edge attribute, indexed by edge_id
+        assert self.edge_store is not None and self.edge_store.has_column(attr)
+        return self.edge_store.column(attr)
+    
+    def add_node_ammount(self, node, ammount):
+        # adds ammount to the 'ammount' (balance) of node
+        node.store_attr('ammount', node.get_attr('ammount') + ammount)
+        self.out_sums[node.node_id] += ammount
+    
+    def set_node_ammount(self, node, ammount):
+        # every write of the 'ammount' (balance) of a node ends here: Node.set_attr, add_node_ammount
+        # and the data of add_node, so the out sum of the node follows it
+        prev_ammount = node.get_attr('ammount')
+        self.out_sums[node.node_id] += (0.0 if ammount is None else ammount) - (0.0 if prev_ammount is None else prev_ammount)
+        node.store_attr('ammount', ammount)
+    
+    def set_edge_ammount(self, edge, ammount):
+        # every write of the 'ammount' of an edge ends here: Edge.set_attr, set_edge_values and the
+        # data of add_edge/add_edges, so the out sum of the source node follows it
+        if edge.edge_id is not None: # the ammount of an edge being added is counted once it is accepted
+            prev_ammount = edge.get_attr('ammount')
+            self.out_sums[edge.from_id] += (0.0 if ammount is None else ammount) - (0.0 if prev_ammount is None else prev_ammount)
+        edge.store_attr('ammount', ammount)
+    
+    def transfer_ammount(self, edge, ammount):
+        # moves ammount from the balance of the source node of edge to the 'ammount' of the edge. The
+        # out sum of the node does not change, only how it is split between the node and its edges
+        self.add_node_ammount(self.nodes[edge.from_id], -ammount)
+        edge_ammount = edge.get_attr('ammount')
+        self.set_edge_ammount(edge, ammount if edge_ammount is None else edge_ammount + ammount)
+    
+    def get_out_sum(self, node_id):
+        assert 0 <= node_id < self.next_node_id
+        return self.out_sums[node_id]
+    
+    def get_edge_pct(self, edge):
+        # current pct of edge, in O(1), as compute_pcts would compute it from the ammounts changed
+        # through add_node_ammount and set_edge_ammount. The sums are accumulated in a different
+        # order, so both can differ in the last bits
+        return edge.get_attr('ammount') / self.out_sums[edge.from_id] * 100.0
+    
+    def get_edge_ends(self):
+        # (from_ids, to_ids) int arrays indexed by edge_id
+        edge_keys = np.array(self.edge_order, dtype=np.int64).reshape(-1, 2)
+        return edge_keys[:, 0], edge_keys[:, 1]
+    
+    def get_edge_values(self, attr):
+        # float64 array of an edge attribute indexed by edge_id, NaN where it is unset
+        if self.edge_store is not None and self.edge_store.has_column(attr):
+            return as_float_array(self.get_edge_column(attr))
+        return as_float_array([ edge.get_attr(attr) for edge in self.iter_ordered_edges() ])
+    
+    def set_edge_values(self, attr, values):
+        # bulk set_attr of an edge attribute, values indexed by edge_id
+        assert len(values) == len(self.edge_order)
+        if self.edge_store is not None and self.edge_store.has_column(attr):
+            if attr == 'ammount':
+                # what set_edge_ammount would add to the out sums, edge by edge
+                deltas = np.nan_to_num(as_float_array(values)) - np.nan_to_num(self.get_edge_values(attr))
+                from_ids, _ = self.get_edge_ends()
+                self.out_sums = (np.array(self.out_sums) + np.bincount(from_ids, weights=deltas, minlength=len(self.out_sums))).tolist()
+            self.get_edge_column(attr)[:] = values
+            return
+        if isinstance(values, np.ndarray):
+            values = values.tolist()
+        for edge, value in zip(self.iter_ordered_edges(), values):
+            edge.set_attr(attr, value)
+    
+    def get_node_values(self, attr):
+        # float64 array of a node attribute indexed by node_id, NaN where it is unset
+        return as_float_array([ node.get_attr(attr) for node in self.nodes ])
+    
+    def freeze(self):
+        # read only, array backed copy of the graph for the analytics that follow its construction
+        from mafagrafos.frozen_graph import FrozenGraph
+        return FrozenGraph(self)
             
+    def _link_edge(self, edge):
+        from_node = self.nodes[edge.from_id]
+        to_node = self.nodes[edge.to_id]
+        from_node.add_out_edge(to_node.node_id, edge)
+        to_node.add_in_edge(from_node.node_id, edge)
+        self.edges[ edge.edge_key() ] = edge
+
+    def _register_edge(self, edge):
+        # the edge has been accepted: give it an id and move its typed attributes to the column store
+        edge_id = len(self.edge_order)
+        self.edge_order.append(edge.edge_key())
+        if self.edge_store is None:
+            edge.edge_id = edge_id
+        else:
+            row_id = self.edge_store.append_row()
+            assert row_id == edge_id
+            edge.attach_store(self.edge_store, row_id)
+        ammount = edge.get_attr('ammount')
+        if ammount is not None:
+            self.out_sums[edge.from_id] += ammount
+
+    def _unlink_edge(self, edge):
+        from_node = self.nodes[edge.from_id]
+        to_node = self.nodes[edge.to_id]
+        from_node.del_out_edge(to_node.node_id)
+        to_node.del_in_edge(from_node.node_id)
+        del self.edges[ edge.edge_key() ]
+    
+    def _update_topo_order(self, edge):
+        # returns False when the already linked edge closes a cycle
+        return self.visitor.add_edge(edge.from_id, edge.to_id)
+    
+    def _sort_window(self, lower_bound, upper_bound):
+        # Kahn's algorithm restricted to the nodes occupying the topological indexes [lower_bound, upper_bound].
+        # Edges leaving or entering the window are already consistent with the ordering, so only
+        # the window needs to be renumbered. Returns the set of nodes that could not be sorted
+        # because they lie on (or downstream of) a cycle, in which case nothing is renumbered.
+        window = self.index_to_node[lower_bound:upper_bound + 1]
+        in_degrees = dict.fromkeys(window, 0)
+        for node_id in window:
+            for succ_node_id in self.nodes[node_id].out_edges:
+                if succ_node_id in in_degrees:
+                    in_degrees[succ_node_id] += 1
+        # seed the queue in the current topological order to keep the renumbering stable
+        ready = deque(node_id for node_id in window if in_degrees[node_id] == 0)
+        order = []
+        while ready:
+            node_id = ready.popleft()
+            order.append(node_id)
+            for succ_node_id in self.nodes[node_id].out_edges:
+                if succ_node_id not in in_degrees:
+                    continue
+                in_degrees[succ_node_id] -= 1
+                if in_degrees[succ_node_id] == 0:
+                    ready.append(succ_node_id)
+        if len(order) < len(window):
+            return set(window).difference(order)
+        for offset, node_id in enumerate(order):
+            self.node_to_index[ node_id ] = lower_bound + offset
+            self.index_to_node[ lower_bound + offset ] = node_id
+        return set()
+    
     def add_edge(self, from_label, to_label, edge_label=None, data=None, allow_cycles=False):
         assert from_label
         assert to_label
@@ -219,126 +493,74 @@ class Graph:
         assert from_node is not None
         to_node = self.get_node_by_label(to_label)
         assert to_node is not None
-        if from_node == to_node and not self.allow_cycles:
+        return self._add_edge(from_node, to_node, edge_label, data)
+    
+    def add_edge_by_ids(self, from_id, to_id, edge_label=None, data=None):
+        # add_edge for callers holding the node ids
+        return self._add_edge(self.get_node_by_id(from_id), self.get_node_by_id(to_id), edge_label, data)
+    
+    def _add_edge(self, from_node, to_node, edge_label, data):
+        if from_node is to_node and not self.allow_cycles:
             return None
 
         edge = self._create_edge(from_node, to_node, edge_label=edge_label, data=data)
-        from_node.add_out_edge(to_node.node_id)
-        to_node.add_in_edge(from_node.node_id)
-        edge_key = (from_node.node_id, to_node.node_id)
-        self.edges[ edge_key ] = edge
-        self.edge_order.append(edge_key)
-        if self.allow_cycles:
-            return edge
-            
-        # find the affected region of the topological ordering according with the MNR algorithm
-        lower_bound = self.get_topo_index(to_node.node_id)
-        upper_bound = self.get_topo_index(from_node.node_id)
-        if lower_bound >= upper_bound:
-            # the recently added edge did not alter the current topological sorting
-            # we are done for now
-            return edge # edge added, no cycle was created
-        # if the topological sorting needs updating
-        self.visitor.clear_visited()
-        loop_created = self.visitor.dfs(to_node.node_id, upper_bound)
-        if loop_created:
+        self._link_edge(edge)
+        if not self.allow_cycles and not self._update_topo_order(edge):
             # delete edge
-            from_node.del_out_edge(to_node.node_id)
-            to_node.del_in_edge(from_node.node_id)
-            del self.edges[ edge_key ]
-            self.edge_order.pop(-1)
+            self._unlink_edge(edge)
             return None
-        self.visitor.shift(lower_bound, upper_bound)
-        #print(from_label, '->', to_label)
-        #print(self.node_to_index)
-        #print(self.index_to_node)
+        self._register_edge(edge)
         return edge
+    
+    def add_edges(self, batch):
+        # bulk insertion of (from_label, to_label, data) tuples. Returns a list aligned with
+        # the batch holding the created edge or None for the edges that were rejected, exactly
+        # as if add_edge had been called for each tuple in order.
+        result = [None] * len(batch)
+        lower_bound = self.next_node_id
+        upper_bound = -1
+        for i, (from_label, to_label, data) in enumerate(batch):
+            assert from_label
+            assert to_label
+            from_node = self.get_node_by_label(from_label)
+            assert from_node is not None
+            to_node = self.get_node_by_label(to_label)
+            assert to_node is not None
+            if from_node is to_node and not self.allow_cycles:
+                continue
+            edge = self._create_edge(from_node, to_node, data=data)
+            self._link_edge(edge)
+            result[i] = edge
+            if self.allow_cycles:
+                continue
+            # widen the affected region to cover every edge that goes against the current ordering
+            to_idx = self.get_topo_index(to_node.node_id)
+            from_idx = self.get_topo_index(from_node.node_id)
+            if to_idx < from_idx:
+                lower_bound = min(lower_bound, to_idx)
+                upper_bound = max(upper_bound, from_idx)
         
-    def build_paths(self, sink_label):
-        # graph is a DAG, so no cycles
-        assert not self.allow_cycles
-        head_node = self.get_node_by_label(sink_label)
-        assert head_node
-        curr_path = Path()
-        acc = []
-        self._build_path(head_node, None, None, curr_path, acc)
-        return acc
-        
-    def _build_path(self, head_node, edge, tail_node, curr_path, acc):
-        if self.SHOW_PATH_BUILDING:
-            print(head_node)
-            print(edge)
-            print(tail_node)
-            for segment in curr_path.segments:
-                print("\t", segment)
-            print()
-        
-        if curr_path.segment_count > 0 and not curr_path.is_temporally_consistent():
-            # if the head node is the head of a temporally inconsistent path.
-            # recompute the edge percentual taking into account the received_ammount of the tail_node
-            # and then pop off the head node from the path
-            
-            curr_path = None # throw away the current path and adjust the last added path
-            curr_path = acc[-1]
-            head_node = tail_node # previous head node
-            tail_node_label = curr_path.segments[0].to_label
-            tail_node = self.get_node_by_label(tail_node_label) # previous tail node
-            edge = self.get_edge(head_node.label, tail_node.label) # previous edge linking previous head node to tail node
-            assert edge
-            
-            # compute the edge pct of a temporally inconsistent node
-            edge_ammount        = edge.get_attr('ammount')
-            node_ammount        = head_node.get_attr('ammount')
-            received_ammount    = head_node.get_attr('received_ammount') # get inputed_ammount from all descending nodes
-            inputed_ammount     = head_node.get_attr('inputed_ammount')
-            transferred_ammount = head_node.get_attr('transferred_ammount')
-            #edge_pct            = edge_ammount / (node_ammount + received_ammount)
-            edges_sum           = transferred_ammount + inputed_ammount
-            # discount the received_ammount because it is has not happened yet
-            edges_sum          -= received_ammount 
-            edge_pct            = edge_ammount / edges_sum
-            
-            # the pct stored within the graph needs to be updated            
-            # TODO: put this in a saner place
-            edge_pct_txt = '{:.2f}%'.format(edge_pct*100.0) 
-            edge.set_attr('pct', edge_pct)
-            edge.set_attr('pct_txt', edge_pct_txt)
-            
-            curr_path.inputed_ammount   = inputed_ammount
-            curr_path.received_ammount  = received_ammount
-            curr_path.segments[0].pct   = edge_pct
-            # since the head not is not temporally consistent, stop building this path
-            # do not read the path to the accumulator
-            return
+        if upper_bound >= 0:
+            cyclic_nodes = self._sort_window(lower_bound, upper_bound)
+            if cyclic_nodes:
+                # every cycle runs through the unsorted nodes and, since the graph was a DAG before the
+                # batch, through at least one batch edge linking two of them. Only those edges can be
+                # rejected, so they are taken out and replayed in input order with the incremental algorithm.
+                candidates = []
+                for i, edge in enumerate(result):
+                    if edge is not None and edge.from_id in cyclic_nodes and edge.to_id in cyclic_nodes:
+                        self._unlink_edge(edge)
+                        candidates.append(i)
+                cyclic_nodes = self._sort_window(lower_bound, upper_bound)
+                assert not cyclic_nodes
+                for i in candidates:
+                    edge = result[i]
+                    self._link_edge(edge)
+                    if not self._update_topo_order(edge):
+                        self._unlink_edge(edge)
+                        result[i] = None
         
-        elif curr_path.segment_count > 0 and curr_path.is_temporally_consistent():
-            # if the head node is the head of a temporally consistent path.
-            # use the precomputed edge percentual. DO NOT take into account the received_ammount of the tail_node
-            curr_path.received_ammount  = 0.0
-            curr_path.inputed_ammount   = head_node.get_attr('inputed_ammount')
-            acc.append(curr_path)
-
-        # continue processing a temporally consistent path with 1 or more nodes in the path
-        old_path = curr_path
-        new_tail_node = head_node
-        for from_id in new_tail_node.in_edges:
-            # retrieve the start node of the edge
-            new_head_node = self.get_node_by_id(from_id)
-            assert new_head_node
-            # use the node label to retrieve the edge itself
-            edge = self.get_edge(new_head_node.label, new_tail_node.label)
-            assert edge
-            # retrieve the edge_pct
-            edge_pct = edge.get_attr('pct') / 100.0
-            assert edge_pct
-            # retrieve the fista and last transfer time from the edge
-            min_t = edge.get_attr('time')[0]
-            max_t = edge.get_attr('time')[-1]
-            assert min_t <= max_t
-            # create a new path cloning the old path 
-            curr_path = old_path.clone()
-            # push a new segment onto the first position of the current path
-            segment = Segment(new_head_node.label, new_tail_node.label, edge_pct, min_t, max_t)
-            curr_path.push_segment(segment)
-            self._build_path(new_head_node, edge, new_tail_node, curr_path, acc)
-        
\ No newline at end of file
+        for edge in result:
+            if edge is not None:
+                self._register_edge(edge)
+        return result
@@ -9,20 +9,22 @@ class Node:
         assert node_id >= 0
         self.node_id    = node_id # node_id is only
         self.label      = label
-        self.in_edges   = in_edges  if in_edges     else set()
-        self.out_edges  = out_edges if out_edges    else set()
+        # neighbour id -> Edge. The neighbours are iterated in the order their edges were added, the
+        # paths of a sink come out in that order. The amounts of the paths do not depend on it
+        self.in_edges   = in_edges  if in_edges     else {} # from_id -> Edge
+        self.out_edges  = out_edges if out_edges    else {} # to_id -> Edge
         self.data       = data      if data         else {}
         self.graph      = graph     if graph        else None
         
     def __eq__(self, other):
         if other is None:
             return False
-        return  self.label      == other.label      and \
-                self.node_id    == other.node_id    and \
-                self.in_edges   == other.in_edges   and \
-                self.out_edges  == other.out_edges  and \
-                self.data       == other.data       and \
-                self.graph      == other.graph
+        return  self.label              == other.label              and \
+                self.node_id            == other.node_id            and \
+                self.in_edges.keys()    == other.in_edges.keys()    and \
+                self.out_edges.keys()   == other.out_edges.keys()   and \
+                self.data               == other.data               and \
+                self.graph              == other.graph
     
     def __str__(self):
         return f"<Node node_id={self.node_id}, label='{self.label}'>"
@@ -37,6 +39,14 @@ class Node:
         return self.data.get(attr, None)
         
     def set_attr(self, attr, value):
+        if attr == 'ammount' and self.graph is not None:
+            # the graph keeps the out sums of the nodes
+            self.graph.set_node_ammount(self, value)
+        else:
+            self.store_attr(attr, value)
+    
+    def store_attr(self, attr, value):
+        # set_attr bypassing the graph
         self.data[attr] = value
         
     def has_out_edge(self, node_id):
@@ -47,22 +57,30 @@ class Node:
         assert node_id >= 0
         return node_id in self.in_edges
         
-    def add_out_edge(self, node_id):
+    def add_out_edge(self, node_id, edge=None):
         assert node_id >= 0
         assert node_id not in self.out_edges
-        self.out_edges.add(node_id)
+        self.out_edges[node_id] = edge
         # graph has the responsability to add the in edget
 
-    def add_in_edge(self, node_id):
+    def add_in_edge(self, node_id, edge=None):
         assert node_id >= 0
         assert node_id not in self.in_edges
-        self.in_edges.add(node_id)
+        self.in_edges[node_id] = edge
         # graph has the responsability to add the out edget
         
+    def out_edge_items(self):
+        # (to_id, Edge) of every out edge
+        return self.out_edges.items()
+
+    def in_edge_items(self):
+        # (from_id, Edge) of every in edge
+        return self.in_edges.items()
+        
     def del_out_edge(self, node_id):
         assert node_id in self.out_edges
-        self.out_edges.remove(node_id)
+        del self.out_edges[node_id]
         
     def del_in_edge(self, node_id):
         assert node_id in self.in_edges
-        self.in_edges.remove(node_id)
+        del self.in_edges[node_id]
@@ -0,0 +1,384 @@
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+
+from mafagrafos.paths import IdSegment, Path, Attribution
+
+# state of a path building worker process: the frozen graph and the pristine values of the edge
+# attributes the path builder patches, restored after every subtree
+_worker_graph = None
+_worker_columns = None
+_worker_expansions = None
+
+PATCHED_EDGE_ATTRS = [ 'pct', 'pct_txt' ]
+
+def _init_path_worker(graph):
+    global _worker_graph, _worker_columns, _worker_expansions
+    _worker_graph = graph
+    _worker_expansions = {}
+    _worker_columns = { attr: list(graph.edge_columns.get(attr, [ None ] * graph.edge_count)) for attr in PATCHED_EDGE_ATTRS }
+
+def _build_subtree_paths(sink_label, from_id):
+    # builds the paths of the subtree hanging from one in edge of the sink. Paths are returned as
+    # records (parent record index, segment fields, ammounts) so that they pickle flat and the
+    # shared suffixes can be rebuilt, and the patched pcts are returned as overrides instead of
+    # being left in the graph
+    graph = _worker_graph
+    overrides = []
+    head_node = graph.get_node_by_label(sink_label)
+    paths = list(graph._build_paths(head_node, Path(), [ from_id ], overrides, _worker_expansions))
+    indexes = {}
+    records = []
+    for idx, path in enumerate(paths):
+        link = path.head
+        indexes[id(link)] = idx
+        segment = link.segment
+        records.append((
+            indexes.get(id(link.next), -1)
+        ,   segment.from_id, segment.to_id, segment.pct, segment.min_t, segment.max_t
+        ,   path.inputed_ammount, path.received_ammount
+        ))
+    # leave the graph as the next subtree expects it
+    for from_id, to_id, _, _ in overrides:
+        edge = graph.get_edge_by_ids(from_id, to_id)
+        for attr in PATCHED_EDGE_ATTRS:
+            edge.set_attr(attr, _worker_columns[attr][edge.edge_id])
+    return records, overrides
+
+class PathBuilder:
+    # path enumeration shared by Graph and FrozenGraph. It only relies on the read API of the graph
+    # (get_node_by_label, get_node_by_id, get_edge_by_ids, the in_edge_items/out_edge_items adjacency of the
+    # nodes and the node/edge get_attr/set_attr methods).
+    # The paths are made of IdSegments, labels are only looked up when the paths are reported
+    
+    __slots__ = []
+    
+    SHOW_PATH_BUILDING = False
+    
+    def build_paths(self, sink_label, workers=None, bounds=None):
+        return list(self.iter_paths(sink_label, workers, bounds=bounds))
+    
+    def build_paths_many(self, sink_labels, workers=None):
+        # sink_label -> paths, each list the same build_paths would return on a fresh graph
+        return { sink_label: list(paths) for sink_label, paths in self.iter_paths_many(sink_labels, workers) }
+    
+    def iter_paths(self, sink_label, workers=None, expansions=None, bounds=None):
+        # bounds, a PathBounds, prunes the enumeration and collects the residual mass of the pruned
+        # paths. Bounded enumerations are sequential, the path limit and the time budget are global
+        # graph is a DAG, so no cycles
+        assert not self.allow_cycles
+        head_node = self.get_node_by_label(sink_label)
+        assert head_node
+        if expansions is None:
+            expansions = {}
+        if bounds is not None:
+            assert workers is None or workers <= 1
+            bounds.start()
+        if workers is not None and workers > 1:
+            yield from self._iter_paths_in_parallel(head_node, workers, expansions)
+            return
+        yield from self._build_paths(head_node, Path(), expansions=expansions, bounds=bounds)
+    
+    def iter_paths_many(self, sink_labels, workers=None, bounds=None):
+        # yields (sink_label, paths) for every sink. The expansions of the nodes upstream of a sink
+        # are kept for the sinks that follow, and the pcts patched while building the paths of a sink
+        # are restored before moving to the next one. The paths of a sink must be consumed before
+        # asking for the next sink, as must the residuals of bounds, which are reset for every sink
+        expansions = {}
+        pcts = [ (edge, edge.get_attr('pct'), edge.get_attr('pct_txt')) for edge in self.iter_ordered_edges() ]
+        for sink_label in sink_labels:
+            yield sink_label, self.iter_paths(sink_label, workers, expansions, bounds)
+            for edge, edge_pct, edge_pct_txt in pcts:
+                if edge.get_attr('pct') != edge_pct or edge.get_attr('pct_txt') != edge_pct_txt:
+                    edge.set_attr('pct', edge_pct)
+                    edge.set_attr('pct_txt', edge_pct_txt)
+    
+    def _iter_paths_in_parallel(self, head_node, workers, expansions):
+        # the subtrees hanging from the in edges of the sink are built by a pool of processes, each
+        # holding a frozen copy of the graph. A path only patches paths of its own subtree, but the
+        # patched pcts are stored in the edges and read by the subtrees that follow. The overrides
+        # are applied in the order of the sequential walk, and a subtree that went through an edge
+        # patched by a previous subtree is built again sequentially, so the result is the same
+        from_ids = list(head_node.in_edges)
+        overridden = set()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_path_worker, initargs=(self.freeze(),)) as executor:
+            results = executor.map(_build_subtree_paths, [ head_node.label ] * len(from_ids), from_ids)
+            for from_id, (records, overrides) in zip(from_ids, results):
+                if any((record[1], record[2]) in overridden for record in records):
+                    yield from self._build_paths(head_node, Path(), [ from_id ], expansions=expansions)
+                    continue
+                for from_id, to_id, edge_pct, edge_pct_txt in overrides:
+                    edge = self.get_edge_by_ids(from_id, to_id)
+                    edge.set_attr('pct', edge_pct)
+                    edge.set_attr('pct_txt', edge_pct_txt)
+                    overridden.add((from_id, to_id))
+                yield from self._rebuild_paths(records)
+    
+    def _rebuild_paths(self, records):
+        paths = []
+        root = Path()
+        for parent_idx, from_id, to_id, pct, min_t, max_t, inputed_ammount, received_ammount in records:
+            curr_path = (root if parent_idx < 0 else paths[parent_idx]).clone()
+            curr_path.push_segment(IdSegment(from_id, to_id, pct, min_t, max_t, self))
+            curr_path.inputed_ammount   = inputed_ammount
+            curr_path.received_ammount  = received_ammount
+            paths.append(curr_path)
+        return paths
+    
+    def _show_path_building(self, head_node, edge, tail_node, curr_path):
+        print(head_node)
+        print(edge)
+        print(tail_node)
+        for segment in curr_path.segments:
+            print("\t", segment)
+        print()
+        
+    def _expand(self, tail_node, in_edges):
+        # resolves the (from_id, edge) in edges of tail_node into (head node id, head node, edge, min_t, max_t) steps
+        steps = []
+        for from_id, edge in in_edges:
+            # retrieve the start node of the edge
+            head_node = self.get_node_by_id(from_id)
+            assert head_node
+            assert edge
+            # retrieve the fista and last transfer time from the edge
+            time = edge.get_attr('time')
+            min_t = time[0]
+            max_t = time[-1]
+            assert min_t <= max_t
+            steps.append((from_id, head_node, edge, min_t, max_t))
+        return steps
+    
+    def _get_expansion(self, tail_node, expansions):
+        # steps of the in edges of tail_node, memoized by node_id. The graph is walked once per path,
+        # so a node is expanded again for every path reaching it and for every sink it is upstream of.
+        # The pct is not part of the steps, it can be patched while the paths are built
+        steps = expansions.get(tail_node.node_id, None)
+        if steps is None:
+            steps = self._expand(tail_node, tail_node.in_edge_items())
+            expansions[tail_node.node_id] = steps
+        return steps
+    
+    def _build_paths(self, head_node, curr_path, in_edges=None, overrides=None, expansions=None, bounds=None):
+        # depth first walk over the in edges, driven by an explicit stack instead of recursion. The
+        # stack is not faster than the recursive walk, it only lifts the recursion limit off the
+        # depth of the paths, so long version chains can be walked. Each frame holds the iterator over
+        # the steps of a node still being expanded and the path that ends at that node. Paths are
+        # produced in the same order as the recursive walk would.
+        # in_edges restricts the walk to some of the in edges of head_node, overrides collects
+        # the pcts patched along the way, expansions memoizes the steps of the nodes and bounds prunes
+        # the temporally consistent extensions. Once bounds stops the enumeration, the remaining
+        # steps of the frames are still walked, without expanding them, to collect the residuals
+        if expansions is None:
+            expansions = {}
+        show_path_building = self.SHOW_PATH_BUILDING
+        get_expansion = self._get_expansion
+        upstream_sums = None
+        if show_path_building:
+            self._show_path_building(head_node, None, None, curr_path)
+        if in_edges is None:
+            steps = get_expansion(head_node, expansions)
+        else:
+            steps = self._expand(head_node, [ (from_id, self.get_edge_by_ids(from_id, head_node.node_id)) for from_id in in_edges ])
+        stack = [ (iter(steps), head_node, curr_path) ]
+        while stack:
+            steps, new_tail_node, old_path = stack[-1]
+            tail_id = new_tail_node.node_id
+            for from_id, new_head_node, edge, min_t, max_t in steps:
+                # retrieve the edge_pct
+                edge_pct = edge.get_attr('pct') / 100.0
+                assert edge_pct
+                # create a new path cloning the old path 
+                curr_path = old_path.clone()
+                # push a new segment onto the first position of the current path
+                segment = IdSegment(from_id, tail_id, edge_pct, min_t, max_t, self)
+                curr_path.push_segment(segment)
+                if show_path_building:
+                    self._show_path_building(new_head_node, edge, new_tail_node, curr_path)
+                
+                if not curr_path.is_temporally_consistent():
+                    # the path being extended was already patched when its frame was pushed,
+                    # stop building this path
+                    continue
+                
+                # if the head node is the head of a temporally consistent path.
+                # use the precomputed edge percentual. DO NOT take into account the received_ammount of the tail_node
+                curr_path.received_ammount  = 0.0
+                curr_path.inputed_ammount   = new_head_node.get_attr('inputed_ammount')
+                # if the head node is the head of a temporally inconsistent path, recompute the edge
+                # percentual taking into account the received_ammount of the head node. The path is
+                # patched before it is produced and before any longer path is cloned from it
+                new_steps = get_expansion(new_head_node, expansions)
+                if any(step[4] > max_t for step in new_steps):
+                    self._patch_path(new_head_node, curr_path, overrides)
+                # the bound sees the patched path, its residual is the mass of every path it heads
+                if bounds is not None and bounds.prune(curr_path):
+                    if upstream_sums is None:
+                        upstream_sums = self._get_upstream_sums(head_node)
+                    _, inputed_sum, received_sum, path_count = upstream_sums[(from_id, tail_id)]
+                    bounds.add_residual(curr_path, received_sum + inputed_sum * curr_path.pct, path_count)
+                    continue
+                yield curr_path
+                # continue processing a temporally consistent path with 1 or more nodes in the path.
+                # the remaining in edges of the current frame are resumed once the new frame is done
+                stack.append((iter(new_steps), new_head_node, curr_path))
+                break
+            else:
+                # every in edge of the node has been expanded
+                stack.pop()
+    
+    def _get_in_max_t(self, node):
+        # last transfer time of the in edges of node, None when it has none. The paths starting with
+        # an out edge older than that are patched
+        return max((edge.get_attr('time')[-1] for _, edge in node.in_edge_items()), default=None)
+    
+    def _get_patched_pct(self, head_node, edge):
+        # the edge pct of a temporally inconsistent node. It only depends on the edge and its
+        # source node, so every path starting with the edge is patched with the same pct
+        edge_ammount        = edge.get_attr('ammount')
+        received_ammount    = head_node.get_attr('received_ammount') # get inputed_ammount from all descending nodes
+        inputed_ammount     = head_node.get_attr('inputed_ammount')
+        transferred_ammount = head_node.get_attr('transferred_ammount')
+        #edge_pct            = edge_ammount / (node_ammount + received_ammount)
+        edges_sum           = transferred_ammount + inputed_ammount
+        # discount the received_ammount because it is has not happened yet
+        edges_sum          -= received_ammount 
+        return edge_ammount / edges_sum
+    
+    def _patch_path(self, head_node, curr_path, overrides=None):
+        # adjust the path ending at head_node, which has a temporally inconsistent in edge
+        tail_id = curr_path.first_segment.to_id # previous tail node
+        edge = self.get_edge_by_ids(head_node.node_id, tail_id) # previous edge linking previous head node to tail node
+        assert edge
+        
+        # compute the edge pct of a temporally inconsistent node
+        edge_pct = self._get_patched_pct(head_node, edge)
+        
+        # the pct stored within the graph needs to be updated            
+        # TODO: put this in a saner place
+        edge_pct_txt = '{:.2f}%'.format(edge_pct*100.0) 
+        edge.set_attr('pct', edge_pct)
+        edge.set_attr('pct_txt', edge_pct_txt)
+        if overrides is not None:
+            overrides.append((head_node.node_id, tail_id, edge_pct, edge_pct_txt))
+        
+        curr_path.inputed_ammount   = head_node.get_attr('inputed_ammount')
+        curr_path.received_ammount  = head_node.get_attr('received_ammount')
+        curr_path.set_first_segment_pct(edge_pct)
+    
+    def _get_upstream_sums(self, sink_node):
+        # for every edge f starting a temporally consistent path into sink_node, the sums over the
+        # consistent paths ending with f, f included: (pct of f, inputed ammounts weighted by the pct
+        # of the path up to f, received ammounts of the patched paths, number of paths). A pruned path
+        # P starting with f heads these paths, so they carry received + inputed * pct(P) of the sink.
+        # A reverse sweep finds the edges leading to the sink, then a forward topological sweep sums
+        # the in edges of every node, sorted by max_t, and the in edges a path through an out edge may
+        # start with are a prefix found by bisection. The pcts are patched as build_paths patches them
+        sink_id = sink_node.node_id
+        sink_idx = self.get_topo_index(sink_id)
+        latest = { sink_id: float('inf') } # node_id -> latest max_t of its out edges leading to the sink
+        for topo_idx in range(sink_idx - 1, -1, -1):
+            node = self.get_node_by_id(self.index_to_node[topo_idx])
+            for to_id, edge in node.out_edge_items():
+                max_t = edge.get_attr('time')[-1]
+                if to_id not in latest or max_t > latest[to_id]:
+                    continue # the edge does not lead to the sink
+                if node.node_id not in latest or max_t > latest[node.node_id]:
+                    latest[node.node_id] = max_t
+        sums = {}
+        for topo_idx in range(sink_idx):
+            node = self.get_node_by_id(self.index_to_node[topo_idx])
+            if node.node_id not in latest:
+                continue
+            ins = []
+            for from_id, edge in node.in_edge_items():
+                upstream = sums.get((from_id, node.node_id))
+                if upstream is not None:
+                    edge_pct, inputed_sum, received_sum, path_count = upstream
+                    ins.append((edge.get_attr('time')[-1], edge_pct * inputed_sum, received_sum, path_count))
+            ins.sort(key=lambda entry: entry[0])
+            max_ts = [ entry[0] for entry in ins ]
+            inputed_sums, received_sums, count_sums = [ 0.0 ], [ 0.0 ], [ 0 ]
+            for _, inputed_sum, received_sum, path_count in ins:
+                inputed_sums.append(inputed_sums[-1] + inputed_sum)
+                received_sums.append(received_sums[-1] + received_sum)
+                count_sums.append(count_sums[-1] + path_count)
+            in_max_t = self._get_in_max_t(node)
+            inputed_ammount = node.get_attr('inputed_ammount')
+            for to_id, edge in node.out_edge_items():
+                max_t = edge.get_attr('time')[-1]
+                if to_id not in latest or max_t > latest[to_id]:
+                    continue # the edge does not lead to the sink
+                patched = in_max_t is not None and max_t < in_max_t
+                edge_pct = self._get_patched_pct(node, edge) if patched else edge.get_attr('pct') / 100.0
+                prefix = bisect_right(max_ts, max_t)
+                received_ammount = node.get_attr('received_ammount') if patched else 0.0
+                sums[(node.node_id, to_id)] = (
+                    edge_pct
+                ,   inputed_ammount + inputed_sums[prefix]
+                ,   received_ammount + received_sums[prefix]
+                ,   1 + count_sums[prefix]
+                )
+        return sums
+    
+    def attribute_to_sink(self, sink_label):
+        # aggregated counterpart of build_paths: for every node reaching the sink, the summed percentual
+        # of all its temporally consistent paths into the sink. Instead of enumerating the paths, one
+        # reverse topological sweep computes, for every edge, the summed percentual of the consistent
+        # paths starting with that edge. A path may continue from an edge e into an edge e' only when
+        # max_t(e) <= max_t(e'), the same rule _build_path applies, so each node keeps its out edge
+        # sums sorted by max_t and the continuations of an in edge are a suffix sum found by bisection.
+        # runs in O((V + E) log E) regardless of the number of paths.
+        # The edges build_paths patches, those older than an in edge of their source node, take the
+        # patched pct, and the paths starting with them add the received_ammount of the node to the
+        # resulting ammount, so the attribution matches the aggregated paths
+        assert not self.allow_cycles
+        sink_node = self.get_node_by_label(sink_label)
+        assert sink_node
+        # node_id -> (sorted max_t of the out edges, suffix sums of the pcts, suffix sums of the path counts)
+        continuations = {}
+        result = []
+        for topo_idx in range(self.get_topo_index(sink_node.node_id), -1, -1):
+            node = self.get_node_by_id(self.index_to_node[topo_idx])
+            if node.node_id == sink_node.node_id:
+                continue
+            in_max_t = None
+            flows = []
+            patched_count = 0 # paths starting with a patched edge
+            for to_id, edge in node.out_edge_items():
+                if to_id != sink_node.node_id and to_id not in continuations:
+                    continue # the edge does not lead to the sink
+                if in_max_t is None:
+                    in_max_t = self._get_in_max_t(node)
+                max_t = edge.get_attr('time')[-1]
+                patched = in_max_t is not None and max_t < in_max_t
+                edge_pct = self._get_patched_pct(node, edge) if patched else edge.get_attr('pct') / 100.0
+                if to_id == sink_node.node_id:
+                    pct, path_count = edge_pct, 1
+                else:
+                    max_ts, pct_sums, count_sums = continuations[to_id]
+                    first = bisect_left(max_ts, max_t)
+                    if first == len(max_ts):
+                        continue # every continuation is temporally inconsistent
+                    pct, path_count = edge_pct * pct_sums[first], count_sums[first]
+                if patched:
+                    patched_count += path_count
+                flows.append((max_t, pct, path_count))
+            if not flows:
+                continue
+            flows.sort(key=lambda flow: flow[0])
+            pct_sums = [ 0.0 ] * len(flows)
+            count_sums = [ 0 ] * len(flows)
+            pct_sum, count_sum = 0.0, 0
+            for i in range(len(flows) - 1, -1, -1):
+                pct_sum += flows[i][1]
+                count_sum += flows[i][2]
+                pct_sums[i] = pct_sum
+                count_sums[i] = count_sum
+            continuations[node.node_id] = ([ flow[0] for flow in flows ], pct_sums, count_sums)
+            attribution = Attribution(node.label, sink_label, pct_sum, count_sum)
+            attribution.inputed_ammount = node.get_attr('inputed_ammount')
+            if patched_count:
+                attribution.received_ammount = node.get_attr('received_ammount') * patched_count
+            result.append(attribution)
+        result.sort(key=lambda attribution: self.get_node_by_label(attribution.from_label).node_id)
+        return result
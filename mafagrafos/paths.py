@@ -1,5 +1,8 @@
 from functools import reduce
 from operator import mul
+from time import perf_counter
+
+import numpy as np
 
 class Segment:
     
@@ -31,9 +34,70 @@ class Segment:
                self.min_t       == other.min_t      and \
                self.max_t       == other.max_t
     
+    @property
+    def from_key(self):
+        # what push_segment compares to chain segments
+        return self.from_label
+    
+    @property
+    def to_key(self):
+        return self.to_label
+    
     def clone(self):
         return self # I think I can share segments between paths
     
+class IdSegment:
+    # segment between two node ids of a graph, as the path builder creates them. The labels are only
+    # looked up in the graph when asked for, when the paths are reported
+    
+    __slots__ = ["from_id", "to_id", "pct", "min_t", "max_t", "graph"]
+    
+    def __init__(self, from_id, to_id, pct, min_t, max_t, graph):
+        assert from_id >= 0
+        assert to_id >= 0
+        assert from_id != to_id
+        assert min_t <= max_t
+        self.from_id    = from_id
+        self.to_id      = to_id
+        self.pct        = pct
+        self.min_t      = min_t
+        self.max_t      = max_t
+        self.graph      = graph
+    
+    def __str__(self):
+        return f"<IdSegment from_id={self.from_id}, to_id={self.to_id}, pct={self.pct}, max_t={self.max_t}>"
+    
+    def __repr__(self):
+        return str(self)
+    
+    def __eq__(self, other):
+        if other is None:
+            return False
+        return self.from_label  == other.from_label and \
+               self.to_label    == other.to_label   and \
+               self.pct         == other.pct        and \
+               self.min_t       == other.min_t      and \
+               self.max_t       == other.max_t
+    
+    @property
+    def from_label(self):
+        return self.graph.get_node_by_id(self.from_id).label
+    
+    @property
+    def to_label(self):
+        return self.graph.get_node_by_id(self.to_id).label
+    
+    @property
+    def from_key(self):
+        return self.from_id
+    
+    @property
+    def to_key(self):
+        return self.to_id
+    
+    def clone(self):
+        return self
+    
 class Path:
     
     __slots__ = ["from_label", "to_label", "segments", "segment_count", "inputed_ammount", "received_ammount"]
@@ -185,14 +249,25 @@ class Path:
             klass._build_path(new_head_node, edge, new_tail_node, curr_path, graph, acc)
     """
     
+class SegmentLink:
+    # cons cell of a path. next points toward the sink, so paths that only differ on their
+    # first segments share the links of their common suffix. pct caches the product of the segment
+    # percentuals from this link to the sink
+    
+    __slots__ = ["segment", "next", "pct"]
+    
+    def __init__(self, segment, next_link):
+        self.segment    = segment
+        self.next       = next_link
+        self.pct        = segment.pct if next_link is None else segment.pct * next_link.pct
+    
 class PathV2:
     
-    __slots__ = ["from_label", "to_label", "segments", "segment_count", "inputed_ammount", "received_ammount" ]
+    __slots__ = ["head", "last", "segment_count", "inputed_ammount", "received_ammount" ]
     
     def __init__(self):
-        self.from_label         = None
-        self.to_label           = None
-        self.segments           = []
+        self.head               = None # link of the first segment
+        self.last               = None # last segment, the one reaching the sink
         self.segment_count      = 0
         self.inputed_ammount    = 0.0
         self.received_ammount   = 0.0
@@ -212,30 +287,61 @@ class PathV2:
     #    self.segments.insert(0, segment) # this might be slow - O(n)
     #    self.segment_count += 1
     
+    @property
+    def from_label(self):
+        return None if self.head is None else self.head.segment.from_label
+    
+    @property
+    def to_label(self):
+        return None if self.last is None else self.last.to_label
+    
+    @property
+    def segments(self):
+        # materialized on demand, from the first segment to the one reaching the sink - O(n)
+        result = []
+        link = self.head
+        while link is not None:
+            result.append(link.segment)
+            link = link.next
+        return result
+    
+    @property
+    def first_segment(self):
+        assert self.segment_count > 0
+        return self.head.segment
+    
+    @property
+    def last_segment(self):
+        assert self.segment_count > 0
+        return self.last
+    
     def push_segment(self, segment):
-        assert self.segment_count == 0 or segment.to_label == self.from_label, (self.segment_count, segment.to_label, self.from_label)
-        self.segments.insert(0, segment) # this might be slow - O(n)
+        assert self.segment_count == 0 or segment.to_key == self.head.segment.from_key, (self.segment_count, segment.to_label, self.from_label)
+        self.head = SegmentLink(segment, self.head) # O(1), the rest of the path is shared
         self.segment_count += 1
-        self.from_label = segment.from_label
         if self.segment_count == 1:
-            self.to_label = segment.to_label
+            self.last = segment
+        
+    def set_first_segment_pct(self, pct):
+        # the path builder patches the first segment of a path before producing it. Only that link
+        # caches the old percentual: links pointing to it are created afterwards
+        link = self.head
+        link.segment.pct = pct
+        link.pct = pct if link.next is None else pct * link.next.pct
         
     def pop_segment(self):
         assert self.segment_count > 0
-        self.segments.pop(0)
+        self.head = self.head.next
         self.segment_count -= 1
         if self.segment_count == 0:
-            self.from_label = None
-            self.to_label = None
-        else:
-            self.from_label = self.segments[0].from_label
+            self.last = None
     
     def clone(self):
+        # O(1), the clone shares every link with this path
         result = Path()
-        result.from_label    = self.from_label
-        result.to_label      = self.to_label
+        result.head          = self.head
+        result.last          = self.last
         result.segment_count = self.segment_count
-        result.segments      = self.segments[:]
         return result
     
     def is_temporally_consistent(self):
@@ -243,22 +349,148 @@ class PathV2:
         assert self.segment_count >= 0
         if self.segment_count < 2:
             return True
-        max_t_head = self.segments[0].max_t
-        max_t_tail = self.segments[1].max_t
+        max_t_head = self.head.segment.max_t
+        max_t_tail = self.head.next.segment.max_t
         return max_t_head <= max_t_tail
 
     @property
     def pct(self):
-        return reduce(mul, [s.pct for s in self.segments ], 1.0)
+        # O(1), cached by the links as segments are pushed
+        return 1.0 if self.head is None else self.head.pct
 
     @property
     def min_t(self):
         assert self.segment_count > 0
-        return self.segments[0].min_t
+        return self.head.segment.min_t
     
     @property
     def max_t(self):
         assert self.segment_count > 0
-        return self.segments[-1].max_t
+        return self.last.max_t
         
-Path = PathV2        
\ No newline at end of file
+Path = PathV2
+
+def path_metrics(paths):
+    # metrics of a list or stream of paths, gathered in a single pass into NumPy arrays
+    # aligned with the order of the paths
+    pcts, min_ts, max_ts, inputed_ammounts, received_ammounts = [], [], [], [], []
+    for path in paths:
+        pcts.append(path.pct)
+        min_ts.append(path.min_t)
+        max_ts.append(path.max_t)
+        inputed_ammounts.append(path.inputed_ammount)
+        received_ammounts.append(path.received_ammount)
+    result = {
+        'pct'               : np.array(pcts, dtype=np.float64)
+    ,   'min_t'             : np.array(min_ts, dtype=np.int64)
+    ,   'max_t'             : np.array(max_ts, dtype=np.int64)
+    ,   'inputed_ammount'   : np.array(inputed_ammounts, dtype=np.float64)
+    ,   'received_ammount'  : np.array(received_ammounts, dtype=np.float64)
+    }
+    result['resulting_ammount'] = result['received_ammount'] + result['inputed_ammount'] * result['pct']
+    return result
+
+class Attribution:
+    # aggregation of all the temporally consistent paths from one origin into the sink
+    
+    __slots__ = ["from_label", "to_label", "pct", "path_count", "inputed_ammount", "received_ammount"]
+    
+    def __init__(self, from_label, to_label, pct, path_count):
+        assert from_label
+        assert to_label
+        self.from_label         = from_label
+        self.to_label           = to_label
+        self.pct                = pct
+        self.path_count         = path_count
+        self.inputed_ammount    = 0.0
+        self.received_ammount   = 0.0 # summed received_ammount of the patched paths
+    
+    def __str__(self):
+        return f"<Attribution from_label='{self.from_label}', to_label='{self.to_label}', pct={self.pct}, path_count={self.path_count}>"
+    
+    def __repr__(self):
+        return str(self)
+    
+    def __eq__(self, other):
+        if other is None:
+            return False
+        return self.from_label          == other.from_label         and \
+               self.to_label            == other.to_label           and \
+               self.pct                 == other.pct                and \
+               self.path_count          == other.path_count         and \
+               self.inputed_ammount     == other.inputed_ammount    and \
+               self.received_ammount    == other.received_ammount
+    
+    @property
+    def resulting_ammount(self):
+        # summed resulting ammount of the paths, received + inputed * pct for each of them
+        return self.received_ammount + self.inputed_ammount * self.pct
+
+class PathBounds:
+    # limits of a bounded path enumeration and the mass the limits cut off. A temporally consistent
+    # extension, once patched, is pruned, neither emitted nor expanded, when its pct is below min_pct,
+    # when it has more than max_depth segments, or once max_paths paths were emitted or time_budget
+    # seconds went by. The residuals of the head node of a pruned path sum the pct of that path, and
+    # the resulting ammount and the number of every path it heads, itself and the paths upstream of
+    # it, so the emitted paths plus the residual ammounts add up to the unbounded enumeration
+    
+    __slots__ = [
+        "min_pct", "max_depth", "max_paths", "time_budget"
+    ,   "path_count", "pruned_count", "residual_pcts", "residual_ammounts", "residual_counts", "deadline", "exhausted"
+    ]
+    
+    def __init__(self, min_pct=0.0, max_depth=None, max_paths=None, time_budget=None):
+        assert min_pct >= 0.0
+        assert max_depth is None or max_depth > 0
+        assert max_paths is None or max_paths >= 0
+        assert time_budget is None or time_budget >= 0.0
+        self.min_pct        = min_pct
+        self.max_depth      = max_depth
+        self.max_paths      = max_paths
+        self.time_budget    = time_budget
+        self.start()
+    
+    def __str__(self):
+        return f"<PathBounds min_pct={self.min_pct}, max_depth={self.max_depth}, max_paths={self.max_paths}, time_budget={self.time_budget}>"
+    
+    def __repr__(self):
+        return str(self)
+    
+    def start(self):
+        # called by the path builder when the enumeration of a sink starts
+        self.path_count         = 0
+        self.pruned_count       = 0
+        self.residual_pcts      = {} # head node label -> summed pct of the pruned paths
+        self.residual_ammounts  = {} # head node label -> summed resulting ammount of the paths they head
+        self.residual_counts    = {} # head node label -> number of paths they head
+        self.deadline           = None if self.time_budget is None else perf_counter() + self.time_budget
+        self.exhausted          = False
+    
+    def prune(self, path):
+        # called for every temporally consistent extension, once patched and before it is emitted. The
+        # path builder adds the residual of every pruned path
+        if not self.exhausted:
+            if self.max_paths is not None and self.path_count >= self.max_paths:
+                self.exhausted = True
+            elif self.deadline is not None and perf_counter() >= self.deadline:
+                self.exhausted = True
+        if self.exhausted or path.pct < self.min_pct or (self.max_depth is not None and path.segment_count > self.max_depth):
+            self.pruned_count += 1
+            return True
+        self.path_count += 1
+        return False
+    
+    def add_residual(self, path, resulting_ammount, path_count):
+        # resulting_ammount and path_count cover the pruned path and every path upstream of it
+        label = path.from_label
+        self.residual_pcts[label]       = self.residual_pcts.get(label, 0.0) + path.pct
+        self.residual_ammounts[label]   = self.residual_ammounts.get(label, 0.0) + resulting_ammount
+        self.residual_counts[label]     = self.residual_counts.get(label, 0) + path_count
+    
+    @property
+    def residual_pct(self):
+        return sum(self.residual_pcts.values())
+    
+    @property
+    def residual_ammount(self):
+        return sum(self.residual_ammounts.values())
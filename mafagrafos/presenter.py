@@ -1,3 +1,6 @@
+import gzip
+
+import numpy as np
 
 class GraphPresenter:
         
@@ -5,22 +8,24 @@ class GraphPresenter:
         self.graph = graph
     
     def compute_pcts(self):
-        for node in self.graph.nodes:
-            from_label = node.label
-            edges_sum = node.get_attr('ammount')
-            
-            for out_node_id in node.out_edges:
-                to_label = self.graph.get_node_by_id(out_node_id).label
-                edge = self.graph.get_edge(from_label, to_label)
-                edges_sum += edge.get_attr('ammount')
-            
-            for out_node_id in node.out_edges:
-                to_label = self.graph.get_node_by_id(out_node_id).label
-                edge = self.graph.get_edge(from_label, to_label)
-                edge_pct = edge.get_attr('ammount') / edges_sum * 100.0
-                edge_pct_txt = '{:.3f}%'.format(edge_pct) 
-                edge.set_attr('pct', edge_pct)
-                edge.set_attr('pct_txt', edge_pct_txt)
+        # pct of every edge: its ammount over the ammount left in its source node plus everything the
+        # node transferred. The sums are a grouped reduction over the edges, seeded with the node
+        # ammounts. bincount adds the weights in array order, the node ammount and then the out edges
+        # in edge_id order, which is the order Node.out_edges iterates them. The per node walk this
+        # replaced iterated out edge sets, so its sums, and the pcts, can differ in the last bits. The
+        # texts are formatted by process_edge, only the pcts patched by the path builder keep a pct_txt
+        graph = self.graph
+        node_count = graph.next_node_id
+        from_ids, _ = graph.get_edge_ends()
+        edge_ammounts = graph.get_edge_values('ammount')
+        sums = np.bincount(
+            np.concatenate((np.arange(node_count), from_ids))
+        ,   weights=np.concatenate((graph.get_node_values('ammount'), edge_ammounts))
+        ,   minlength=node_count
+        )
+        edge_pcts = edge_ammounts / sums[from_ids] * 100.0
+        graph.set_edge_values('pct', edge_pcts)
+        graph.set_edge_values('pct_txt', [ None ] * len(edge_pcts))
                     
     def process_node(self, node):
         ammount = node.get_attr('ammount')
@@ -35,6 +40,8 @@ class GraphPresenter:
         to_label = self.in_double_quotes(to_node.label)
         ammount = edge.get_attr('ammount')
         pct = edge.get_attr('pct_txt')
+        if pct is None:
+            pct = '{:.3f}%'.format(edge.get_attr('pct'))
         time = edge.get_attr('time')
         time_txts = map(lambda t: f"T{t}", time)
         time_txts = ", ".join(list(time_txts))
@@ -42,22 +49,53 @@ class GraphPresenter:
         line = "    " + from_label + " -> " + to_label +  "[label=" + edge_label + "]; "
         return line,
         
-    def generate_dot(self):
-        lines = []
+    def get_ancestor_mask(self, sink_label):
+        # bytearray indexed by node_id, 1 for the sink and every node that can reach it
+        sink_node = self.graph.get_node_by_label(sink_label)
+        assert sink_node
+        mask = bytearray(self.graph.next_node_id)
+        mask[sink_node.node_id] = 1
+        stack = [ sink_node.node_id ]
+        while stack:
+            node = self.graph.get_node_by_id(stack.pop())
+            for from_id in node.in_edges:
+                if not mask[from_id]:
+                    mask[from_id] = 1
+                    stack.append(from_id)
+        return mask
+    
+    def iter_dot_lines(self, sink_label=None):
+        # lines of the dot document, produced one at a time. With a sink_label only the nodes that can
+        # reach the sink, and the edges between them, are kept
+        mask = None if sink_label is None else self.get_ancestor_mask(sink_label)
         graph_name = self.in_double_quotes(self.graph.name)
-        lines.append("digraph " + graph_name + "{")
-        lines.append(f"    node[shape = rect];")
-        lines.append(f"    rankdir=BT;")
+        yield "digraph " + graph_name + "{"
+        yield f"    node[shape = rect];"
+        yield f"    rankdir=BT;"
         for node in self.graph.nodes:
-            for line in self.process_node(node):
-                lines.append(line)
+            if mask is None or mask[node.node_id]:
+                yield from self.process_node(node)
         for edge in self.graph.iter_ordered_edges():
-            for line in self.process_edge(edge):
-                lines.append(line)
-        lines.append("}")
-        return "\n".join(lines)
+            if mask is None or mask[edge.to_id]:
+                yield from self.process_edge(edge)
+        yield "}"
+    
+    def generate_dot(self, sink_label=None):
+        return "\n".join(self.iter_dot_lines(sink_label))
+    
+    def write_dot(self, fh, sink_label=None):
+        # streams the dot document to the text file handle fh, so it is never held in memory
+        for line in self.iter_dot_lines(sink_label):
+            fh.write(line)
+            fh.write("\n")
         
     def in_double_quotes(self, obj):
         result = str(obj).replace('"', '').replace("'", "")
         result = '"' + result + '"'
         return result
+
+def open_dot_file(file_name):
+    # text file handle for a dot file, gzip compressed when the name ends with .gz
+    if file_name.endswith(".gz"):
+        return gzip.open(file_name, "wt")
+    return open(file_name, "w")
@@ -0,0 +1,205 @@
+import os
+import csv
+
+# reports are made of tables (PARTIDAS, SALDOS, CAMINHOS, ...) filled row by row. The backend is
+# picked by the extension of the report file: xlsx writes every table to a sheet of one workbook,
+# csv, parquet and arrow write each table to its own file, named after the report and the table.
+# Rows are written in batches as they are appended, so the memory in use does not depend on the
+# size of the tables
+
+DEFAULT_BATCH_SIZE = 10000
+
+# type of every column of a table: 'str', 'int' or 'float'
+COLUMN_TYPES = [ 'str', 'int', 'float' ]
+
+def get_table_path(path, table_name):
+    # 'report.csv', 'CAMINHOS' -> 'report_CAMINHOS.csv'
+    root, ext = os.path.splitext(path)
+    return f"{root}_{table_name}{ext}"
+
+class ReportTable:
+    # table of a report. Rows are lists aligned with the columns, buffered until a batch is full
+
+    __slots__ = ["writer", "name", "columns", "rows", "row_count"]
+
+    def __init__(self, writer, name, columns):
+        assert all(column_type in COLUMN_TYPES for column_type in columns.values())
+        self.writer     = writer
+        self.name       = name
+        self.columns    = columns # column name -> column type
+        self.rows       = []
+        self.row_count  = 0 # rows already written
+
+    def __str__(self):
+        return f"<ReportTable name='{self.name}', row_count={self.row_count + len(self.rows)}>"
+
+    def __repr__(self):
+        return str(self)
+
+    def append_row(self, row):
+        assert len(row) == len(self.columns)
+        self.rows.append(row)
+        if len(self.rows) == self.writer.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.rows:
+            self.writer.write_rows(self, self.rows)
+            self.row_count += len(self.rows)
+            self.rows = []
+
+    def close(self):
+        self.flush()
+        self.writer.close_table(self)
+        del self.writer.tables[self.name]
+
+class ReportWriter:
+    # base class of the report backends, which implement create_table, write_rows, close_table and
+    # save. Closing the writer closes the tables still open
+
+    def __init__(self, path, batch_size=DEFAULT_BATCH_SIZE):
+        assert batch_size > 0
+        self.path           = path
+        self.batch_size     = batch_size
+        self.tables         = {} # table name -> backend state of the open tables
+        self.open_tables    = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def open_table(self, name, columns):
+        # columns maps the column names to their types, in order
+        assert name not in self.tables
+        table = ReportTable(self, name, columns)
+        self.tables[name] = self.create_table(table)
+        self.open_tables.append(table)
+        return table
+
+    def create_table(self, table):
+        raise NotImplementedError()
+
+    def write_rows(self, table, rows):
+        raise NotImplementedError()
+
+    def close_table(self, table):
+        pass
+
+    def save(self):
+        pass
+
+    def close(self):
+        for table in self.open_tables:
+            if table.name in self.tables:
+                table.close()
+        self.open_tables = []
+        self.save()
+
+class XlsxReportWriter(ReportWriter):
+    # workbook in openpyxl write only mode, rows go straight to the sheet files. Sheets keep the
+    # layout pandas wrote: an unnamed first column holding the row index. Tables longer than a sheet
+    # go on in sheets named after the table and the part, 'CAMINHOS_2', ...
+
+    MAX_SHEET_ROWS = 1048576 - 1 # header row
+
+    def __init__(self, path, batch_size=DEFAULT_BATCH_SIZE):
+        import openpyxl
+        super().__init__(path, batch_size)
+        self.workbook = openpyxl.Workbook(write_only=True)
+
+    def create_sheet(self, table, part):
+        sheet = self.workbook.create_sheet(table.name if part == 1 else f"{table.name}_{part}")
+        sheet.append([ None ] + list(table.columns.keys()))
+        return sheet
+
+    def create_table(self, table):
+        # [ sheet, rows in the sheet, part ]
+        return [ self.create_sheet(table, 1), 0, 1 ]
+
+    def write_rows(self, table, rows):
+        state = self.tables[table.name]
+        for row_idx, row in enumerate(rows, table.row_count):
+            if state[1] == self.MAX_SHEET_ROWS:
+                state[2] += 1
+                state[0], state[1] = self.create_sheet(table, state[2]), 0
+            state[0].append([ row_idx ] + list(row))
+            state[1] += 1
+
+    def save(self):
+        self.workbook.save(self.path)
+
+class CsvReportWriter(ReportWriter):
+
+    def create_table(self, table):
+        fh = open(get_table_path(self.path, table.name), "w", newline='')
+        writer = csv.writer(fh)
+        writer.writerow(table.columns.keys())
+        return fh, writer
+
+    def write_rows(self, table, rows):
+        self.tables[table.name][1].writerows(rows)
+
+    def close_table(self, table):
+        self.tables[table.name][0].close()
+
+class ArrowReportWriter(ReportWriter):
+    # Arrow IPC files, one record batch per batch of rows. pyarrow is only needed for these reports
+
+    def get_schema(self, table):
+        import pyarrow as pa
+        types = { 'str': pa.string(), 'int': pa.int64(), 'float': pa.float64() }
+        return pa.schema([ (name, types[column_type]) for name, column_type in table.columns.items() ])
+
+    def open_file(self, path, schema):
+        import pyarrow as pa
+        return pa.ipc.new_file(path, schema)
+
+    def create_table(self, table):
+        schema = self.get_schema(table)
+        return schema, self.open_file(get_table_path(self.path, table.name), schema)
+
+    def to_column(self, values, column_type):
+        # labels can be read as numbers from the ledgers
+        if column_type == 'str':
+            return [ value if value is None or isinstance(value, str) else str(value) for value in values ]
+        return values
+
+    def write_rows(self, table, rows):
+        import pyarrow as pa
+        schema, writer = self.tables[table.name]
+        columns = zip(*rows)
+        arrays = [ pa.array(self.to_column(values, column_type), type=field.type) for values, column_type, field in zip(columns, table.columns.values(), schema) ]
+        self.write_arrays(writer, schema, arrays)
+
+    def write_arrays(self, writer, schema, arrays):
+        import pyarrow as pa
+        writer.write_batch(pa.record_batch(arrays, schema=schema))
+
+    def close_table(self, table):
+        self.tables[table.name][1].close()
+
+class ParquetReportWriter(ArrowReportWriter):
+    # one row group per batch of rows
+
+    def open_file(self, path, schema):
+        import pyarrow.parquet as pq
+        return pq.ParquetWriter(path, schema)
+
+    def write_arrays(self, writer, schema, arrays):
+        import pyarrow as pa
+        writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+
+WRITERS = {
+    '.xlsx'     : XlsxReportWriter
+,   '.csv'      : CsvReportWriter
+,   '.parquet'  : ParquetReportWriter
+,   '.arrow'    : ArrowReportWriter
+}
+
+def open_report(path, batch_size=DEFAULT_BATCH_SIZE):
+    writer_class = WRITERS.get(os.path.splitext(path)[1].lower(), None)
+    if writer_class is None:
+        raise ValueError(f"unsupported report file '{path}', expected one of {list(WRITERS.keys())}")
+    return writer_class(path, batch_size)
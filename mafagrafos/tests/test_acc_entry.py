@@ -0,0 +1,64 @@
+import unittest
+from mafagrafos.acc_entry import *
+
+class TestAccEntryList(unittest.TestCase):
+
+    def setUp(self):
+        self.entries = AccEntryList()
+        self.entries.extend([
+            AccEntry("A", None, 100.0)
+        ,   AccEntry("B", "A", 30.0)
+        ,   AccEntry("C", "A", 20.0)
+        ,   AccEntry("B", "A", 10.0)
+        ,   AccEntry("A", "B", 5.0)
+        ])
+
+    def tearDown(self):
+        pass
+
+    def test_it_interns_the_labels(self):
+        self.assertEqual(self.entries.labels, [ "A", "B", "C" ])
+        self.assertEqual(self.entries.get_code("B"), 1)
+        self.assertEqual(self.entries.get_code("D"), None)
+        self.assertEqual(self.entries.get_label(2), "C")
+
+    def test_it_stores_the_entries_as_codes(self):
+        self.assertEqual(len(self.entries), 5)
+        self.assertEqual(self.entries.dst_column().tolist(), [ 0, 1, 2, 1, 0 ])
+        self.assertEqual(self.entries.src_column().tolist(), [ -1, 0, 0, 0, 1 ])
+        self.assertEqual(self.entries.ammount_column().tolist(), [ 100.0, 30.0, 20.0, 10.0, 5.0 ])
+        self.assertEqual(list(self.entries.iter_codes()), [ (0, -1, 100.0), (1, 0, 30.0), (2, 0, 20.0), (1, 0, 10.0), (0, 1, 5.0) ])
+
+    def test_it_gives_back_the_entries(self):
+        self.assertEqual(self.entries[1], AccEntry("B", "A", 30.0))
+        self.assertEqual(self.entries[0], AccEntry("A", None, 100.0))
+        self.assertEqual(list(self.entries), self.entries.entries)
+        self.assertIs(self.entries[1].dst, self.entries[3].dst)
+
+    def test_it_gives_back_the_ammounts_with_their_type(self):
+        entries = AccEntryList()
+        entries.extend([ AccEntry("A", None, 203), AccEntry("B", "A", 2.5), AccEntry("B", "A", 10.0) ])
+        self.assertEqual([ type(entry.ammount) for entry in entries ], [ int, float, float ])
+        self.assertEqual([ type(ammount) for _, _, ammount in entries.iter_codes() ], [ int, float, float ])
+        self.assertEqual(entries[0].ammount, 203)
+
+    def test_it_computes_the_totals_of_every_account(self):
+        self.assertEqual(self.entries.received_totals().tolist(), [ 105.0, 40.0, 20.0 ])
+        self.assertEqual(self.entries.inputed_totals().tolist(), [ 100.0, 0.0, 0.0 ])
+        self.assertEqual(self.entries.transferred_totals().tolist(), [ 60.0, 5.0, 0.0 ])
+        self.assertEqual(self.entries.balances().tolist(), [ 45.0, 35.0, 20.0 ])
+
+    def test_it_counts_the_distinct_counterparts_of_every_account(self):
+        self.assertEqual(self.entries.counterpart_counts().tolist(), [ 2, 1, 0 ])
+
+    def test_it_computes_the_totals_of_no_entries(self):
+        entries = AccEntryList()
+        self.assertEqual(entries.received_totals().tolist(), [])
+        self.assertEqual(entries.counterpart_counts().tolist(), [])
+
+    def test_it_compares_entry_lists(self):
+        other = AccEntryList()
+        other.extend(self.entries)
+        self.assertEqual(other, self.entries)
+        other.add_entry(AccEntry("C", None, 1.0))
+        self.assertNotEqual(other, self.entries)
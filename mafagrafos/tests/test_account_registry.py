@@ -0,0 +1,43 @@
+import unittest
+from mafagrafos.account_registry import *
+
+class TestAccountRegistry(unittest.TestCase):
+
+    def setUp(self):
+        # account A is split twice, into nodes 2 and 3
+        self.accounts = AccountRegistry()
+        self.accounts.add_account("A", 0)
+        self.accounts.add_account("B", 1)
+        self.accounts.add_version("A", 2)
+        self.accounts.add_version("A", 3)
+
+    def tearDown(self):
+        pass
+
+    def test_it_retrieves_the_current_version(self):
+        self.assertEqual(len(self.accounts), 2)
+        self.assertTrue("A" in self.accounts)
+        self.assertEqual(self.accounts.get_node_id("A"), 3)
+        self.assertEqual(self.accounts.get_node_id("B"), 1)
+        self.assertEqual(self.accounts.get_node_id("C"), None)
+
+    def test_it_retrieves_the_previous_version(self):
+        self.assertEqual(self.accounts.get_prev_node_id("A"), 2)
+        self.assertEqual(self.accounts.get_prev_node_id("B"), None)
+
+    def test_it_keeps_every_version(self):
+        self.assertEqual(self.accounts.get_versions("A"), [ 0, 2, 3 ])
+        self.assertEqual(self.accounts.get_version_count("A"), 3)
+        self.assertEqual(self.accounts.get_version_count("C"), 0)
+        self.assertEqual(self.accounts.get_account(3), ("A", 2))
+        self.assertEqual(self.accounts.get_account(1), ("B", 0))
+        self.assertEqual(list(self.accounts.iter_versions()), [ ("A", 0, 0), ("A", 1, 2), ("A", 2, 3), ("B", 0, 1) ])
+
+    def test_it_builds_the_version_labels(self):
+        self.assertEqual(self.accounts.get_version_labels("A"), [ "A", "A--1", "A--2" ])
+        self.assertEqual(self.accounts.get_next_label("A"), "A--3")
+        self.assertEqual(self.accounts.get_next_label("B"), "B--1")
+
+    def test_it_fails_to_add_an_account_twice(self):
+        with self.assertRaises(AssertionError):
+            self.accounts.add_account("B", 4)
@@ -0,0 +1,51 @@
+import unittest
+from mafagrafos.balance_index import *
+
+class TestBalanceIndex(unittest.TestCase):
+
+    def setUp(self):
+        # node 0 receives 100.0 at 1 and transfers 30.0 to node 2 at 3, node 1 receives 50.0 at 3
+        self.index = BalanceIndex()
+        self.index.record(0, 1, 100.0)
+        self.index.record(0, 3, -30.0)
+        self.index.record(2, 3, 30.0)
+        self.index.record(1, 3, 50.0)
+
+    def tearDown(self):
+        pass
+
+    def test_it_returns_zeros_if_nothing_is_recorded(self):
+        index = BalanceIndex()
+        self.assertEqual(index.balances_at(10, node_count=2).tolist(), [ 0.0, 0.0 ])
+        self.assertEqual(index.balance_at(0, 10), 0.0)
+
+    def test_it_retrieves_the_balances_of_every_node(self):
+        self.assertEqual(self.index.node_count, 3)
+        self.assertEqual(self.index.balances_at(0).tolist(), [ 0.0, 0.0, 0.0 ])
+        self.assertEqual(self.index.balances_at(2).tolist(), [ 100.0, 0.0, 0.0 ])
+        self.assertEqual(self.index.balances_at(3).tolist(), [ 70.0, 50.0, 30.0 ])
+
+    def test_it_pads_the_balances_of_nodes_without_changes(self):
+        self.assertEqual(self.index.balances_at(3, node_count=5).tolist(), [ 70.0, 50.0, 30.0, 0.0, 0.0 ])
+
+    def test_it_retrieves_the_balance_of_a_node(self):
+        self.assertEqual(self.index.balance_at(0, 2), 100.0)
+        self.assertEqual(self.index.balance_at(0, 3), 70.0)
+        self.assertEqual(self.index.balance_at(7, 3), 0.0)
+
+    def test_it_retrieves_the_history_of_a_node(self):
+        times, balances = self.index.balances_between(0, 0, 5)
+        self.assertEqual(times.tolist(), [ 0.0, 1.0, 3.0 ])
+        self.assertEqual(balances.tolist(), [ 0.0, 100.0, 70.0 ])
+        times, balances = self.index.balances_between(0, 1, 2)
+        self.assertEqual(times.tolist(), [ 1.0 ])
+        self.assertEqual(balances.tolist(), [ 100.0 ])
+
+    def test_it_retrieves_the_history_of_a_node_without_changes(self):
+        times, balances = self.index.balances_between(5, 0, 5)
+        self.assertEqual(times.tolist(), [ 0.0 ])
+        self.assertEqual(balances.tolist(), [ 0.0 ])
+
+    def test_it_fails_to_record_a_change_older_than_the_last_one(self):
+        with self.assertRaises(AssertionError):
+            self.index.record(0, 2, 10.0)
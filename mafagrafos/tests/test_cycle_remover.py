@@ -0,0 +1,70 @@
+import os
+import csv
+import unittest
+import tempfile
+
+from mafagrafos.cycle_remover import *
+from mafagrafos.report_writer import open_report
+
+class TestAppNormalizedReport(unittest.TestCase):
+
+    def setUp(self):
+        # A -> C -> D and B -> C -> D, every path goes through C -> D
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.graph = Graph('Test graph')
+        for label in "ABCD":
+            node = self.graph.add_node(label)
+            node.set_attr('inputed_ammount', 10.0)
+        for from_label, to_label, time in [ ("A", "C", 0), ("B", "C", 1), ("C", "D", 5) ]:
+            edge = self.graph.add_edge(from_label, to_label)
+            edge.set_attr('time', [ time ])
+            edge.set_attr('pct', 50.0)
+        self.app = App("ledger.csv", "D", self.get_path("graph.dot"), self.get_path("report.csv"), normalized=True)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def get_path(self, file_name):
+        return os.path.join(self.tmp_dir.name, file_name)
+
+    def read_table(self, table_name):
+        with open(self.get_path(f"report_{table_name}.csv"), newline='') as fh:
+            return list(csv.reader(fh))[1:]
+
+    def test_it_writes_every_distinct_segment_once(self):
+        with open_report(self.get_path("report.csv")) as report:
+            self.app.report_normalized_paths(report, self.graph.iter_paths("D"))
+        self.assertEqual(len(self.read_table('CAMINHOS')), 3)
+        segments = self.read_table('SEGMENTOS')
+        self.assertEqual([ row[1:3] for row in segments ], [ [ "C", "D" ], [ "A", "C" ], [ "B", "C" ] ])
+        links = self.read_table('CAMINHOS_SEGMENTOS')
+        self.assertEqual(links, [ [ "1", "1", "1" ], [ "2", "1", "2" ], [ "2", "2", "1" ], [ "3", "1", "3" ], [ "3", "2", "1" ] ])
+
+class TestAppPathPatching(unittest.TestCase):
+
+    def build_paths(self, transfers):
+        # every account is loaded with 100 before the transfers, (dst, src, ammount)
+        entries = AccEntryList()
+        entries.extend(AccEntry(label, None, 100) for label in [ "A0", "A1", "A2", "A3" ])
+        entries.extend(AccEntry(dst, src, ammount) for dst, src, ammount in transfers)
+        app = App("ledger.csv", "A0", "graph.dot", "report.xlsx")
+        graph = app.create_graph(entries)
+        GraphPresenter(graph).compute_pcts()
+        return sorted(([ segment.from_label for segment in path.segments ], round(path.pct, 6)) for path in graph.build_paths("A0"))
+
+    def test_it_patches_a_path_found_before_its_consistent_extensions(self):
+        # A1 -> A3--1 -> A0 goes on with A3 -> A1, which happened before, and is patched because of
+        # A2 -> A1, which happened after. It worked with the in edges of A1 in one order only
+        paths = self.build_paths([ ("A0", "A1", 43), ("A1", "A3", 16), ("A3", "A1", 41), ("A0", "A3", 31), ("A1", "A2", 17) ])
+        self.assertEqual(paths, [
+            ([ "A1" ], 0.284768)
+        ,   ([ "A1", "A3--1" ], 0.067338)
+        ,   ([ "A3", "A1", "A3--1" ], 0.010774)
+        ,   ([ "A3", "A3--1" ], 0.20832)
+        ,   ([ "A3--1" ], 0.248)
+        ])
+
+    def test_it_patches_a_path_whatever_the_order_of_the_in_edges(self):
+        # A1 -> A3 happened before A3 -> A0 and A2 -> A3 after, the consistent in edge of A3 comes first
+        paths = self.build_paths([ ("A3", "A1", 36), ("A1", "A2", 32), ("A0", "A3", 29), ("A3", "A2", 47) ])
+        self.assertEqual(paths, [ ([ "A1", "A3" ], 0.218227), ([ "A3" ], 0.630435) ])
@@ -1,5 +1,7 @@
 import unittest
+import numpy as np
 from mafagrafos.edge import *
+from mafagrafos.graph import *
 
 class TestEdge(unittest.TestCase):
 
@@ -15,4 +17,56 @@ class TestEdge(unittest.TestCase):
         edge3 = Edge(from_id=0, to_id=1, label="test edge 1")
         self.assertEqual(edge1, edge1)
         self.assertNotEqual(edge1, edge2)
-        self.assertEqual(edge1, edge3)
\ No newline at end of file
+        self.assertEqual(edge1, edge3)
+
+
+class TestEdgeColumnStore(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = Graph('Test graph', edge_columns={ 'ammount': np.float64, 'pct': np.float64 })
+        for label in "ABC":
+            self.graph.add_node(label)
+    
+    def tearDown(self):
+        pass
+    
+    def test_it_assigns_edge_ids_in_insertion_order(self):
+        edge1 = self.graph.add_edge("A", "B")
+        edge2 = self.graph.add_edge("B", "C")
+        self.assertEqual(edge1.edge_id, 0)
+        self.assertEqual(edge2.edge_id, 1)
+    
+    def test_it_stores_typed_attributes_in_columns(self):
+        edge = self.graph.add_edge("A", "B", data={ 'ammount': 10.0, 'time': [0] })
+        self.assertEqual(edge.get_attr('ammount'), 10.0)
+        self.assertEqual(edge.get_attr('time'), [0])
+        self.assertNotIn('ammount', edge.data)
+        edge.set_attr('pct', 50.0)
+        self.assertEqual(self.graph.get_edge_column('pct')[0], 50.0)
+        self.assertEqual(edge.get_data(), { 'ammount': 10.0, 'pct': 50.0, 'time': [0] })
+    
+    def test_it_exposes_columns_for_vectorized_operations(self):
+        for i, (from_label, to_label) in enumerate([ ("A", "B"), ("B", "C"), ("A", "C") ]):
+            edge = self.graph.add_edge(from_label, to_label)
+            edge.set_attr('ammount', float(i + 1))
+        column = self.graph.get_edge_column('ammount')
+        self.assertEqual(column.sum(), 6.0)
+        column *= 2.0
+        self.assertEqual(self.graph.get_edge("A", "C").get_attr('ammount'), 6.0)
+    
+    def test_it_grows_the_columns(self):
+        graph = Graph('Test graph', edge_columns={ 'ammount': np.float64 })
+        for i in range(3000):
+            graph.add_node(f"N{i}")
+        for i in range(2999):
+            edge = graph.add_edge(f"N{i}", f"N{i+1}")
+            edge.set_attr('ammount', float(i))
+        self.assertEqual(len(graph.get_edge_column('ammount')), 2999)
+        self.assertEqual(graph.get_edge("N10", "N11").get_attr('ammount'), 10.0)
+        self.assertEqual(graph.get_edge("N2998", "N2999").get_attr('ammount'), 2998.0)
+
+    def test_it_keeps_the_columns_when_freezing(self):
+        edge = self.graph.add_edge("A", "B", data={ 'ammount': 10.0 })
+        frozen = self.graph.freeze()
+        self.assertEqual(frozen.get_edge("A", "B").get_attr('ammount'), 10.0)
+        self.assertEqual(list(frozen.get_edge_column('ammount')), [ 10.0 ])
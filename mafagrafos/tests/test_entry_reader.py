@@ -0,0 +1,95 @@
+import os
+import unittest
+import tempfile
+import importlib.util
+
+import openpyxl
+
+from mafagrafos.entry_reader import *
+
+ROWS = [
+    ("A", None, 100.0)
+,   ("B", "A", 25.5)
+,   (None, None, None)
+,   ("C", "B", 10.0)
+]
+
+EXPECTED = [
+    AccEntry("A", None, 100)
+,   AccEntry("B", "A", 25.5)
+,   AccEntry("C", "B", 10)
+]
+
+class TestEntryReader(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def get_path(self, file_name):
+        return os.path.join(self.tmp_dir.name, file_name)
+
+    def write_xlsx(self, file_name, sheet_name):
+        path = self.get_path(file_name)
+        workbook = openpyxl.Workbook()
+        workbook.active.title = "other"
+        sheet = workbook.create_sheet(sheet_name)
+        sheet.append([ "dst", "src", "ammount" ])
+        for row in ROWS:
+            sheet.append(row)
+        workbook.save(path)
+        return path
+
+    def write_csv(self, file_name):
+        path = self.get_path(file_name)
+        with open(path, "w") as fh:
+            print("dst,src,ammount", file=fh)
+            for row in ROWS:
+                print(",".join("" if value is None else str(value) for value in row), file=fh)
+        return path
+
+    def test_it_splits_the_sheet_name(self):
+        self.assertEqual(split_sheet_name("ledger.xlsx:L"), ("ledger.xlsx", "L"))
+        self.assertEqual(split_sheet_name("ledger.xlsx"), ("ledger.xlsx", None))
+        self.assertEqual(split_sheet_name("C:\\ledger.csv"), ("C:\\ledger.csv", None))
+
+    def test_it_reads_a_sheet_of_a_workbook(self):
+        path = self.write_xlsx("ledger.xlsx", "L")
+        self.assertEqual(list(iter_entries(path + ":L")), EXPECTED)
+
+    def test_it_reads_the_first_sheet_of_a_workbook(self):
+        path = self.write_xlsx("ledger.xlsx", "L")
+        self.assertEqual(list(iter_entries(path)), [])
+
+    def test_it_reads_a_csv_file(self):
+        path = self.write_csv("ledger.csv")
+        self.assertEqual(list(iter_entries(path)), EXPECTED)
+
+    def test_it_reads_in_chunks(self):
+        path = self.write_csv("ledger.csv")
+        self.assertEqual(list(iter_entries(path, chunk_size=1)), EXPECTED)
+
+    def test_it_streams_the_entries(self):
+        path = self.write_csv("ledger.csv")
+        entries = iter_entries(path)
+        self.assertEqual(next(entries), EXPECTED[0])
+
+    @unittest.skipUnless(importlib.util.find_spec("pyarrow"), "pyarrow is not installed")
+    def test_it_reads_a_parquet_file(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        path = self.get_path("ledger.parquet")
+        columns = list(zip(*ROWS))
+        pq.write_table(pa.table({ "dst": columns[0], "src": columns[1], "ammount": columns[2] }), path)
+        self.assertEqual(list(iter_entries(path, chunk_size=2)), EXPECTED)
+
+    def test_it_fails_to_read_an_unknown_format(self):
+        with self.assertRaises(ValueError):
+            list(iter_entries("ledger.txt"))
+
+    def test_it_fails_to_read_a_sheet_of_a_csv_file(self):
+        path = self.write_csv("ledger.csv")
+        with self.assertRaisesRegex(ValueError, "names a sheet"):
+            list(iter_entries(path + ":L"))
@@ -0,0 +1,115 @@
+import unittest
+
+import numpy as np
+
+from mafagrafos.graph import *
+from mafagrafos.frozen_graph import *
+
+class TestFrozenGraph(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = Graph('Test graph')
+        for label in "ABCD":
+            node = self.graph.add_node(label)
+            node.set_attr('ammount', 10.0)
+        self.graph.add_edge("A", "B", data={ 'ammount': 1.0, 'time': [3] })
+        self.graph.add_edge("A", "C", data={ 'ammount': 2.0, 'time': [1] })
+        self.graph.add_edge("C", "B", data={ 'ammount': 3.0, 'time': [2, 3] })
+        self.graph.add_edge("D", "A", data={ 'ammount': 4.0, 'time': [0] })
+        self.frozen = self.graph.freeze()
+    
+    def tearDown(self):
+        pass
+    
+    def test_it_freezes_a_graph(self):
+        self.assertIsInstance(self.frozen, FrozenGraph)
+        self.assertEqual(self.frozen.name, 'Test graph')
+        self.assertEqual(self.frozen.next_node_id, 4)
+        self.assertEqual(self.frozen.edge_count, 4)
+        self.assertEqual(len(self.frozen.nodes), 4)
+    
+    def test_it_keeps_the_nodes(self):
+        for node in self.graph.nodes:
+            frozen_node = self.frozen.get_node_by_label(node.label)
+            self.assertEqual(frozen_node, self.frozen.get_node_by_id(node.node_id))
+            self.assertEqual(frozen_node.node_id, node.node_id)
+            self.assertEqual(frozen_node.label, node.label)
+            self.assertEqual(list(frozen_node.out_edges), list(node.out_edges))
+            self.assertEqual(list(frozen_node.in_edges), list(node.in_edges))
+            self.assertEqual(frozen_node.get_attr('ammount'), 10.0)
+        self.assertIsNone(self.frozen.get_node_by_label("Z"))
+    
+    def test_it_keeps_the_edges(self):
+        for edge in self.graph.iter_ordered_edges():
+            from_label = self.graph.get_node_by_id(edge.from_id).label
+            to_label = self.graph.get_node_by_id(edge.to_id).label
+            frozen_edge = self.frozen.get_edge(from_label, to_label)
+            self.assertEqual(frozen_edge.edge_key(), edge.edge_key())
+            self.assertEqual(frozen_edge.get_data(), edge.get_data())
+            self.assertTrue(self.frozen.has_edge(from_label, to_label))
+        self.assertIsNone(self.frozen.get_edge("B", "A"))
+        self.assertFalse(self.frozen.has_edge("B", "C"))
+    
+    def test_it_retrieves_the_edges_by_ids(self):
+        for edge in self.graph.iter_ordered_edges():
+            frozen_edge = self.frozen.get_edge_by_ids(edge.from_id, edge.to_id)
+            self.assertEqual(frozen_edge.edge_key(), edge.edge_key())
+            self.assertTrue(self.frozen.has_edge_by_ids(edge.from_id, edge.to_id))
+        self.assertIsNone(self.frozen.get_edge_by_ids(1, 0))
+        self.assertFalse(self.frozen.has_edge_by_ids(1, 2))
+    
+    def test_it_iterates_the_edges_of_a_node(self):
+        for node in self.graph.nodes:
+            frozen_node = self.frozen.get_node_by_id(node.node_id)
+            out_edges = [ (to_id, edge.edge_key()) for to_id, edge in frozen_node.out_edge_items() ]
+            self.assertEqual(out_edges, [ (to_id, edge.edge_key()) for to_id, edge in node.out_edge_items() ])
+            in_edges = [ (from_id, edge.edge_key()) for from_id, edge in frozen_node.in_edge_items() ]
+            self.assertEqual(in_edges, [ (from_id, edge.edge_key()) for from_id, edge in node.in_edge_items() ])
+            self.assertEqual(list(frozen_node.iter_out_edge_ids()), [ (to_id, edge.edge_id) for to_id, edge in node.out_edge_items() ])
+            self.assertEqual(list(frozen_node.iter_in_edge_ids()), [ (from_id, edge.edge_id) for from_id, edge in node.in_edge_items() ])
+    
+    def test_it_gets_and_sets_the_attributes_in_bulk(self):
+        from_ids, to_ids = self.frozen.get_edge_ends()
+        self.assertEqual(from_ids.tolist(), [ 0, 0, 2, 3 ])
+        self.assertEqual(to_ids.tolist(), [ 1, 2, 1, 0 ])
+        self.assertEqual(self.frozen.get_edge_values('ammount').tolist(), [ 1.0, 2.0, 3.0, 4.0 ])
+        self.assertEqual(self.frozen.get_node_values('ammount').tolist(), [ 10.0 ] * 4)
+        self.assertTrue(np.isnan(self.frozen.get_edge_values('pct')).all())
+        self.frozen.set_edge_values('pct', np.array([ 0.5, 1.5, 2.5, 3.5 ]))
+        self.assertEqual(self.frozen.get_edge("C", "B").get_attr('pct'), 2.5)
+        self.frozen.set_edge_values('pct_txt', [ None ] * 4)
+        self.assertIsNone(self.frozen.get_edge("C", "B").get_attr('pct_txt'))
+    
+    def test_it_iterates_the_edges_in_insertion_order(self):
+        edge_keys = [ edge.edge_key() for edge in self.frozen.iter_ordered_edges() ]
+        self.assertEqual(edge_keys, self.graph.edge_order)
+    
+    def test_it_keeps_the_topological_sort(self):
+        self.assertEqual(list(self.frozen.index_to_node), self.graph.index_to_node)
+        for node_id in range(4):
+            self.assertEqual(self.frozen.get_topo_index(node_id), self.graph.get_topo_index(node_id))
+    
+    def test_it_sets_attributes(self):
+        edge = self.frozen.get_edge("A", "B")
+        edge.set_attr('pct', 50.0)
+        edge.set_attr('pct_txt', '50.000%')
+        self.assertEqual(self.frozen.get_edge("A", "B").get_attr('pct'), 50.0)
+        self.assertEqual(self.frozen.get_edge("A", "B").get_attr('pct_txt'), '50.000%')
+        self.assertIsNone(self.frozen.get_edge("A", "C").get_attr('pct'))
+        node = self.frozen.get_node_by_label("A")
+        node.set_attr('ammount', 5.0)
+        self.assertEqual(self.frozen.get_node_by_label("A").get_attr('ammount'), 5.0)
+        # the source graph is not affected
+        self.assertIsNone(self.graph.get_edge("A", "B").get_attr('pct'))
+        self.assertEqual(self.graph.get_node_by_label("A").get_attr('ammount'), 10.0)
+    
+    def test_it_builds_the_same_paths(self):
+        for graph in [ self.graph, self.frozen ]:
+            for edge in graph.iter_ordered_edges():
+                edge.set_attr('pct', 50.0)
+            for node in graph.nodes:
+                node.set_attr('inputed_ammount', 10.0)
+        expected = self.graph.build_paths("B")
+        paths = self.frozen.build_paths("B")
+        self.assertEqual(len(paths), 5)
+        self.assertEqual(paths, expected)
@@ -1,5 +1,8 @@
+import sys
 import unittest
+import numpy as np
 from mafagrafos.graph import *
+from mafagrafos.paths import PathBounds
 
 class TestNodeVisitor(unittest.TestCase):
     
@@ -34,6 +37,12 @@ class TestNodeVisitor(unittest.TestCase):
         self.visitor.clear_visited()
         self.assertFalse(self.visitor.has_visited(node_id=100))
         self.assertFalse(self.visitor.has_visited(node_id=200))
+
+    def test_it_revisits_a_node_after_clearing(self):
+        self.visitor.visit(node_id=100)
+        self.visitor.clear_visited()
+        self.visitor.visit(node_id=100)
+        self.assertTrue(self.visitor.has_visited(node_id=100))
         
 class TestGraph(unittest.TestCase):
 
@@ -77,6 +86,30 @@ class TestGraph(unittest.TestCase):
         self.assertTrue(g.has_edge("CJ10", "CJ11"))
         self.assertFalse(g.has_edge("CJ11", "CJ10"))
         self.assertEqual(edge, g.get_edge("CJ10", "CJ11"))
+    
+    def test_it_adds_an_edge_by_ids(self):
+        g = Graph("Test Graph")
+        node_cj10 = g.add_node("CJ10")
+        node_cj11 = g.add_node("CJ11")
+        edge = g.add_edge_by_ids(node_cj10.node_id, node_cj11.node_id, "T0")
+        self.assertEqual(edge.label, "T0")
+        self.assertTrue(g.has_edge_by_ids(0, 1))
+        self.assertFalse(g.has_edge_by_ids(1, 0))
+        self.assertEqual(edge, g.get_edge_by_ids(0, 1))
+        self.assertIsNone(g.get_edge_by_ids(1, 0))
+        self.assertIsNone(g.add_edge_by_ids(1, 0))
+        self.assertIsNone(g.add_edge_by_ids(0, 0))
+
+    def test_it_keeps_the_edges_in_the_adjacency(self):
+        g = Graph("Test Graph")
+        for label in [ "CJ10", "CJ11", "CJ12" ]:
+            g.add_node(label)
+        edge_a = g.add_edge("CJ10", "CJ12")
+        edge_b = g.add_edge("CJ11", "CJ12")
+        self.assertIs(g.get_node_by_label("CJ10").out_edges[2], edge_a)
+        self.assertEqual(list(g.get_node_by_label("CJ12").in_edge_items()), [ (0, edge_a), (1, edge_b) ])
+        self.assertIsNone(g.add_edge("CJ12", "CJ10"))
+        self.assertEqual(list(g.get_node_by_label("CJ12").out_edge_items()), [])
 
 class TestGraphCycles(unittest.TestCase):
 
@@ -327,4 +360,520 @@ class TestGraphCycles(unittest.TestCase):
         self.assertEqual(edge.edge_key(), (4, 5))
         
         edge = graph.add_edge("D", "C")
-        self.assertEqual(edge.edge_key(), (3, 2))
\ No newline at end of file
+        self.assertEqual(edge.edge_key(), (3, 2))
+
+    def test_it_reorders_a_chain_deeper_than_the_recursion_limit(self):
+        graph = Graph('Test graph')
+        depth = 5000
+        for i in range(depth):
+            graph.add_node(f"N{i}")
+        for i in range(depth - 1):
+            graph.add_edge(f"N{i}", f"N{i+1}")
+        graph.add_node("HEAD")
+        edge = graph.add_edge("HEAD", "N0")
+        self.assertEqual(edge.edge_key(), (depth, 0))
+        self.assertTrue(graph.get_topo_index(depth) < graph.get_topo_index(0))
+        self.assertTrue(graph.get_topo_index(0) < graph.get_topo_index(depth - 1))
+
+    def test_it_fails_to_create_a_loop_deeper_than_the_recursion_limit(self):
+        graph = Graph('Test graph')
+        depth = 5000
+        for i in range(depth):
+            graph.add_node(f"N{i}")
+        for i in range(depth - 1):
+            graph.add_edge(f"N{i}", f"N{i+1}")
+        edge = graph.add_edge(f"N{depth-1}", "N0")
+        self.assertEqual(edge, None)
+        self.assertFalse(graph.has_edge(f"N{depth-1}", "N0"))
+
+class TestGraphLivePcts(unittest.TestCase):
+
+    EDGE_COLUMNS = None
+
+    def setUp(self):
+        # A is loaded with 100.0 and transfers 30.0 and 20.0 to B, then B transfers 10.0 to C
+        self.graph = Graph('Test graph', edge_columns=self.EDGE_COLUMNS)
+        for label in "ABC":
+            node = self.graph.add_node(label)
+            node.set_attr('ammount', 0.0)
+        self.graph.add_node_ammount(self.graph.get_node_by_label("A"), 100.0)
+        self.edge_ab = self.graph.add_edge("A", "B")
+        self.edge_bc = self.graph.add_edge("B", "C")
+    
+    def tearDown(self):
+        pass
+    
+    def transfer(self, edge, ammount):
+        self.graph.transfer_ammount(edge, ammount)
+        self.graph.add_node_ammount(self.graph.get_node_by_id(edge.to_id), ammount)
+    
+    def test_it_keeps_the_out_sums(self):
+        self.transfer(self.edge_ab, 30.0)
+        self.transfer(self.edge_ab, 20.0)
+        self.transfer(self.edge_bc, 10.0)
+        self.assertEqual(self.edge_ab.get_attr('ammount'), 50.0)
+        self.assertEqual(self.graph.get_node_by_label("A").get_attr('ammount'), 50.0)
+        self.assertEqual(self.graph.get_node_by_label("B").get_attr('ammount'), 40.0)
+        self.assertEqual([ self.graph.get_out_sum(node_id) for node_id in range(3) ], [ 100.0, 50.0, 10.0 ])
+    
+    def test_it_reads_the_pcts_at_any_moment(self):
+        self.transfer(self.edge_ab, 30.0)
+        self.assertEqual(self.graph.get_edge_pct(self.edge_ab), 30.0)
+        self.transfer(self.edge_ab, 20.0)
+        self.transfer(self.edge_bc, 10.0)
+        self.assertEqual(self.graph.get_edge_pct(self.edge_ab), 50.0)
+        self.assertEqual(self.graph.get_edge_pct(self.edge_bc), 20.0)
+    
+    def test_it_keeps_the_out_sums_whatever_writes_the_ammounts(self):
+        self.transfer(self.edge_ab, 30.0)
+        self.graph.add_node("D")
+        edge_ad = self.graph.add_edges([ ("A", "D", { 'ammount': 20.0 }) ])[0]
+        self.assertEqual(self.graph.get_out_sum(0), 120.0)
+        edge_ad.set_attr('ammount', 10.0)
+        self.assertEqual(self.graph.get_out_sum(0), 110.0)
+        self.graph.set_edge_values('ammount', [ 40.0, None, 10.0 ])
+        self.assertEqual(self.graph.get_out_sum(0), 120.0)
+        self.assertEqual(self.graph.get_edge_pct(self.edge_ab), 40.0 / 120.0 * 100.0)
+    
+    def test_it_keeps_the_out_sums_whatever_writes_the_node_ammounts(self):
+        node = self.graph.add_node("D", data={ 'ammount': 10.0 })
+        self.assertEqual(self.graph.get_out_sum(node.node_id), 10.0)
+        node.set_attr('ammount', 100.0)
+        edge = self.graph.add_edge("D", "A", data={ 'ammount': 50.0 })
+        self.assertEqual(self.graph.get_out_sum(node.node_id), 150.0)
+        self.assertEqual(self.graph.get_edge_pct(edge), 50.0 / 150.0 * 100.0)
+
+class TestGraphLivePctsColumnStore(TestGraphLivePcts):
+    # the edge ammounts live in a float column, where they are NaN until the first transfer
+
+    EDGE_COLUMNS = { 'ammount': np.float64 }
+
+    def test_it_reads_an_unset_ammount_as_none(self):
+        self.assertIsNone(self.edge_ab.get_attr('ammount'))
+        self.assertNotIn('ammount', self.edge_ab.get_data())
+        self.assertIsNone(self.graph.freeze().get_edge("A", "B").get_attr('ammount'))
+    
+class TestGraphBulkInsertion(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = Graph('Test graph')
+        for label in "ABCDEF":
+            self.graph.add_node(label)
+    
+    def tearDown(self):
+        pass
+    
+    def test_it_adds_a_batch_of_edges(self):
+        edges = self.graph.add_edges([
+            ("A", "B", None)
+        ,   ("B", "C", {'ammount': 1.0})
+        ,   ("C", "D", None)
+        ])
+        self.assertEqual([ edge.edge_key() for edge in edges ], [ (0, 1), (1, 2), (2, 3) ])
+        self.assertEqual(edges[1].get_attr('ammount'), 1.0)
+        self.assertEqual(self.graph.edge_order, [ (0, 1), (1, 2), (2, 3) ])
+    
+    def test_it_reorders_the_topological_sort_of_a_batch(self):
+        edges = self.graph.add_edges([
+            ("F", "E", None)
+        ,   ("E", "D", None)
+        ,   ("D", "A", None)
+        ])
+        self.assertTrue(all(edges))
+        for edge in edges:
+            self.assertTrue(self.graph.get_topo_index(edge.from_id) < self.graph.get_topo_index(edge.to_id))
+    
+    def test_it_rejects_self_loops_in_a_batch(self):
+        edges = self.graph.add_edges([ ("A", "A", None), ("A", "B", None) ])
+        self.assertEqual(edges[0], None)
+        self.assertEqual(edges[1].edge_key(), (0, 1))
+    
+    def test_it_reports_the_edges_closing_cycles_in_input_order(self):
+        self.graph.add_edge("A", "B")
+        edges = self.graph.add_edges([
+            ("B", "C", None)
+        ,   ("C", "A", None) # closes A -> B -> C -> A
+        ,   ("D", "E", None)
+        ,   ("E", "D", None) # closes D -> E -> D
+        ,   ("C", "D", None)
+        ])
+        self.assertEqual([ edge is None for edge in edges ], [ False, True, False, True, False ])
+        self.assertEqual(self.graph.edge_order, [ (0, 1), (1, 2), (3, 4), (2, 3) ])
+        self.assertFalse(self.graph.has_edge("C", "A"))
+        self.assertFalse(self.graph.has_edge("E", "D"))
+    
+    def test_it_matches_the_per_edge_insertion(self):
+        batch = [
+            ("F", "A", None)
+        ,   ("A", "C", None)
+        ,   ("C", "F", None)
+        ,   ("B", "D", None)
+        ,   ("E", "B", None)
+        ,   ("D", "E", None)
+        ,   ("C", "B", None)
+        ,   ("A", "E", None)
+        ]
+        graph = Graph('Test graph')
+        for label in "ABCDEF":
+            graph.add_node(label)
+        expected = [ graph.add_edge(from_label, to_label) for from_label, to_label, _ in batch ]
+        edges = self.graph.add_edges(batch)
+        self.assertEqual([ edge is None for edge in edges ], [ edge is None for edge in expected ])
+        self.assertEqual(self.graph.edge_order, graph.edge_order)
+
+class TestGraphVisitorStrategies(unittest.TestCase):
+
+    VISITOR_CLASSES = [ NodeVisitor, PearceKellyVisitor ]
+    
+    def setUp(self):
+        pass
+    
+    def tearDown(self):
+        pass
+    
+    def create_graph(self, visitor_class):
+        graph = Graph('Test graph', visitor_class=visitor_class)
+        for label in "ABCDEF":
+            graph.add_node(label)
+        return graph
+    
+    def assert_topologically_sorted(self, graph):
+        for from_id, to_id in graph.edges:
+            self.assertTrue(graph.get_topo_index(from_id) < graph.get_topo_index(to_id))
+        for topo_idx, node_id in enumerate(graph.index_to_node):
+            self.assertEqual(graph.get_topo_index(node_id), topo_idx)
+    
+    def test_it_uses_the_given_visitor_class(self):
+        for visitor_class in self.VISITOR_CLASSES:
+            graph = self.create_graph(visitor_class)
+            self.assertIsInstance(graph.visitor, visitor_class)
+    
+    def test_it_reorders_a_dag(self):
+        for visitor_class in self.VISITOR_CLASSES:
+            graph = self.create_graph(visitor_class)
+            for from_label, to_label in [ ("F", "E"), ("E", "D"), ("C", "B"), ("D", "C"), ("B", "A"), ("F", "A") ]:
+                self.assertIsNotNone(graph.add_edge(from_label, to_label))
+                self.assert_topologically_sorted(graph)
+    
+    def test_it_fails_to_create_loops(self):
+        for visitor_class in self.VISITOR_CLASSES:
+            graph = self.create_graph(visitor_class)
+            graph.add_edge("A", "B")
+            graph.add_edge("B", "C")
+            graph.add_edge("D", "E")
+            self.assertIsNone(graph.add_edge("C", "A"))
+            self.assertIsNone(graph.add_edge("E", "D"))
+            self.assertIsNotNone(graph.add_edge("C", "D"))
+            self.assertIsNone(graph.add_edge("E", "A"))
+            self.assert_topologically_sorted(graph)
+    
+    def test_it_only_reorders_the_reached_nodes(self):
+        graph = self.create_graph(PearceKellyVisitor)
+        graph.add_edge("F", "A")
+        # A and F swap places, every node in between keeps its index
+        self.assertEqual(graph.index_to_node, [ 5, 1, 2, 3, 4, 0 ])
+
+class TestGraphAttribution(unittest.TestCase):
+
+    def setUp(self):
+        # A -> B -> D, A -> C -> D, B -> C
+        self.graph = Graph('Test graph')
+        for label in "ABCD":
+            node = self.graph.add_node(label)
+            node.set_attr('inputed_ammount', 100.0)
+        self.add_edge("A", "B", 50.0, [0])
+        self.add_edge("A", "C", 50.0, [1])
+        self.add_edge("B", "C", 50.0, [2])
+        self.add_edge("B", "D", 50.0, [3])
+        self.add_edge("C", "D", 100.0, [4])
+        # the ammounts build_paths patches C -> D with when C receives after C -> D
+        self.graph.get_edge("C", "D").set_attr('ammount', 100.0)
+        node_c = self.graph.get_node_by_label("C")
+        node_c.set_attr('received_ammount', 50.0)
+        node_c.set_attr('transferred_ammount', 100.0)
+    
+    def tearDown(self):
+        pass
+    
+    def add_edge(self, from_label, to_label, pct, time):
+        edge = self.graph.add_edge(from_label, to_label)
+        edge.set_attr('pct', pct)
+        edge.set_attr('time', time)
+        return edge
+    
+    def aggregate_paths(self, sink_label):
+        result = {}
+        for path in self.graph.build_paths(sink_label):
+            pct, path_count = result.get(path.from_label, (0.0, 0))
+            result[path.from_label] = (pct + path.pct, path_count + 1)
+        return result
+    
+    def test_it_aggregates_the_paths_into_the_sink(self):
+        attributions = self.graph.attribute_to_sink("D")
+        self.assertEqual([ attribution.from_label for attribution in attributions ], [ "A", "B", "C" ])
+        expected = self.aggregate_paths("D")
+        for attribution in attributions:
+            pct, path_count = expected[attribution.from_label]
+            self.assertAlmostEqual(attribution.pct, pct)
+            self.assertEqual(attribution.path_count, path_count)
+            self.assertEqual(attribution.to_label, "D")
+        a = attributions[0]
+        # A -> B -> D, A -> B -> C -> D, A -> C -> D
+        self.assertEqual(a.path_count, 3)
+        self.assertAlmostEqual(a.pct, 0.25 + 0.25 + 0.5)
+        self.assertAlmostEqual(a.resulting_ammount, 100.0)
+    
+    def test_it_skips_temporally_inconsistent_paths(self):
+        # B -> C happens after C -> D, so A -> B -> C -> D is not consistent and C -> D is patched
+        self.graph.get_edge("B", "C").set_attr('time', [5])
+        attributions = self.graph.attribute_to_sink("D")
+        a = attributions[0]
+        self.assertEqual(a.path_count, 2)
+        self.assertAlmostEqual(a.pct, 0.25 + 0.5 * 100.0 / 150.0)
+        b = attributions[1]
+        self.assertEqual(b.from_label, "B")
+        self.assertEqual(b.path_count, 1)
+        self.assertAlmostEqual(b.pct, 0.5)
+    
+    def test_it_applies_the_pcts_build_paths_patches(self):
+        # B -> C happens after C -> D, so build_paths patches C -> D with the ammounts of C and the
+        # path C -> D adds the received_ammount of C to its resulting ammount
+        self.graph.get_edge("B", "C").set_attr('time', [5])
+        attributions = self.graph.attribute_to_sink("D")
+        c = attributions[2]
+        self.assertAlmostEqual(c.pct, 100.0 / 150.0)
+        self.assertAlmostEqual(c.resulting_ammount, 50.0 + 100.0 * 100.0 / 150.0)
+        resulting_ammounts = {}
+        for path in self.graph.build_paths("D"):
+            resulting_ammounts[path.from_label] = resulting_ammounts.get(path.from_label, 0.0) + path.received_ammount + path.inputed_ammount * path.pct
+        self.assertEqual(sorted(resulting_ammounts.keys()), [ attribution.from_label for attribution in attributions ])
+        for attribution in attributions:
+            self.assertAlmostEqual(attribution.resulting_ammount, resulting_ammounts[attribution.from_label])
+    
+    def test_it_ignores_nodes_not_reaching_the_sink(self):
+        attributions = self.graph.attribute_to_sink("B")
+        self.assertEqual(len(attributions), 1)
+        self.assertEqual(attributions[0].from_label, "A")
+        self.assertAlmostEqual(attributions[0].pct, 0.5)
+
+class TestGraphPathIteration(unittest.TestCase):
+
+    def setUp(self):
+        # A -> C -> D, B -> C, with A -> C happening after C -> D
+        self.graph = Graph('Test graph')
+        for label in "ABCD":
+            node = self.graph.add_node(label)
+            node.set_attr('inputed_ammount', 10.0)
+        node_c = self.graph.get_node_by_label("C")
+        node_c.set_attr('inputed_ammount', 50.0)
+        node_c.set_attr('received_ammount', 40.0)
+        node_c.set_attr('transferred_ammount', 30.0)
+        self.add_edge("A", "C", 20.0, [9])
+        self.add_edge("C", "D", 30.0, [5])
+        self.add_edge("B", "C", 20.0, [0])
+        for edge in self.graph.iter_ordered_edges():
+            edge.set_attr('pct', 100.0)
+    
+    def tearDown(self):
+        pass
+    
+    def add_edge(self, from_label, to_label, ammount, time):
+        edge = self.graph.add_edge(from_label, to_label)
+        edge.set_attr('ammount', ammount)
+        edge.set_attr('time', time)
+        return edge
+    
+    def test_it_iterates_the_paths_lazily(self):
+        paths = self.graph.iter_paths("D")
+        path = next(paths)
+        self.assertEqual(path.from_label, "C")
+        self.assertEqual(path.to_label, "D")
+    
+    def test_it_yields_the_same_paths_as_build_paths(self):
+        paths = [ (path.from_label, path.pct, path.inputed_ammount, path.received_ammount) for path in self.graph.iter_paths("D") ]
+        self.setUp()
+        expected = [ (path.from_label, path.pct, path.inputed_ammount, path.received_ammount) for path in self.graph.build_paths("D") ]
+        self.assertEqual(paths, expected)
+    
+    def test_it_patches_the_previous_path_before_yielding_it(self):
+        from_labels = []
+        patched = None
+        for path in self.graph.iter_paths("D"):
+            from_labels.append(path.from_label)
+            if path.from_label == "C":
+                # A -> C -> D is temporally inconsistent, so C -> D discounts the ammount C received
+                patched = (path.segments[0].pct, path.inputed_ammount, path.received_ammount)
+        self.assertEqual(from_labels, [ "C", "B" ])
+        self.assertEqual(patched, (0.75, 50.0, 40.0))
+        self.assertEqual(self.graph.get_edge("C", "D").get_attr('pct'), 0.75)
+    
+    def test_it_builds_paths_deeper_than_the_recursion_limit(self):
+        graph = Graph('Test graph')
+        depth = sys.getrecursionlimit() + 1000
+        for i in range(depth + 1):
+            node = graph.add_node(f"X--{i}")
+            node.set_attr('inputed_ammount', 1.0)
+        for i in range(depth):
+            edge = graph.add_edge(f"X--{i}", f"X--{i+1}")
+            edge.set_attr('pct', 100.0)
+            edge.set_attr('time', [i])
+        paths = graph.build_paths(f"X--{depth}")
+        self.assertEqual(len(paths), depth)
+        self.assertEqual(paths[0].from_label, f"X--{depth-1}")
+        self.assertEqual(paths[-1].from_label, "X--0")
+        self.assertEqual(paths[-1].segment_count, depth)
+
+class TestGraphParallelPaths(unittest.TestCase):
+
+    def setUp(self):
+        # A -> C -> D -> S and C -> D -> E -> S. A -> C happens after C -> D, so the D subtree patches
+        # C -> D, and the E subtree goes through the patched edge
+        self.graph = self.create_graph()
+    
+    def tearDown(self):
+        pass
+    
+    def create_graph(self):
+        graph = Graph('Test graph')
+        for label in "ABCDES":
+            node = graph.add_node(label)
+            node.set_attr('inputed_ammount', 10.0)
+        node_c = graph.get_node_by_label("C")
+        node_c.set_attr('inputed_ammount', 50.0)
+        node_c.set_attr('received_ammount', 40.0)
+        node_c.set_attr('transferred_ammount', 40.0)
+        for from_label, to_label, ammount, time in [ ("D", "S", 10.0, [5]), ("E", "S", 10.0, [10]), ("C", "D", 20.0, [5]), ("D", "E", 10.0, [6]), ("A", "C", 20.0, [9]), ("B", "C", 20.0, [0]) ]:
+            edge = graph.add_edge(from_label, to_label)
+            edge.set_attr('ammount', ammount)
+            edge.set_attr('time', time)
+            edge.set_attr('pct', 50.0)
+        return graph
+    
+    def describe(self, paths):
+        return [ ([ (segment.from_label, segment.pct) for segment in path.segments ], path.pct, path.inputed_ammount, path.received_ammount) for path in paths ]
+    
+    def test_it_builds_the_same_paths_as_the_sequential_walk(self):
+        expected = self.describe(self.create_graph().build_paths("S"))
+        paths = self.describe(self.graph.build_paths("S", workers=2))
+        self.assertEqual(len(paths), 7)
+        self.assertEqual(paths, expected)
+    
+    def test_it_applies_the_patched_pcts_to_the_graph(self):
+        self.graph.build_paths("S", workers=2)
+        edge = self.graph.get_edge("C", "D")
+        self.assertEqual(edge.get_attr('pct'), 0.4)
+        self.assertEqual(edge.get_attr('pct_txt'), '40.00%')
+    
+    def test_it_shares_the_suffixes_of_the_rebuilt_paths(self):
+        paths = self.graph.build_paths("S", workers=2)
+        self.assertIs(paths[1].head.next, paths[0].head)
+    
+    def test_it_builds_the_paths_of_a_frozen_graph(self):
+        expected = self.describe(self.create_graph().build_paths("S"))
+        paths = self.describe(self.graph.freeze().build_paths("S", workers=2))
+        self.assertEqual(paths, expected)
+
+class TestGraphManySinks(unittest.TestCase):
+    
+    # same graph as TestGraphParallelPaths
+    create_graph    = TestGraphParallelPaths.create_graph
+    describe        = TestGraphParallelPaths.describe
+    
+    def setUp(self):
+        self.graph = self.create_graph()
+    
+    def test_it_builds_the_paths_of_every_sink(self):
+        expected = { sink_label: self.describe(self.create_graph().build_paths(sink_label)) for sink_label in [ "S", "D", "E" ] }
+        paths = self.graph.build_paths_many([ "S", "D", "E" ])
+        self.assertEqual(list(paths), [ "S", "D", "E" ])
+        self.assertEqual({ sink_label: self.describe(sink_paths) for sink_label, sink_paths in paths.items() }, expected)
+    
+    def test_it_restores_the_patched_pcts_between_sinks(self):
+        for sink_label, paths in self.graph.iter_paths_many([ "S", "D" ]):
+            list(paths)
+            self.assertEqual(self.graph.get_edge("C", "D").get_attr('pct'), 0.4)
+        self.assertEqual(self.graph.get_edge("C", "D").get_attr('pct'), 50.0)
+    
+    def test_it_builds_the_paths_of_every_sink_in_parallel(self):
+        expected = self.describe(self.create_graph().build_paths("E"))
+        paths = self.graph.build_paths_many([ "S", "E" ], workers=2)
+        self.assertEqual(self.describe(paths["E"]), expected)
+
+class TestGraphBoundedPaths(unittest.TestCase):
+
+    def setUp(self):
+        # A -> B -> C -> S and D -> B, every edge carrying half of its source
+        self.graph = Graph('Test graph')
+        for label in "ABCDS":
+            node = self.graph.add_node(label)
+            node.set_attr('inputed_ammount', 10.0)
+        for from_label, to_label, time in [ ("C", "S", [3]), ("B", "C", [2]), ("A", "B", [1]), ("D", "B", [0]) ]:
+            edge = self.graph.add_edge(from_label, to_label)
+            edge.set_attr('time', time)
+            edge.set_attr('pct', 50.0)
+    
+    def tearDown(self):
+        pass
+    
+    def test_it_builds_every_path_within_the_bounds(self):
+        bounds = PathBounds(min_pct=0.1, max_depth=3, max_paths=10)
+        paths = self.graph.build_paths("S", bounds=bounds)
+        self.assertEqual([ path.from_label for path in paths ], [ "C", "B", "A", "D" ])
+        self.assertEqual(bounds.path_count, 4)
+        self.assertEqual(bounds.pruned_count, 0)
+        self.assertEqual(bounds.residual_pcts, {})
+    
+    def test_it_prunes_the_paths_below_min_pct(self):
+        bounds = PathBounds(min_pct=0.2)
+        paths = self.graph.build_paths("S", bounds=bounds)
+        self.assertEqual([ path.from_label for path in paths ], [ "C", "B" ])
+        self.assertEqual(bounds.residual_pcts, { "A": 0.125, "D": 0.125 })
+        self.assertEqual(bounds.residual_counts, { "A": 1, "D": 1 })
+        self.assertEqual(sum(path.pct for path in paths) + bounds.residual_pct, 1.0)
+    
+    def test_it_prunes_the_paths_deeper_than_max_depth(self):
+        bounds = PathBounds(max_depth=1)
+        paths = self.graph.build_paths("S", bounds=bounds)
+        self.assertEqual([ path.from_label for path in paths ], [ "C" ])
+        self.assertEqual(bounds.residual_pcts, { "B": 0.25 })
+    
+    def test_it_keeps_the_ammounts_of_the_pruned_subtree(self):
+        bounds = PathBounds(max_depth=1)
+        paths = self.graph.build_paths("S", bounds=bounds)
+        self.assertEqual(bounds.residual_ammounts, { "B": 5.0 })
+        self.assertEqual(bounds.residual_counts, { "B": 3 })
+        unbounded = sum(path.received_ammount + path.inputed_ammount * path.pct for path in self.graph.build_paths("S"))
+        self.assertEqual(sum(path.received_ammount + path.inputed_ammount * path.pct for path in paths) + bounds.residual_ammount, unbounded)
+    
+    def test_it_keeps_the_ammounts_of_the_patched_paths(self):
+        # A -> B happens after B -> C, so the paths starting with B -> C are patched
+        self.graph.get_edge("A", "B").set_attr('time', [5])
+        self.graph.get_edge("A", "B").set_attr('ammount', 5.0)
+        self.graph.get_edge("D", "B").set_attr('ammount', 5.0)
+        self.graph.get_edge("B", "C").set_attr('ammount', 10.0)
+        node = self.graph.get_node_by_label("B")
+        node.set_attr('received_ammount', 10.0)
+        node.set_attr('transferred_ammount', 10.0)
+        unbounded = sum(path.received_ammount + path.inputed_ammount * path.pct for path in self.graph.build_paths("S"))
+        for bounds in [ PathBounds(max_depth=1), PathBounds(max_depth=2), PathBounds(min_pct=0.4), PathBounds(max_paths=1) ]:
+            paths = self.graph.build_paths("S", bounds=bounds)
+            self.assertAlmostEqual(sum(path.received_ammount + path.inputed_ammount * path.pct for path in paths) + bounds.residual_ammount, unbounded)
+    
+    def test_it_stops_after_max_paths(self):
+        bounds = PathBounds(max_paths=3)
+        paths = self.graph.build_paths("S", bounds=bounds)
+        self.assertEqual([ path.from_label for path in paths ], [ "C", "B", "A" ])
+        self.assertEqual(bounds.residual_pcts, { "D": 0.125 })
+    
+    def test_it_stops_when_the_time_budget_is_spent(self):
+        bounds = PathBounds(time_budget=0.0)
+        paths = self.graph.build_paths("S", bounds=bounds)
+        self.assertEqual(paths, [])
+        self.assertEqual(bounds.residual_pcts, { "C": 0.5 })
+    
+    def test_it_resets_the_residuals_for_every_enumeration(self):
+        bounds = PathBounds(min_pct=0.2)
+        self.graph.build_paths("S", bounds=bounds)
+        self.graph.build_paths("C", bounds=bounds)
+        self.assertEqual(bounds.path_count, 3)
+        self.assertEqual(bounds.residual_pcts, {})
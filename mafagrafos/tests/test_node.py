@@ -1,5 +1,6 @@
 import unittest
 from mafagrafos.node import *
+from mafagrafos.edge import Edge
 
 class TestNode(unittest.TestCase):
 
@@ -30,6 +31,15 @@ class TestNode(unittest.TestCase):
         node_a.add_out_edge(node_b.node_id)
         self.assertTrue(node_a.has_out_edge(node_b.node_id))
 
+    def test_it_keeps_the_edge_of_a_neighbour(self):
+        node_a = Node(0, "A")
+        node_b = Node(1, "B")
+        edge = Edge(0, 1, None)
+        node_a.add_out_edge(node_b.node_id, edge)
+        node_b.add_in_edge(node_a.node_id, edge)
+        self.assertEqual(list(node_a.out_edge_items()), [ (1, edge) ])
+        self.assertEqual(list(node_b.in_edge_items()), [ (0, edge) ])
+
     def test_it_adds_an_in_edge(self):
         node_a = Node(0, "A")
         node_b = Node(1, "B")
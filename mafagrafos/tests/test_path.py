@@ -1,5 +1,6 @@
 import unittest
 from mafagrafos.paths import *
+from mafagrafos.graph import Graph
 
 class TestPath(unittest.TestCase):
 
@@ -88,3 +89,99 @@ class TestPath(unittest.TestCase):
         self.path.push_segment(segment)
         self.assertEqual(self.path.pct, 0.5*0.25*0.125)
     
+    def test_it_shares_the_common_suffix_between_clones(self):
+        segment = Segment(from_label='B', to_label='A', pct=0.5, min_t=1, max_t=10)
+        self.path.push_segment(segment)
+        clone1 = self.path.clone()
+        clone2 = self.path.clone()
+        clone1.push_segment(Segment(from_label='C', to_label='B', pct=0.25, min_t=1, max_t=10))
+        clone2.push_segment(Segment(from_label='D', to_label='B', pct=0.125, min_t=1, max_t=10))
+        self.assertIs(clone1.head.next, clone2.head.next)
+        self.assertEqual(self.path.segment_count, 1)
+        self.assertEqual(self.path.from_label, 'B')
+        self.assertEqual([ s.from_label for s in clone1.segments ], [ 'C', 'B' ])
+        self.assertEqual([ s.from_label for s in clone2.segments ], [ 'D', 'B' ])
+
+    def test_it_pops_a_segment_without_changing_clones(self):
+        self.path.push_segment(Segment(from_label='B', to_label='A', pct=0.5, min_t=1, max_t=10))
+        self.path.push_segment(Segment(from_label='C', to_label='B', pct=0.25, min_t=1, max_t=10))
+        clone = self.path.clone()
+        self.path.pop_segment()
+        self.assertEqual(clone.segment_count, 2)
+        self.assertEqual(clone.from_label, 'C')
+        self.assertEqual(len(clone.segments), 2)
+
+    def test_it_gives_access_to_the_first_and_last_segments(self):
+        first = Segment(from_label='C', to_label='B', pct=0.25, min_t=2, max_t=5)
+        last = Segment(from_label='B', to_label='A', pct=0.5, min_t=1, max_t=10)
+        self.path.push_segment(last)
+        self.path.push_segment(first)
+        self.assertIs(self.path.first_segment, first)
+        self.assertIs(self.path.last_segment, last)
+        self.assertEqual(self.path.min_t, 2)
+        self.assertEqual(self.path.max_t, 10)
+
+    def test_it_updates_the_cached_percentual_of_a_patched_path(self):
+        self.path.push_segment(Segment(from_label='B', to_label='A', pct=0.5, min_t=1, max_t=10))
+        self.path.push_segment(Segment(from_label='C', to_label='B', pct=0.25, min_t=1, max_t=10))
+        self.path.set_first_segment_pct(0.125)
+        self.assertEqual(self.path.first_segment.pct, 0.125)
+        self.assertEqual(self.path.pct, 0.5*0.125)
+
+class TestIdSegment(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = Graph('Test graph')
+        for label in "ABC":
+            self.graph.add_node(label)
+        self.path = PathV2()
+    
+    def tearDown(self):
+        pass
+    
+    def test_it_resolves_the_labels_through_the_graph(self):
+        segment = IdSegment(1, 0, 0.5, 1, 10, self.graph)
+        self.assertEqual(segment.from_label, 'B')
+        self.assertEqual(segment.to_label, 'A')
+        self.assertEqual(segment, Segment(from_label='B', to_label='A', pct=0.5, min_t=1, max_t=10))
+    
+    def test_it_chains_segments_by_node_id(self):
+        self.path.push_segment(IdSegment(1, 0, 0.5, 1, 10, self.graph))
+        self.path.push_segment(IdSegment(2, 1, 0.25, 1, 10, self.graph))
+        self.assertEqual(self.path.from_label, 'C')
+        self.assertEqual(self.path.to_label, 'A')
+        with self.assertRaises(AssertionError):
+            self.path.push_segment(IdSegment(2, 0, 0.25, 1, 10, self.graph))
+
+class TestPathMetrics(unittest.TestCase):
+
+    def setUp(self):
+        pass
+    
+    def tearDown(self):
+        pass
+    
+    def create_path(self, *segments):
+        path = PathV2()
+        for segment in reversed(segments):
+            path.push_segment(segment)
+        return path
+    
+    def test_it_computes_the_metrics_of_many_paths(self):
+        path1 = self.create_path(
+            Segment(from_label='C', to_label='B', pct=0.25, min_t=2, max_t=3)
+        ,   Segment(from_label='B', to_label='A', pct=0.5, min_t=4, max_t=10)
+        )
+        path1.inputed_ammount = 100.0
+        path2 = self.create_path(Segment(from_label='D', to_label='A', pct=0.5, min_t=1, max_t=7))
+        path2.inputed_ammount = 10.0
+        path2.received_ammount = 1.0
+        metrics = path_metrics(iter([ path1, path2 ]))
+        self.assertEqual(list(metrics['pct']), [ 0.125, 0.5 ])
+        self.assertEqual(list(metrics['min_t']), [ 2, 1 ])
+        self.assertEqual(list(metrics['max_t']), [ 10, 7 ])
+        self.assertEqual(list(metrics['resulting_ammount']), [ 12.5, 6.0 ])
+    
+    def test_it_computes_the_metrics_of_no_paths(self):
+        metrics = path_metrics([])
+        self.assertEqual(len(metrics['pct']), 0)
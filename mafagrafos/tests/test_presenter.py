@@ -0,0 +1,87 @@
+import io
+import os
+import gzip
+import tempfile
+import unittest
+from mafagrafos.graph import *
+from mafagrafos.presenter import *
+
+class TestGraphPresenter(unittest.TestCase):
+
+    def setUp(self):
+        # A keeps 5.0 and transfers 10.0 and 5.0, so its edges carry 50% and 25% of it
+        self.graph = Graph('Test graph')
+        for label, ammount in [ ("A", 5.0), ("B", 0.0), ("C", 3.0) ]:
+            node = self.graph.add_node(label)
+            node.set_attr('ammount', ammount)
+        self.graph.add_edge("A", "B", data={ 'ammount': 10.0, 'time': [0] })
+        self.graph.add_edge("A", "C", data={ 'ammount': 5.0, 'time': [1] })
+        self.graph.add_edge("B", "C", data={ 'ammount': 10, 'time': [2] })
+    
+    def tearDown(self):
+        pass
+    
+    def get_pcts(self, graph):
+        return [ edge.get_attr('pct') for edge in graph.iter_ordered_edges() ]
+    
+    def test_it_computes_the_pcts(self):
+        GraphPresenter(self.graph).compute_pcts()
+        self.assertEqual(self.get_pcts(self.graph), [ 50.0, 25.0, 100.0 ])
+    
+    def test_it_computes_the_pcts_of_a_frozen_graph(self):
+        frozen = self.graph.freeze()
+        GraphPresenter(frozen).compute_pcts()
+        self.assertEqual(self.get_pcts(frozen), [ 50.0, 25.0, 100.0 ])
+        self.assertEqual(self.get_pcts(self.graph), [ None, None, None ])
+    
+    def test_it_sums_the_out_edges_in_their_order(self):
+        # 1.0 is lost when added to 2 ** 53 and kept when added to 1.0 first
+        node = self.graph.add_node("D")
+        node.set_attr('ammount', 1.0)
+        self.graph.add_edge("D", "A", data={ 'ammount': 2.0 ** 53, 'time': [3] })
+        self.graph.add_edge("D", "B", data={ 'ammount': 1.0, 'time': [4] })
+        for graph in [ self.graph, self.graph.freeze() ]:
+            GraphPresenter(graph).compute_pcts()
+            self.assertEqual(graph.get_edge("D", "B").get_attr('pct'), 1.0 / ((1.0 + 2.0 ** 53) + 1.0) * 100.0)
+    
+    def test_it_formats_the_pcts_when_writing_the_dot_file(self):
+        presenter = GraphPresenter(self.graph)
+        presenter.compute_pcts()
+        self.assertIsNone(self.graph.get_edge("A", "B").get_attr('pct_txt'))
+        self.assertIn('"T0\\n$10.0\\n50.000%"', presenter.generate_dot())
+    
+    def test_it_keeps_the_patched_pct_texts(self):
+        presenter = GraphPresenter(self.graph)
+        presenter.compute_pcts()
+        edge = self.graph.get_edge("A", "C")
+        edge.set_attr('pct', 0.4)
+        edge.set_attr('pct_txt', '40.00%')
+        self.assertIn('"T1\\n$5.0\\n40.00%"', presenter.generate_dot())
+    
+    def test_it_streams_the_dot_file(self):
+        presenter = GraphPresenter(self.graph)
+        presenter.compute_pcts()
+        fh = io.StringIO()
+        presenter.write_dot(fh)
+        self.assertEqual(fh.getvalue(), presenter.generate_dot() + "\n")
+    
+    def test_it_writes_the_ancestors_of_a_sink(self):
+        self.graph.add_node("D")
+        self.graph.add_edge("A", "D", data={ 'ammount': 1.0, 'time': [3], 'pct': 1.0 })
+        presenter = GraphPresenter(self.graph)
+        presenter.compute_pcts()
+        self.assertEqual(list(presenter.get_ancestor_mask("B")), [ 1, 1, 0, 0 ])
+        lines = list(presenter.iter_dot_lines("C"))
+        self.assertEqual(len(lines), 3 + 3 + 3 + 1)
+        self.assertFalse(any('"D"' in line for line in lines))
+        self.assertEqual(len(list(presenter.iter_dot_lines())), 3 + 4 + 4 + 1)
+    
+    def test_it_writes_a_compressed_dot_file(self):
+        presenter = GraphPresenter(self.graph)
+        presenter.compute_pcts()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_name = os.path.join(tmp_dir, "graph.dot.gz")
+            with open_dot_file(file_name) as fh:
+                presenter.write_dot(fh)
+            with gzip.open(file_name, "rt") as fh:
+                self.assertEqual(fh.read(), presenter.generate_dot() + "\n")
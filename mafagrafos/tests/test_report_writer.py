@@ -0,0 +1,89 @@
+import os
+import csv
+import unittest
+import tempfile
+import importlib.util
+
+import openpyxl
+
+from mafagrafos.report_writer import *
+
+COLUMNS = {
+    'ORIGEM'        : 'str'
+,   'CAMINHOS'      : 'int'
+,   'PERCENTUAL'    : 'float'
+}
+
+ROWS = [
+    [ "A", 1, 50.0 ]
+,   [ "B", 2, 25.5 ]
+,   [ None, 3, None ]
+]
+
+class TestReportWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def get_path(self, file_name):
+        return os.path.join(self.tmp_dir.name, file_name)
+
+    def write_report(self, file_name, batch_size=DEFAULT_BATCH_SIZE):
+        path = self.get_path(file_name)
+        with open_report(path, batch_size) as report:
+            table = report.open_table('ORIGENS', COLUMNS)
+            for row in ROWS:
+                table.append_row(row)
+        return path
+
+    def test_it_names_the_table_files(self):
+        self.assertEqual(get_table_path("report.csv", "CAMINHOS"), "report_CAMINHOS.csv")
+
+    def test_it_writes_a_workbook(self):
+        path = self.write_report("report.xlsx")
+        workbook = openpyxl.load_workbook(path)
+        rows = list(workbook['ORIGENS'].iter_rows(values_only=True))
+        self.assertEqual(rows[0], (None, 'ORIGEM', 'CAMINHOS', 'PERCENTUAL'))
+        self.assertEqual([ list(row) for row in rows[1:] ], [ [ idx ] + row for idx, row in enumerate(ROWS) ])
+
+    def test_it_splits_the_tables_longer_than_a_sheet(self):
+        path = self.get_path("report.xlsx")
+        report = open_report(path, batch_size=1)
+        report.MAX_SHEET_ROWS = 2
+        table = report.open_table('ORIGENS', COLUMNS)
+        for row in ROWS:
+            table.append_row(row)
+        report.close()
+        workbook = openpyxl.load_workbook(path)
+        self.assertEqual(workbook.sheetnames, [ 'ORIGENS', 'ORIGENS_2' ])
+        rows = list(workbook['ORIGENS_2'].iter_rows(values_only=True))
+        self.assertEqual(rows, [ (None, 'ORIGEM', 'CAMINHOS', 'PERCENTUAL'), (2, None, 3, None) ])
+
+    def test_it_writes_a_csv_file_per_table(self):
+        self.write_report("report.csv", batch_size=2)
+        with open(self.get_path("report_ORIGENS.csv"), newline='') as fh:
+            rows = list(csv.reader(fh))
+        self.assertEqual(rows, [ [ 'ORIGEM', 'CAMINHOS', 'PERCENTUAL' ], [ 'A', '1', '50.0' ], [ 'B', '2', '25.5' ], [ '', '3', '' ] ])
+
+    @unittest.skipUnless(importlib.util.find_spec("pyarrow"), "pyarrow is not installed")
+    def test_it_writes_a_parquet_file_per_table(self):
+        import pyarrow.parquet as pq
+        self.write_report("report.parquet", batch_size=2)
+        parquet_file = pq.ParquetFile(self.get_path("report_ORIGENS.parquet"))
+        self.assertEqual(parquet_file.num_row_groups, 2)
+        self.assertEqual(parquet_file.read().to_pylist()[1], { 'ORIGEM': "B", 'CAMINHOS': 2, 'PERCENTUAL': 25.5 })
+
+    @unittest.skipUnless(importlib.util.find_spec("pyarrow"), "pyarrow is not installed")
+    def test_it_writes_an_arrow_file_per_table(self):
+        import pyarrow as pa
+        self.write_report("report.arrow", batch_size=2)
+        reader = pa.ipc.open_file(self.get_path("report_ORIGENS.arrow"))
+        self.assertEqual(reader.num_record_batches, 2)
+        self.assertEqual([ list(row.values()) for row in reader.read_all().to_pylist() ], ROWS)
+
+    def test_it_fails_to_write_an_unknown_format(self):
+        with self.assertRaises(ValueError):
+            open_report(self.get_path("report.txt"))
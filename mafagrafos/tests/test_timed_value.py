@@ -57,4 +57,43 @@ class TestTimedValue(unittest.TestCase):
         tm.update_at(10, 100.0)
         value = tm.value_at(11)
         self.assertEqual(300.0, value)
-        
\ No newline at end of file
+        
+    def test_it_retrieves_the_value_of_the_older_entry_for_an_instant_between_entries(self):
+        tm = TimedValue()
+        tm.update_at(8, 100.0)
+        tm.update_at(10, 100.0)
+        self.assertEqual(100.0, tm.value_at(8))
+        self.assertEqual(100.0, tm.value_at(9))
+    
+    def test_it_retrieves_many_values_at_once(self):
+        tm = TimedValue()
+        tm.update_at(8, 100.0)
+        tm.update_at(9, 100.0)
+        tm.update_at(10, 100.0)
+        values = tm.values_at([ 7, 8, 9.5, 10, 11 ])
+        self.assertEqual(values.tolist(), [ 0.0, 100.0, 200.0, 300.0, 300.0 ])
+        self.assertEqual(values.tolist(), [ tm.value_at(t) for t in [ 7, 8, 9.5, 10, 11 ] ])
+    
+    def test_it_retrieves_many_zeros_if_nothing_is_given(self):
+        tm = TimedValue()
+        self.assertEqual(tm.values_at([ 1, 2 ]).tolist(), [ 0.0, 0.0 ])
+    
+    def test_it_updates_many_values_at_once(self):
+        tm = TimedValue()
+        tm.update_at(8, 100.0)
+        tm.update_many([ 8, 9, 9, 10 ], [ 10.0, 20.0, 30.0, 40.0 ])
+        expected = TimedValue()
+        for time, value in [ (8, 100.0), (8, 10.0), (9, 20.0), (9, 30.0), (10, 40.0) ]:
+            expected.update_at(time, value)
+        self.assertEqual(list(tm.times), [ 8.0, 9.0, 10.0 ])
+        self.assertEqual(list(tm.values), list(expected.values))
+        self.assertEqual(tm.last_time, 10)
+        self.assertEqual(tm.value_at(9), 160.0)
+    
+    def test_it_fails_to_update_many_unsorted_values(self):
+        tm = TimedValue()
+        with self.assertRaises(AssertionError):
+            tm.update_many([ 9, 8 ], [ 1.0, 1.0 ])
+        tm.update_at(10, 1.0)
+        with self.assertRaises(AssertionError):
+            tm.update_many([ 9 ], [ 1.0 ])
@@ -1,49 +1,92 @@
+from array import array
+from bisect import bisect_right
+
+import numpy as np
+
 class TimedValueEntry:
-    
+
     __slots__ = ['time', 'value']
-    
+
     def __init__(self, time, value=0.0):
         self.time = time
         self.value = value
-    
+
     def update(self, value):
         self.value += value
-    
+
 class TimedValue:
-    
-    __slots__ = ['entries', 'last_time']
-    
+    # cumulative value through time. times and values are parallel arrays of float64: times is sorted
+    # and holds each instant once, values[i] is the sum of every update made up to times[i]
+
+    __slots__ = ['times', 'values', 'last_time']
+
     def __init__(self):
-        self.entries = []
+        self.times = array('d')
+        self.values = array('d')
         self.last_time = None
-    
+
+    @property
+    def entries(self):
+        # materialized on demand - O(n)
+        return [ TimedValueEntry(time, value) for time, value in zip(self.times, self.values) ]
+
     def update_at(self, time, value):
         if self.last_time is None:
             self.last_time = time
-            new_entry = TimedValueEntry(time, value)
-            self.entries.append(new_entry)
+            self.times.append(time)
+            self.values.append(value)
             return
-        
+
         assert self.last_time <= time
         if self.last_time == time:
-            self.entries[-1].update(value)
+            self.values[-1] += value
         else:
             self.last_time = time
-            current_value = self.entries[-1].value
-            new_entry = TimedValueEntry(time, value + current_value)
-            self.entries.append(new_entry)
-    
+            self.times.append(time)
+            self.values.append(value + self.values[-1])
+
+    def update_many(self, times, values):
+        # bulk update_at of sorted times, summing the values of repeated instants
+        times = np.asarray(times, dtype=np.float64)
+        values = np.asarray(values, dtype=np.float64)
+        assert times.ndim == 1 and times.shape == values.shape
+        if len(times) == 0:
+            return
+        assert np.all(times[1:] >= times[:-1])
+        assert self.last_time is None or self.last_time <= times[0]
+        # the running sum starts from the current value, so the sums match successive update_at calls
+        current_value = self.values[-1] if self.values else 0.0
+        sums = np.cumsum(np.concatenate(([ current_value ], values)))[1:]
+        # keep the last sum of every instant
+        last_of_time = np.append(times[1:] != times[:-1], True)
+        times = times[last_of_time]
+        sums = sums[last_of_time]
+        if self.last_time is not None and self.last_time == times[0]:
+            self.values[-1] = sums[0]
+            times = times[1:]
+            sums = sums[1:]
+        self.times.frombytes(times.tobytes())
+        self.values.frombytes(sums.tobytes())
+        self.last_time = self.times[-1]
+
     def value_at(self, time):
+        # value of the newest entry not newer than time - O(log n)
         if self.last_time is None:
             return 0.0
-        
+
         elif self.last_time <= time:
-            return self.entries[-1].value
-        
-        result = self.entries[-1].value
-        for entry in reversed(self.entries):
-            if entry.time < time:
-                return result
-            else:
-                result = entry.value
-        return 0.0
\ No newline at end of file
+            return self.values[-1]
+
+        idx = bisect_right(self.times, time)
+        return 0.0 if idx == 0 else self.values[idx - 1]
+
+    def values_at(self, times):
+        # value_at of many instants at once, as a float64 array aligned with times
+        times = np.asarray(times, dtype=np.float64)
+        if self.last_time is None:
+            return np.zeros(times.shape, dtype=np.float64)
+        entry_times = np.frombuffer(self.times, dtype=np.float64)
+        entry_values = np.frombuffer(self.values, dtype=np.float64)
+        idxs = np.searchsorted(entry_times, times, side='right')
+        # a leading zero stands for the instants older than the oldest entry
+        return np.concatenate(([ 0.0 ], entry_values))[idxs]